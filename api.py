@@ -1,22 +1,192 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 import uvicorn
 import io
 import os
 import json
 from typing import Optional, List
+from contextlib import asynccontextmanager
 import base64
-from sqlalchemy.orm import Session
+import asyncio
+import secrets
+from sqlalchemy import select, text, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, undefer, contains_eager
+from sqlalchemy.orm.attributes import set_committed_value
 
-from resume_processor import ResumeProcessor
-from portfolio_generator import PortfolioGenerator
-from database import get_db, User, Portfolio, Resume
+from pydantic import BaseModel
+
+import database
+from portfolio_store import PortfolioStore
+from tracing import TracingMiddleware, slow_requests
+from search_index import SearchIndex
+from cache import read_cache, preview_store, resume_store, portfolio_key, portfolio_keys, user_portfolios_key, preview_key, resume_key
+from database import get_db, get_write_db, User, Portfolio, Resume, ResumeSection, HtmlBlob
+from artifact_store import get_artifact_store
+from artifact_responses import ranged_response, artifact_headers, not_modified
+from html_blobs import html_hash
+from resume_model import ParsedResume, resume_info_from_json, apply_resume_patch
+from portfolio_export import stream_user_export, export_filename
+
+def _is_transient_db_error(error):
+    """Whether a database error is a dropped connection or a lock timeout that a retry can fix."""
+    message = str(error)
+    return (
+        "SSL connection has been closed unexpectedly" in message
+        or "connection already closed" in message
+        or "connection was closed" in message
+        or "connection is closed" in message
+        or "database is locked" in message
+    )
+
+def _cached_response(body):
+    """Send a cached JSON response body as-is."""
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+# Previews are addressed by content hash, so browsers may keep them for good
+PREVIEW_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+async def _store_preview(html_content):
+    """Keep HTML for the preview endpoint. Returns its URL path."""
+    preview_hash = html_hash(html_content)
+    key = preview_key(preview_hash)
+    await preview_store.set(key, html_content.encode("utf-8"), preview_store.generation(key))
+    return f"/preview/{preview_hash}"
+
+async def _store_resume(resume):
+    """Keep an extraction for later requests. Returns its ID, or None if resumes aren't stored."""
+    if not resume_store.enabled:
+        return None
+    # Random rather than a content hash, so an ID can't be derived from the resume
+    resume_id = secrets.token_urlsafe(16)
+    key = resume_key(resume_id)
+    await resume_store.set(key, json.dumps(resume.to_wire()).encode("utf-8"), resume_store.generation(key))
+    return resume_id
+
+async def _request_resume(resume_data, resume_id, resume_patch):
+    """
+    The resume a generate or save request refers to.
+    
+    Args:
+        resume_data: JSON resume sent in full, or None.
+        resume_id: ID of a stored extraction, used when resume_data is not sent.
+        resume_patch: JSON edits to apply to the stored extraction, or None.
+        
+    Returns:
+        Dictionary containing resume information.
+        
+    Raises:
+        LookupError: If the stored extraction expired.
+        ValueError: If the request has no resume or a malformed one.
+    """
+    if resume_data is not None:
+        return resume_info_from_json(json.loads(resume_data))
+    if resume_id is None:
+        raise ValueError("Send resume_data or resume_id")
+    stored = await resume_store.get(resume_key(resume_id))
+    if stored is None:
+        raise LookupError("Resume not found or expired; send resume_data instead")
+    resume_info = ParsedResume.from_wire(json.loads(stored)).to_dict()
+    if resume_patch:
+        apply_resume_patch(resume_info, json.loads(resume_patch))
+    return resume_info
+
+def _resume_error(error):
+    """Error response for a resume _request_resume() couldn't load."""
+    if isinstance(error, LookupError):
+        return JSONResponse(content={"status": "error", "message": str(error)}, status_code=404)
+    return JSONResponse(
+        content={"status": "error", "message": f"Invalid resume data: {str(error)}"},
+        status_code=400
+    )
+
+def _attachment(response, filename):
+    """Make a response download as filename instead of displaying."""
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+# Uploads that triage doesn't put on the fast path are parsed this many at a time
+NORMAL_PARSE_CONCURRENCY = int(os.environ.get("NORMAL_PARSE_CONCURRENCY", "2"))
+_normal_parse_slots = asyncio.Semaphore(NORMAL_PARSE_CONCURRENCY)
+
+# Schema creation touches the database before the server can accept traffic,
+# so it only runs at startup when asked for; see `python database.py`
+CREATE_SCHEMA = os.environ.get("CREATE_SCHEMA", "0") == "1"
+
+# Seconds between sweeps for artifacts no blob references (0 disables), and
+# how old an artifact must be before a sweep may delete it
+ARTIFACT_SWEEP_INTERVAL = float(os.environ.get("ARTIFACT_SWEEP_INTERVAL", "3600"))
+ARTIFACT_GRACE_PERIOD = float(os.environ.get("ARTIFACT_GRACE_PERIOD", "3600"))
+
+async def _prime_pool(engine):
+    """Open the engine's steady-state connections so early requests don't pay for connecting."""
+    connections = []
+    try:
+        for _ in range(engine.pool.size()):
+            connection = await engine.connect()
+            connections.append(connection)
+            await connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            await connection.close()
+
+def _load_heavy_modules():
+    """Import the PDF parser and triage (compiling their regexes) and the LLM client."""
+    import resume_processor
+    import pdf_triage
+    import portfolio_generator
+
+async def warmup():
+    """Prepare connections and heavy modules in the background after startup."""
+    try:
+        await _prime_pool(database.async_engine)
+        if database.async_write_engine is not database.async_engine:
+            await _prime_pool(database.async_write_engine)
+        await run_in_threadpool(_load_heavy_modules)
+    except Exception as e:
+        # Requests still work without warmup, they just pay these costs themselves
+        print(f"Warmup failed: {str(e)}")
+
+async def sweep_artifacts():
+    """Delete orphaned artifacts every ARTIFACT_SWEEP_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(ARTIFACT_SWEEP_INTERVAL)
+        try:
+            # On the read engine: on SQLite the write connection would lock out saves
+            async with database.AsyncSessionLocal() as db:
+                removed = await PortfolioStore.sweep_orphaned_artifacts(db, ARTIFACT_GRACE_PERIOD)
+            if removed:
+                print(f"Removed {removed} orphaned artifacts")
+        except Exception as e:
+            print(f"Artifact sweep failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Engines are created here rather than at import; neither step connects
+    database.init_engines()
+    if CREATE_SCHEMA:
+        await run_in_threadpool(database.create_schema)
+    background_tasks = [asyncio.create_task(warmup())]
+    if ARTIFACT_SWEEP_INTERVAL > 0 and get_artifact_store() is not None:
+        background_tasks.append(asyncio.create_task(sweep_artifacts()))
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        # Close pooled async connections so their driver threads exit cleanly
+        await database.async_engine.dispose()
+        if database.async_write_engine is not database.async_engine:
+            await database.async_write_engine.dispose()
 
 app = FastAPI(
     title="Portfolio Generator API",
     description="API for generating portfolio websites from resumes",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware to allow requests from the Streamlit frontend
@@ -28,30 +198,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Assign request IDs and record DB, LLM and PDF timings for every request
+app.add_middleware(TracingMiddleware)
+
+# Debug endpoints expose query text and request paths, so they are opt-in
+DEBUG_ENDPOINTS_ENABLED = os.environ.get("ENABLE_DEBUG_ENDPOINTS", "0") == "1"
+
 @app.get("/")
 async def read_root():
     return {"message": "Portfolio Generator API is running"}
 
 @app.post("/extract-resume")
-async def extract_resume(file: UploadFile = File(...)):
+async def extract_resume(file: UploadFile = File(...), compact: bool = False):
     """
     Extract information from a resume.
     
     Args:
         file: Uploaded resume file.
+        compact: Return the compact format of resume_model.ParsedResume,
+            which holds the text once, instead of the resume dictionary.
         
     Returns:
-        JSON with extracted resume information.
+        JSON with extracted resume information, and a resume_id that generate
+        and save requests can send instead of the resume for RESUME_TTL seconds.
+        Scanned PDFs and files over the size or page limits are rejected
+        before parsing with 422 or 413 (see pdf_triage).
     """
     try:
         # Read file content
         file_content = await file.read()
         
+        # Imported on first use (or by warmup) to keep startup fast
+        from resume_processor import ResumeProcessor
+        from pdf_triage import triage_pdf, FAST_PATH
+        
+        # Reject scans and oversized files before paying for a full parse
+        triage = await run_in_threadpool(triage_pdf, file_content)
+        if triage.status_code is not None:
+            return JSONResponse(
+                content={"status": "error", "message": triage.message, "triage": triage.verdict},
+                status_code=triage.status_code
+            )
+        
         # Process the resume
-        result = ResumeProcessor.process_resume(io.BytesIO(file_content))
+        # PDF parsing is CPU-bound, so keep it off the event loop
+        if triage.verdict == FAST_PATH:
+            resume = await run_in_threadpool(ResumeProcessor.parse_resume, io.BytesIO(file_content))
+        else:
+            # Longer documents take turns, so they can't hold up short ones
+            async with _normal_parse_slots:
+                resume = await run_in_threadpool(ResumeProcessor.parse_resume, io.BytesIO(file_content))
+        resume_id = await _store_resume(resume)
         
         return JSONResponse(
-            content={"status": "success", "data": result},
+            content={
+                "status": "success",
+                "data": resume.to_wire() if compact else resume.to_dict(),
+                "resume_id": resume_id
+            },
             status_code=200
         )
     except Exception as e:
@@ -62,45 +266,88 @@ async def extract_resume(file: UploadFile = File(...)):
 
 @app.post("/generate-portfolio")
 async def generate_portfolio(
-    resume_data: str = Form(...),
     theme: str = Form(...),
-    claude_api_key: str = Form(...)
+    claude_api_key: str = Form(...),
+    resume_data: Optional[str] = Form(None),
+    resume_id: Optional[str] = Form(None),
+    resume_patch: Optional[str] = Form(None),
+    include_downloads: bool = Form(False)
 ):
     """
     Generate a portfolio website.
     
+    The resume is either sent in full as resume_data, or referenced by the
+    resume_id from /extract-resume with the user's edits as resume_patch.
+    
     Args:
-        resume_data: JSON string containing resume information.
         theme: Selected theme for the portfolio.
         claude_api_key: API key for Anthropic's Claude.
+        resume_data: JSON string containing resume information, as a
+            dictionary or in the compact format.
+        resume_id: ID of a stored extraction.
+        resume_patch: JSON edits to the stored extraction (see resume_model.resume_patch).
+        include_downloads: Also return the page as a base64 data URI
+            (preview_uri) and base64 ZIP (zip_base64). Without it, both are
+            built on request from preview_url and preview_url/zip.
         
     Returns:
-        JSON with generated portfolio HTML.
+        JSON with generated portfolio HTML, its preview_url, in html_stats
+        its size before and after post-processing and the repairs made, and
+        in page_weight its page-weight report (see page_weight).
     """
     try:
-        # Parse resume data
-        resume_info = eval(resume_data)
-        
-        # Initialize portfolio generator
+        resume_info = await _request_resume(resume_data, resume_id, resume_patch)
+    except (LookupError, ValueError, KeyError, TypeError) as e:
+        return _resume_error(e)
+    
+    try:
+        # Initialize portfolio generator; the Anthropic client is imported on first use
+        from portfolio_generator import PortfolioGenerator
         generator = PortfolioGenerator(claude_api_key)
         
         # Generate portfolio
-        html_content = generator.generate_portfolio(resume_info, theme)
+        html_content = await run_in_threadpool(generator.generate_portfolio, resume_info, theme)
         
-        # Create base64 data URI for preview
-        data_uri = generator.encode_html_to_data_uri(html_content)
+        # Previews and downloads are loaded by URL, see /preview
+        preview_url = await _store_preview(html_content)
         
-        # Create downloadable ZIP
-        zip_content = generator.create_zip_file(html_content)
-        zip_base64 = base64.b64encode(zip_content).decode('utf-8')
+        content = {
+            "status": "success", 
+            "html": html_content,
+            "preview_url": preview_url,
+            "html_stats": generator.postprocess_stats,
+            "page_weight": generator.page_weight.to_dict()
+        }
+        if include_downloads:
+            # Together these are about twice the size of the HTML, so they are opt-in
+            content["preview_uri"] = generator.encode_html_to_data_uri(html_content)
+            zip_content = await run_in_threadpool(generator.create_zip_file, html_content)
+            content["zip_base64"] = base64.b64encode(zip_content).decode('utf-8')
         
+        return JSONResponse(content=content, status_code=200)
+    except Exception as e:
         return JSONResponse(
-            content={
-                "status": "success", 
-                "html": html_content,
-                "preview_uri": data_uri,
-                "zip_base64": zip_base64
-            },
+            content={"status": "error", "message": str(e)},
+            status_code=500
+        )
+
+@app.post("/previews")
+async def create_preview(html_content: str = Form(...)):
+    """
+    Store portfolio HTML so it can be previewed and downloaded by URL.
+    
+    Storing the same HTML again renews it and returns the same URL.
+    
+    Args:
+        html_content: HTML content of the portfolio.
+        
+    Returns:
+        JSON with the preview URL path.
+    """
+    try:
+        preview_url = await _store_preview(html_content)
+        return JSONResponse(
+            content={"status": "success", "preview_url": preview_url},
             status_code=200
         )
     except Exception as e:
@@ -109,6 +356,82 @@ async def generate_portfolio(
             status_code=500
         )
 
+@app.get("/preview/{preview_hash}")
+async def get_preview(preview_hash: str, request: Request, download: bool = False):
+    """
+    Serve stored preview HTML, for an iframe or as a download.
+    
+    Args:
+        preview_hash: Content hash from the preview URL.
+        download: Send as a file download instead of a page.
+        
+    Returns:
+        The portfolio HTML document.
+    """
+    # The hash is the entity tag, so a revalidation needs no lookup
+    if not download and not_modified(request, preview_hash):
+        return Response(status_code=304, headers=artifact_headers(preview_hash, PREVIEW_CACHE_CONTROL))
+    data = await preview_store.get(preview_key(preview_hash))
+    if data is None:
+        return JSONResponse(
+            content={"status": "error", "message": "Preview not found or expired"},
+            status_code=404
+        )
+    response = ranged_response(request, preview_hash, len(data), data=data, cache_control=PREVIEW_CACHE_CONTROL)
+    return _attachment(response, "portfolio.html") if download else response
+
+@app.head("/preview/{preview_hash}")
+async def check_preview(preview_hash: str):
+    """
+    Check that preview HTML is still stored, without sending it.
+    
+    Previews live in an evictable cache, so clients check before showing a
+    preview URL and store the HTML again on a 404.
+    
+    Args:
+        preview_hash: Content hash from the preview URL.
+        
+    Returns:
+        An empty 200 response, or 404 if the preview is gone.
+    """
+    data = await preview_store.get(preview_key(preview_hash))
+    return Response(status_code=200 if data is not None else 404)
+
+@app.get("/preview/{preview_hash}/zip")
+async def get_preview_zip(preview_hash: str, bundle: bool = False, precompress: bool = False):
+    """
+    Download stored preview HTML as a ready-to-deploy ZIP package, built on request.
+    
+    Args:
+        preview_hash: Content hash from the preview URL.
+        bundle: Split styles and scripts into content-hashed files with
+            CDN cache headers, see static_bundle.
+        precompress: With bundle, add .gz and .br copies of the text files.
+        
+    Returns:
+        The ZIP file.
+    """
+    data = await preview_store.get(preview_key(preview_hash))
+    if data is None:
+        return JSONResponse(
+            content={"status": "error", "message": "Preview not found or expired"},
+            status_code=404
+        )
+    if bundle:
+        from static_bundle import create_bundle_zip
+        zip_content = await run_in_threadpool(create_bundle_zip, data.decode("utf-8"), precompress)
+        variant = "bundle-precompressed" if precompress else "bundle"
+    else:
+        from portfolio_generator import PortfolioGenerator
+        zip_content = await run_in_threadpool(PortfolioGenerator.create_zip_file, data.decode("utf-8"))
+        variant = "zip"
+    response = Response(
+        content=zip_content,
+        media_type="application/zip",
+        headers={"Cache-Control": PREVIEW_CACHE_CONTROL, "ETag": f'"{preview_hash}-{variant}"'}
+    )
+    return _attachment(response, "portfolio-bundle.zip" if bundle else "portfolio.zip")
+
 @app.get("/themes")
 async def get_themes():
     """
@@ -133,135 +456,182 @@ async def get_themes():
 @app.post("/save-portfolio")
 async def save_portfolio(
     email: str = Form(...),
-    resume_data: str = Form(...),
     theme: str = Form(...),
     html_content: str = Form(...),
     portfolio_name: str = Form("My Portfolio"),
-    db: Session = Depends(get_db)
+    resume_data: Optional[str] = Form(None),
+    resume_id: Optional[str] = Form(None),
+    resume_patch: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Save a generated portfolio to the database.
     
+    The resume is either sent in full as resume_data, or referenced by the
+    resume_id from /extract-resume with the user's edits as resume_patch.
+    
     Args:
         email: User's email.
-        resume_data: JSON string containing resume information.
         theme: Selected theme for the portfolio.
         html_content: HTML content of the portfolio.
         portfolio_name: Name for the portfolio.
+        resume_data: JSON string containing resume information, as a
+            dictionary or in the compact format.
+        resume_id: ID of a stored extraction.
+        resume_patch: JSON edits to the stored extraction (see resume_model.resume_patch).
         
     Returns:
         JSON with saved portfolio ID.
     """
-    # Implement retry logic for database operations
+    try:
+        resume_info = await _request_resume(resume_data, resume_id, resume_patch)
+    except (LookupError, ValueError, KeyError, TypeError) as e:
+        return _resume_error(e)
+    
+    # The save is a single transaction, so retrying after a dropped
+    # connection can never leave a half-saved portfolio behind
     max_retries = 3
     retry_count = 0
     
-    while retry_count < max_retries:
+    while True:
         try:
-            # Parse resume data
-            resume_info = json.loads(resume_data)
-            
-            # Check if user exists, create if not
-            user = db.query(User).filter(User.email == email).first()
-            if not user:
-                user = User(email=email)
-                db.add(user)
-                db.commit()
-                db.refresh(user)
-            
-            # Create new portfolio
-            portfolio = Portfolio(
-                user_id=user.id,
-                name=portfolio_name,
-                theme=theme,
-                html_content=html_content
-            )
-            db.add(portfolio)
-            db.commit()
-            db.refresh(portfolio)
-            
-            # Create resume record
-            resume = Resume(
-                portfolio_id=portfolio.id,
-                filename=resume_info.get("filename", "uploaded_resume.pdf"),
-                content_text=resume_info.get("full_text", ""),
-                extracted_name=resume_info.get("name", ""),
-                extracted_email=resume_info.get("email", ""),
-                extracted_phone=resume_info.get("phone", ""),
-                sections_json=json.dumps(resume_info.get("sections", {}))
+            portfolio_id = await PortfolioStore.save_portfolio(
+                db, email, resume_info, theme, html_content, portfolio_name
             )
-            db.add(resume)
-            db.commit()
-            
+            await read_cache.invalidate(user_portfolios_key(email))
             return JSONResponse(
-                content={"status": "success", "portfolio_id": portfolio.id},
+                content={"status": "success", "portfolio_id": portfolio_id},
                 status_code=200
             )
-            
         except Exception as db_error:
-            db.rollback()
             retry_count += 1
             
             # Log details about the error
             print(f"Database error on attempt {retry_count}/{max_retries}: {str(db_error)}")
             
-            if "SSL connection has been closed unexpectedly" in str(db_error) or "connection already closed" in str(db_error):
-                # These are connection issues that might be resolved with a retry
-                print("Detected SSL/connection issue, will retry with a new session")
-                
-                # Wait before retrying
-                import time
-                time.sleep(1 * retry_count)  # Progressive backoff
-                
-                # Get a fresh DB session
-                db.close()
-                db = next(get_db())
-            elif retry_count >= max_retries:
-                # We've exhausted retries, return error to client
-                return JSONResponse(
-                    content={"status": "error", "message": f"Failed to save portfolio after {max_retries} attempts: {str(db_error)}"},
-                    status_code=500
-                )
-            else:
-                # For other errors, also retry but log differently
-                print(f"Unexpected database error, retrying: {str(db_error)}")
+            if retry_count < max_retries and _is_transient_db_error(db_error):
+                print("Detected connection or lock issue, will retry with a new connection")
                 
-                # Wait before retrying
-                import time
-                time.sleep(1 * retry_count)
+                # Wait before retrying without blocking the event loop
+                await asyncio.sleep(0.2 * retry_count)  # Progressive backoff
                 
-                # Get a fresh DB session
-                db.close()
-                db = next(get_db())
+                # Release the connection so the session reconnects on next use
+                await db.close()
+                continue
+            
+            return JSONResponse(
+                content={"status": "error", "message": f"Failed to save portfolio: {str(db_error)}"},
+                status_code=500
+            )
+
+class BulkPortfolioItem(BaseModel):
+    """A single portfolio in a bulk save request."""
+    email: str
+    resume_data: dict
+    theme: str
+    html_content: str
+    portfolio_name: str = "My Portfolio"
+
+class BulkSaveRequest(BaseModel):
+    """Body of a bulk save request."""
+    portfolios: List[BulkPortfolioItem]
+
+@app.post("/save-portfolios")
+async def save_portfolios_bulk(request: BulkSaveRequest, db: AsyncSession = Depends(get_write_db)):
+    """
+    Save many portfolios in one transaction.
     
-    # This should not be reached but just in case
-    return JSONResponse(
-        content={"status": "error", "message": "Failed to save portfolio after multiple attempts, please try again later"},
-        status_code=500
-    )
+    Args:
+        request: JSON body with a list of portfolios to save.
+        
+    Returns:
+        JSON with the saved portfolio IDs, in request order.
+    """
+    try:
+        portfolio_ids = await PortfolioStore.save_portfolios_bulk(db, [
+            {
+                "email": item.email,
+                "resume_info": resume_info_from_json(item.resume_data),
+                "theme": item.theme,
+                "html_content": item.html_content,
+                "portfolio_name": item.portfolio_name
+            } for item in request.portfolios
+        ])
+        await read_cache.invalidate(*{user_portfolios_key(item.email) for item in request.portfolios})
+        return JSONResponse(
+            content={"status": "success", "portfolio_ids": portfolio_ids},
+            status_code=200
+        )
+    except Exception as e:
+        return JSONResponse(
+            content={"status": "error", "message": f"Failed to save portfolios: {str(e)}"},
+            status_code=500
+        )
 
 @app.get("/user-portfolios/{email}")
-async def get_user_portfolios(email: str, db: Session = Depends(get_db)):
+async def get_user_portfolios(
+    email: str,
+    page: Optional[int] = Query(None, ge=1),
+    page_size: int = Query(12, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Get all portfolios for a user.
+    Get all portfolios for a user, or one page of them.
     
     Args:
         email: User's email.
+        page: 1-based page number. Without it every portfolio is returned.
+        page_size: Portfolios per page (at most 100).
         
     Returns:
-        JSON with list of portfolios.
+        JSON with list of portfolios. Pages are newest first and also
+        report the total count.
     """
+    # Pages aren't cached: writes invalidate one key per user, and the page
+    # query is a LIMIT on the user_id index
+    key = user_portfolios_key(email)
+    if page is None:
+        cached = await read_cache.get(key)
+        if cached is not None:
+            return _cached_response(cached)
+    generation = read_cache.generation(key)
+    
     try:
-        # Find user
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            return JSONResponse(
-                content={"status": "error", "message": "User not found"},
-                status_code=404
-            )
-        
-        # Get portfolios
-        portfolios = db.query(Portfolio).filter(Portfolio.user_id == user.id).all()
+        columns = (Portfolio.id, Portfolio.name, Portfolio.theme, Portfolio.created_at, Portfolio.is_favorite)
+        if page is None:
+            # Find the user and their portfolios in one query; a user without
+            # portfolios comes back as a single row of NULLs
+            rows = (await db.execute(
+                select(User.id.label("user_id"), *columns)
+                .outerjoin(Portfolio, Portfolio.user_id == User.id)
+                .filter(User.email == email)
+            )).all()
+            if not rows:
+                return JSONResponse(
+                    content={"status": "error", "message": "User not found"},
+                    status_code=404
+                )
+            portfolios = [row for row in rows if row.id is not None]
+        else:
+            # Find user
+            user_id = (await db.execute(select(User.id).filter(User.email == email))).scalar()
+            if user_id is None:
+                return JSONResponse(
+                    content={"status": "error", "message": "User not found"},
+                    status_code=404
+                )
+            
+            # Get one page of portfolios
+            total = (await db.execute(
+                select(func.count()).select_from(Portfolio).filter(Portfolio.user_id == user_id)
+            )).scalar()
+            portfolios = (await db.execute(
+                select(*columns)
+                .filter(Portfolio.user_id == user_id)
+                .order_by(Portfolio.id.desc())
+                .limit(page_size)
+                .offset((page - 1) * page_size)
+            )).all()
         
         # Format response
         portfolio_list = [
@@ -274,10 +644,102 @@ async def get_user_portfolios(email: str, db: Session = Depends(get_db)):
             } for p in portfolios
         ]
         
-        return JSONResponse(
+        if page is not None:
+            return JSONResponse(
+                content={
+                    "status": "success",
+                    "portfolios": portfolio_list,
+                    "page": page,
+                    "page_size": page_size,
+                    "total": total
+                },
+                status_code=200
+            )
+        
+        response = JSONResponse(
             content={"status": "success", "portfolios": portfolio_list},
             status_code=200
         )
+        await read_cache.set(key, response.body, generation)
+        return response
+    except Exception as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)},
+            status_code=500
+        )
+
+@app.get("/user-portfolios/{email}/export")
+async def export_user_portfolios(email: str, db: AsyncSession = Depends(get_db)):
+    """
+    Download all of a user's portfolios as one ZIP archive with a manifest.
+    
+    The archive is streamed while it is built, reading portfolios from the
+    database in batches, so memory use does not depend on how many there are.
+    
+    Args:
+        email: User's email.
+        
+    Returns:
+        The ZIP archive.
+    """
+    try:
+        user_id = (await db.execute(select(User.id).filter(User.email == email))).scalar()
+    except Exception as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)},
+            status_code=500
+        )
+    if user_id is None:
+        return JSONResponse(
+            content={"status": "error", "message": "User not found"},
+            status_code=404
+        )
+    
+    return StreamingResponse(
+        stream_user_export(user_id, email),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(email)}"',
+            "Cache-Control": "no-store"
+        }
+    )
+
+@app.get("/search")
+async def search_portfolios(
+    q: str,
+    theme: Optional[str] = None,
+    email: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over saved portfolios and their resumes.
+    
+    Args:
+        q: Search terms, e.g. a skill, company or keyword.
+        theme: Only return portfolios with this theme.
+        email: Only return portfolios owned by this user.
+        page: 1-based page number.
+        page_size: Results per page (at most 100).
+        
+    Returns:
+        JSON with ranked results and highlighted snippets. Snippets are
+        escaped HTML in which only the <mark> tags are markup.
+    """
+    try:
+        total, results = await SearchIndex.search(db, q, theme=theme, email=email, page=page, page_size=page_size)
+        return JSONResponse(
+            content={
+                "status": "success",
+                "query": q,
+                "page": page,
+                "page_size": page_size,
+                "total": total,
+                "results": results
+            },
+            status_code=200
+        )
     except Exception as e:
         return JSONResponse(
             content={"status": "error", "message": str(e)},
@@ -285,56 +747,234 @@ async def get_user_portfolios(email: str, db: Session = Depends(get_db)):
         )
 
 @app.get("/portfolio/{portfolio_id}")
-async def get_portfolio(portfolio_id: int, db: Session = Depends(get_db)):
+async def get_portfolio(portfolio_id: int, include_html: bool = True, db: AsyncSession = Depends(get_db)):
     """
     Get a specific portfolio by ID.
     
     Args:
         portfolio_id: Portfolio ID.
+        include_html: Include html_content; clients that load the HTML from
+            /portfolio/{id}/html can leave it out.
         
     Returns:
         JSON with portfolio details.
     """
+    # Repeat views are served from the cache without touching the database
+    key = portfolio_key(portfolio_id, include_html)
+    cached = await read_cache.get(key)
+    if cached is not None:
+        return _cached_response(cached)
+    generation = read_cache.generation(key)
+    
     try:
-        # Get portfolio
-        portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+        # Get portfolio and resume in one query; each extra query is several
+        # round trips to the driver's thread on aiosqlite
+        query = (
+            select(Portfolio)
+            .outerjoin(Portfolio.resume)
+            .options(undefer(Portfolio.page_weight_json), contains_eager(Portfolio.resume))
+            .filter(Portfolio.id == portfolio_id)
+        )
+        if include_html:
+            query = query.outerjoin(Portfolio.html_blob).options(contains_eager(Portfolio.html_blob))
+        portfolio = (await db.execute(query)).scalars().first()
         if not portfolio:
             return JSONResponse(
                 content={"status": "error", "message": "Portfolio not found"},
                 status_code=404
             )
         
-        # Get resume info
-        resume = db.query(Resume).filter(Resume.portfolio_id == portfolio.id).first()
+        # Get resume sections; a plain query costs less than selectinload
+        resume = portfolio.resume
+        if resume:
+            sections = (await db.execute(
+                select(ResumeSection)
+                .filter(ResumeSection.resume_id == resume.id)
+                .order_by(ResumeSection.position)
+            )).scalars().all()
+            set_committed_value(resume, "sections", sections)
         
         # Format response
         portfolio_data = {
             "id": portfolio.id,
             "name": portfolio.name,
             "theme": portfolio.theme,
-            "html_content": portfolio.html_content,
             "created_at": portfolio.created_at.isoformat(),
             "is_favorite": portfolio.is_favorite,
+            # Portfolios saved before reports were stored have none
+            "page_weight": json.loads(portfolio.page_weight_json) if portfolio.page_weight_json else None,
             "resume": {
                 "name": resume.extracted_name if resume else "",
                 "email": resume.extracted_email if resume else "",
                 "phone": resume.extracted_phone if resume else "",
-                "sections": json.loads(resume.sections_json) if resume and resume.sections_json else {}
+                "sections": resume.section_map() if resume else {}
             }
         }
+        if include_html:
+            if portfolio.html_blob is not None and portfolio.html_blob.storage_key is not None:
+                # Artifact store reads are network or disk I/O, so keep them off the event loop
+                portfolio_data["html_content"] = await run_in_threadpool(lambda: portfolio.html)
+            else:
+                portfolio_data["html_content"] = portfolio.html
         
-        return JSONResponse(
+        response = JSONResponse(
             content={"status": "success", "portfolio": portfolio_data},
             status_code=200
         )
+        await read_cache.set(key, response.body, generation)
+        return response
+    except Exception as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)},
+            status_code=500
+        )
+
+@app.get("/portfolio/{portfolio_id}/sections/{section}")
+async def get_portfolio_section(portfolio_id: int, section: str, db: AsyncSession = Depends(get_db)):
+    """
+    Get one section of a portfolio's resume.
+    
+    Args:
+        portfolio_id: Portfolio ID.
+        section: Section name, e.g. "SKILLS".
+        
+    Returns:
+        JSON with the section content.
+    """
+    try:
+        content = (await db.execute(
+            select(ResumeSection.content)
+            .join(Resume, Resume.id == ResumeSection.resume_id)
+            .filter(Resume.portfolio_id == portfolio_id, ResumeSection.section == section)
+        )).scalar()
+        if content is None:
+            # Not stored as a row: a missing section, or a resume not migrated yet
+            resume = (await db.execute(
+                select(Resume)
+                .options(selectinload(Resume.sections))
+                .filter(Resume.portfolio_id == portfolio_id)
+            )).scalars().first()
+            content = resume.section_map().get(section) if resume else None
+        if content is None:
+            return JSONResponse(
+                content={"status": "error", "message": "Section not found"},
+                status_code=404
+            )
+        
+        return JSONResponse(
+            content={"status": "success", "section": section, "content": content},
+            status_code=200
+        )
+    except Exception as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)},
+            status_code=500
+        )
+
+@app.put("/portfolio/{portfolio_id}/sections/{section}")
+async def update_portfolio_section(
+    portfolio_id: int,
+    section: str,
+    content: str = Form(...),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    Replace one section of a portfolio's resume, or add it if it is missing.
+    
+    Args:
+        portfolio_id: Portfolio ID.
+        section: Section name, e.g. "SKILLS".
+        content: New section content.
+        
+    Returns:
+        JSON with status message.
+    """
+    try:
+        if not await PortfolioStore.update_section(db, portfolio_id, section, content):
+            return JSONResponse(
+                content={"status": "error", "message": "Portfolio not found"},
+                status_code=404
+            )
+        await read_cache.invalidate(*portfolio_keys(portfolio_id))
+        
+        return JSONResponse(
+            content={"status": "success", "message": "Section updated successfully"},
+            status_code=200
+        )
     except Exception as e:
         return JSONResponse(
             content={"status": "error", "message": str(e)},
             status_code=500
         )
 
+@app.get("/portfolio/{portfolio_id}/html")
+async def get_portfolio_html(portfolio_id: int, request: Request, download: bool = False, db: AsyncSession = Depends(get_db)):
+    """
+    Serve a portfolio's HTML directly, with byte-range and ETag support.
+    
+    Artifacts in a local store are sent from the file without loading them
+    into memory; blobs in the database are decompressed and served from memory.
+    
+    Args:
+        portfolio_id: Portfolio ID.
+        download: Send as a file download instead of a page.
+        
+    Returns:
+        The portfolio HTML document.
+    """
+    row = (await db.execute(
+        select(
+            Portfolio.html_blob_hash,
+            HtmlBlob.storage_key,
+            HtmlBlob.size
+        )
+        .outerjoin(HtmlBlob, HtmlBlob.hash == Portfolio.html_blob_hash)
+        .filter(Portfolio.id == portfolio_id)
+    )).first()
+    if row is None:
+        return JSONResponse(
+            content={"status": "error", "message": "Portfolio not found"},
+            status_code=404
+        )
+    
+    store = get_artifact_store()
+    if row.storage_key is not None and store is None:
+        return JSONResponse(
+            content={"status": "error", "message": "Portfolio HTML is in an artifact store, but ARTIFACT_STORE is not configured"},
+            status_code=500
+        )
+    if row.storage_key is not None:
+        path = store.local_path(row.storage_key)
+        if path is not None:
+            # Checked up front: a missing file would fail after the headers are sent
+            if not os.path.exists(path):
+                return JSONResponse(
+                    content={"status": "error", "message": "Portfolio HTML is missing from the artifact store"},
+                    status_code=500
+                )
+            response = ranged_response(request, row.html_blob_hash, row.size, path=path)
+            return _attachment(response, f"portfolio-{portfolio_id}.html") if download else response
+    
+    # Remote artifacts, database blobs and legacy inline HTML are served from memory
+    try:
+        portfolio = (await db.execute(
+            select(Portfolio)
+            .options(joinedload(Portfolio.html_blob))
+            .filter(Portfolio.id == portfolio_id)
+        )).scalars().first()
+        html_content = await run_in_threadpool(lambda: portfolio.html or "")
+    except Exception as e:
+        return JSONResponse(
+            content={"status": "error", "message": str(e)},
+            status_code=500
+        )
+    data = html_content.encode("utf-8")
+    etag = portfolio.html_blob_hash or html_hash(html_content)
+    response = ranged_response(request, etag, len(data), data=data)
+    return _attachment(response, f"portfolio-{portfolio_id}.html") if download else response
+
 @app.delete("/portfolio/{portfolio_id}")
-async def delete_portfolio(portfolio_id: int, db: Session = Depends(get_db)):
+async def delete_portfolio(portfolio_id: int, db: AsyncSession = Depends(get_write_db)):
     """
     Delete a portfolio.
     
@@ -346,30 +986,70 @@ async def delete_portfolio(portfolio_id: int, db: Session = Depends(get_db)):
     """
     try:
         # Get portfolio
-        portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+        portfolio = (await db.execute(select(Portfolio).filter(Portfolio.id == portfolio_id))).scalars().first()
         if not portfolio:
             return JSONResponse(
                 content={"status": "error", "message": "Portfolio not found"},
                 status_code=404
             )
         
-        # Delete associated resume
-        db.query(Resume).filter(Resume.portfolio_id == portfolio.id).delete()
-        
-        # Delete portfolio
-        db.delete(portfolio)
-        db.commit()
+        # Delete the portfolio and its resume, and release its HTML blob
+        owner_email = (await db.execute(select(User.email).filter(User.id == portfolio.user_id))).scalar()
+        await PortfolioStore.delete_portfolio(db, portfolio)
+        await read_cache.invalidate(*portfolio_keys(portfolio_id), user_portfolios_key(owner_email))
         
         return JSONResponse(
             content={"status": "success", "message": "Portfolio deleted successfully"},
             status_code=200
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return JSONResponse(
             content={"status": "error", "message": str(e)},
             status_code=500
         )
 
+@app.get("/debug/slow-requests")
+async def get_slow_requests():
+    """
+    Get recent slow requests with their query count, DB time and LLM time.
+    
+    Returns:
+        JSON with slow request samples, slowest first.
+    """
+    if not DEBUG_ENDPOINTS_ENABLED:
+        return JSONResponse(
+            content={"status": "error", "message": "Debug endpoints are disabled"},
+            status_code=404
+        )
+    
+    return JSONResponse(
+        content={
+            "status": "success",
+            "threshold_ms": slow_requests.threshold_ms,
+            "requests": slow_requests.snapshot()
+        },
+        status_code=200
+    )
+
+@app.get("/debug/cache-stats")
+async def get_cache_stats():
+    """
+    Get hit rates and sizes of the portfolio read cache.
+    
+    Returns:
+        JSON with cache counters for this worker.
+    """
+    if not DEBUG_ENDPOINTS_ENABLED:
+        return JSONResponse(
+            content={"status": "error", "message": "Debug endpoints are disabled"},
+            status_code=404
+        )
+    
+    return JSONResponse(
+        content={"status": "success", "cache": read_cache.stats(), "previews": preview_store.stats(), "resumes": resume_store.stats()},
+        status_code=200
+    )
+
 if __name__ == "__main__":
     uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
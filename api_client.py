@@ -0,0 +1,196 @@
+"""
+Shared HTTP client for calling the FastAPI backend from the Streamlit pages.
+
+Streamlit runs each script rerun in its own thread, with no event loop, so the
+pages used to create a new event loop and a new httpx.AsyncClient for every
+call, paying a TCP (and TLS) handshake each time. Here one background thread
+runs a single event loop for the whole process, and one AsyncClient per
+backend URL lives on it with a keep-alive connection pool. Pages call the
+synchronous methods, which submit the request to that loop and wait for it,
+so concurrent sessions share warm connections.
+
+get_api_client() is cached with st.cache_resource when Streamlit is installed,
+so every session and rerun gets the same client.
+"""
+import asyncio
+import atexit
+import threading
+
+import httpx
+
+try:
+    import streamlit as st
+except ImportError:
+    st = None
+
+# Idle connections are kept this long; well under typical load balancer idle timeouts
+KEEPALIVE_EXPIRY = 60.0
+
+class ApiError(Exception):
+    """
+    An error response from the backend, with its HTTP status code.
+    """
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+class _EventLoopThread:
+    """
+    An event loop running forever in a daemon thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="api-client-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the loop from any other thread. Returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the loop from any other thread and return its result."""
+        return self.submit(coroutine).result(timeout)
+
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+def _get_loop_thread():
+    """The process-wide background event loop, started on first use."""
+    global _loop_thread
+    with _loop_lock:
+        if _loop_thread is None:
+            _loop_thread = _EventLoopThread()
+        return _loop_thread
+
+class ApiClient:
+    """
+    Synchronous façade over a pooled httpx.AsyncClient for one backend.
+    """
+
+    def __init__(self, base_url, timeout=120.0, max_connections=20, max_keepalive_connections=10, transport=None):
+        self.base_url = base_url
+        self._loop_thread = _get_loop_thread()
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+
+        async def create_client():
+            # Created on the background loop, the only loop that ever uses it
+            return httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, transport=transport)
+
+        self._client = self._loop_thread.run(create_client())
+        atexit.register(self.close)
+
+    async def arequest(self, method, endpoint, **kwargs):
+        """
+        Send a request on the background loop and decode the JSON response.
+
+        Args:
+            method: HTTP method.
+            endpoint: Path on the backend, e.g. "/themes".
+            **kwargs: Passed to httpx, e.g. data, files or params.
+
+        Returns:
+            Decoded JSON response.
+        """
+        try:
+            response = await self._client.request(method, endpoint, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            error_message = f"HTTP error: {e.response.status_code}"
+            try:
+                error_data = e.response.json()
+                if "message" in error_data:
+                    error_message = error_data["message"]
+            except ValueError:
+                pass
+            raise ApiError(error_message, e.response.status_code)
+        except httpx.RequestError as e:
+            raise Exception(f"Request error: {str(e)}")
+
+    def request(self, method, endpoint, **kwargs):
+        """
+        Send a request and wait for the decoded JSON response.
+
+        Args:
+            method: HTTP method.
+            endpoint: Path on the backend, e.g. "/themes".
+            **kwargs: Passed to httpx, e.g. data, files or params.
+
+        Returns:
+            Decoded JSON response.
+        """
+        return self._loop_thread.run(self.arequest(method, endpoint, **kwargs))
+
+    def submit(self, coroutine):
+        """
+        Start a coroutine, e.g. from arequest(), on the client's loop without waiting for it.
+
+        Returns:
+            A concurrent.futures.Future with the coroutine's result.
+        """
+        return self._loop_thread.submit(coroutine)
+
+    async def _astatus(self, method, endpoint, **kwargs):
+        try:
+            response = await self._client.request(method, endpoint, **kwargs)
+        except httpx.RequestError as e:
+            raise Exception(f"Request error: {str(e)}")
+        return response.status_code
+
+    def status(self, method, endpoint, **kwargs):
+        """
+        Send a request and wait for its status code, ignoring the body.
+
+        Args:
+            method: HTTP method, e.g. "HEAD".
+            endpoint: Path on the backend.
+            **kwargs: Passed to httpx.
+
+        Returns:
+            HTTP status code.
+        """
+        return self._loop_thread.run(self._astatus(method, endpoint, **kwargs))
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    def put(self, endpoint, **kwargs):
+        return self.request("PUT", endpoint, **kwargs)
+
+    def delete(self, endpoint, **kwargs):
+        return self.request("DELETE", endpoint, **kwargs)
+
+    def close(self):
+        """Close pooled connections."""
+        if self._client.is_closed or self._loop_thread.loop.is_closed():
+            return
+        try:
+            self._loop_thread.run(self._client.aclose(), timeout=5)
+        except Exception as e:
+            print(f"Failed to close API client for {self.base_url}: {str(e)}")
+
+def get_api_client(base_url, timeout=120.0):
+    """
+    The shared client for a backend URL.
+
+    Args:
+        base_url: Backend URL, e.g. "http://0.0.0.0:8000".
+        timeout: Request timeout in seconds.
+
+    Returns:
+        An ApiClient. Under Streamlit the same instance is returned to every
+        session and rerun.
+    """
+    return ApiClient(base_url, timeout=timeout)
+
+if st is not None:
+    get_api_client = st.cache_resource(show_spinner=False)(get_api_client)
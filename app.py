@@ -1,12 +1,13 @@
 import streamlit as st
-import httpx
 import io
-import base64
 import json
 import os
 from PIL import Image
 import streamlit.components.v1 as components
 
+from backend import get_backend
+from session_cache import session_cache, clear_session_cache, content_hash
+
 # Set page configuration
 st.set_page_config(
     page_title="AI Portfolio Generator",
@@ -15,109 +16,388 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# API endpoints
-API_URL = "https://auto-resume-portfolio-1.onrender.com"  # FastAPI backend
+# API endpoints, used when BACKEND_MODE is "http" (see backend.py)
+API_URL = os.environ.get("API_URL", "https://auto-resume-portfolio-1.onrender.com")  # FastAPI backend
+
+# Extraction results kept per session, keyed by the uploaded file's hash
+EXTRACTION_CACHE_SIZE = 8
+
+# The theme catalog only changes with a backend release
+THEMES_CACHE_TTL = 3600
 
 # Function to display formatted error messages
 def show_error(message):
     st.error(f"Error: {message}")
 
-# Function to make API calls
-async def call_api(endpoint, method="GET", data=None, files=None):
-    url = f"{API_URL}{endpoint}"
-    try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            if method == "GET":
-                response = await client.get(url)
-            elif method == "POST":
-                response = await client.post(url, data=data, files=files)
-            
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        error_message = f"HTTP error: {e.response.status_code}"
-        try:
-            error_data = e.response.json()
-            if "message" in error_data:
-                error_message = error_data["message"]
-        except:
-            pass
-        raise Exception(error_message)
-    except httpx.RequestError as e:
-        raise Exception(f"Request error: {str(e)}")
-    except Exception as e:
-        raise Exception(f"Error: {str(e)}")
+# The configured backend: the remote API, or the backend embedded in this process
+def get_portfolio_backend():
+    return get_backend(API_URL, timeout=120.0)
 
 # Function to extract resume information
-async def extract_resume_info(uploaded_file):
-    try:
-        # Call the resume extraction API
-        files = {"file": (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type)}
-        result = await call_api("/extract-resume", method="POST", files=files)
-        
-        if result["status"] == "success":
-            return result["data"]
-        else:
-            raise Exception(result.get("message", "Unknown error"))
-    except Exception as e:
-        raise Exception(f"Failed to extract resume information: {str(e)}")
+def extract_resume_info(uploaded_file):
+    # Re-clicks and reruns with the same file reuse the earlier extraction.
+    # The cache keeps the compact resume; the editor gets a dictionary.
+    file_bytes = uploaded_file.getvalue()
+    cache = session_cache("extraction_cache", EXTRACTION_CACHE_SIZE)
+    cache_key = content_hash(file_bytes)
+    resume = cache.get(cache_key)
+    if resume is None:
+        try:
+            resume = get_portfolio_backend().extract_resume(uploaded_file.name, file_bytes, uploaded_file.type)
+        except Exception as e:
+            raise Exception(f"Failed to extract resume information: {str(e)}")
+        cache.set(cache_key, resume)
+    # Kept so generate and save requests can send only the edits to it
+    st.session_state.extracted_resume = resume
+    return resume.to_dict()
 
-# Function to get available themes
-async def get_themes():
+# Function to get available themes, shared by all sessions; failures are not cached
+@st.cache_data(ttl=THEMES_CACHE_TTL, max_entries=1, show_spinner=False)
+def get_themes():
     try:
-        result = await call_api("/themes")
-        if result["status"] == "success":
-            return result["themes"]
-        else:
-            raise Exception(result.get("message", "Unknown error"))
+        return get_portfolio_backend().get_themes()
     except Exception as e:
         raise Exception(f"Failed to get themes: {str(e)}")
 
-# Function to generate portfolio
-async def generate_portfolio(resume_data, theme, claude_api_key):
+# Function to generate portfolio; returns the HTML, its preview URL (None when embedded) and its page-weight report
+def generate_portfolio(resume_data, theme, claude_api_key):
     try:
-        # Prepare form data
-        data = {
-            "resume_data": str(resume_data),
-            "theme": theme,
-            "claude_api_key": claude_api_key
-        }
-        
-        # Call the portfolio generation API
-        result = await call_api("/generate-portfolio", method="POST", data=data)
-        
-        if result["status"] == "success":
-            return {
-                "html": result["html"],
-                "preview_uri": result["preview_uri"],
-                "zip_base64": result["zip_base64"]
-            }
-        else:
-            raise Exception(result.get("message", "Unknown error"))
+        return get_portfolio_backend().generate_portfolio(
+            resume_data, theme, claude_api_key, extracted=st.session_state.get("extracted_resume")
+        )
     except Exception as e:
         raise Exception(f"Failed to generate portfolio: {str(e)}")
 
+# Function to get a preview URL that is still served, or None when previews are inline.
+# The backend loses previews on restart, reload or eviction; registering the
+# same HTML again brings back the same URL.
+def current_preview_url(portfolio):
+    if portfolio.get("preview_url") is None:
+        return None
+    backend = get_portfolio_backend()
+    try:
+        if not backend.preview_available(portfolio["preview_url"]):
+            portfolio["preview_url"] = backend.register_preview(portfolio["html"])
+    except Exception as e:
+        show_error(str(e))
+    return portfolio["preview_url"]
+
+# Function to display a portfolio preview
+def show_portfolio_preview(portfolio):
+    # By URL the browser loads (and caches) the page itself, so reruns only
+    # resend the URL instead of the whole HTML document
+    preview_url = current_preview_url(portfolio)
+    if preview_url:
+        components.iframe(preview_url, height=500, scrolling=True)
+    else:
+        components.html(portfolio["html"], height=500, scrolling=True)
+
 # Function to save portfolio
-async def save_portfolio(email, portfolio_name, resume_data, theme, html_content):
+def save_portfolio(email, portfolio_name, resume_data, theme, html_content):
     try:
-        # Prepare form data
-        data = {
-            "email": email,
-            "resume_data": json.dumps(resume_data),
-            "theme": theme,
-            "html_content": html_content,
-            "portfolio_name": portfolio_name
-        }
+        portfolio_id = get_portfolio_backend().save_portfolio(
+            email, portfolio_name, resume_data, theme, html_content, extracted=st.session_state.get("extracted_resume")
+        )
+    except Exception as e:
+        raise Exception(f"Failed to save portfolio: {str(e)}")
+    # The My Portfolios gallery pages this session loaded no longer show every portfolio
+    clear_session_cache("gallery_page_cache")
+    return portfolio_id
+
+# Function to offer a ZIP of the generated portfolio when it can't be linked to.
+# It is only built once asked for: compressing, and precompressing the bundle,
+# takes longer than most users who never download it should wait for.
+def archive_download_button(prepare_label, label, key, file_name, bundle):
+    portfolio = st.session_state.generated_portfolio
+    if key not in portfolio:
+        if not st.button(prepare_label, key=f"prepare_{key}"):
+            return
+        with st.spinner("Building the ZIP file..."):
+            try:
+                portfolio[key] = get_portfolio_backend().create_zip(portfolio["html"], bundle=bundle)
+            except Exception as e:
+                show_error(f"Failed to build the ZIP file: {str(e)}")
+                return
+    st.download_button(
+        label=label,
+        data=portfolio[key],
+        file_name=file_name,
+        mime="application/zip"
+    )
+
+# The resume editor, theme picker and portfolio panel are fragments: using a
+# widget inside one reruns only that function, not every tab of the page
+
+# Fragment for editing the extracted resume information
+@st.fragment
+def resume_editor():
+    with st.expander("Edit Resume Information"):
+        # Initialize session state for editing if not already present
+        if "editing_resume" not in st.session_state:
+            st.session_state.editing_resume = False
+            st.session_state.edited_resume_data = st.session_state.resume_data.copy()
+        
+        # Edit personal information
+        st.subheader("Personal Information")
+        
+        # Field edits are batched in a form and applied together when it is submitted
+        with st.form("personal_information"):
+            fields = {}
+            for field, label in [("name", "Name"), ("email", "Email"), ("phone", "Phone")]:
+                # Create columns for displaying and editing
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col1:
+                    st.write(f"{label}:")
+                with col2:
+                    fields[field] = st.text_input(
+                        f"Edit {label}",
+                        value=st.session_state.edited_resume_data.get(field, ""),
+                        label_visibility="collapsed"
+                    )
+            
+            if st.form_submit_button("Update Personal Information"):
+                st.session_state.edited_resume_data.update(fields)
+                st.success("Personal information updated.")
+        
+        # Display and edit sections
+        st.subheader("Resume Sections")
         
-        # Call the save portfolio API
-        result = await call_api("/save-portfolio", method="POST", data=data)
+        # Section tabs: manage sections outside of the main expander
+        section_tabs = st.tabs(["Add New Section", "Edit Existing Sections"])
         
-        if result["status"] == "success":
-            return result["portfolio_id"]
+        with section_tabs[0]:
+            # Add option to create a new section
+            st.subheader("➕ Add New Section")
+            with st.form("new_section", clear_on_submit=True):
+                new_section_name = st.text_input("New Section Name", key="new_section_name")
+                new_section_content = st.text_area("New Section Content", key="new_section_content", height=150)
+                if st.form_submit_button("Add Section"):
+                    if new_section_name and new_section_content:
+                        # Create a copy of sections to avoid modifying during iteration
+                        sections = st.session_state.edited_resume_data.get("sections", {}).copy()
+                        # Add the new section to the edited sections
+                        sections[new_section_name] = new_section_content
+                        st.session_state.edited_resume_data["sections"] = sections
+                        st.success(f"Added new section: {new_section_name}")
+                    else:
+                        st.warning("Please provide both a section name and content.")
+        
+        with section_tabs[1]:
+            # Get sections
+            sections = st.session_state.edited_resume_data.get("sections", {}).copy()
+            if not sections:
+                st.info("No sections available to edit. Add sections in the 'Add New Section' tab.")
+            else:
+                # Create a selectbox to choose which section to edit
+                section_to_edit = st.selectbox("Select section to edit:", list(sections.keys()))
+                
+                if section_to_edit:
+                    st.subheader(f"Editing: {section_to_edit}")
+                    with st.form(f"section_{section_to_edit}"):
+                        edited_content = st.text_area(
+                            f"Section Content",
+                            value=sections[section_to_edit],
+                            height=200,
+                            key=f"edit_{section_to_edit}"
+                        )
+                        
+                        col1, col2 = st.columns([1, 1])
+                        with col1:
+                            update_clicked = st.form_submit_button("Update Section")
+                        with col2:
+                            delete_clicked = st.form_submit_button("Delete Section")
+                    
+                    if update_clicked:
+                        sections[section_to_edit] = edited_content
+                        st.session_state.edited_resume_data["sections"] = sections
+                        st.success(f"Updated {section_to_edit}")
+                    if delete_clicked:
+                        del sections[section_to_edit]
+                        st.session_state.edited_resume_data["sections"] = sections
+                        st.warning(f"Deleted {section_to_edit}")
+                        st.rerun(scope="fragment")
+        
+        # Apply all changes button
+        if st.button("Apply All Changes to Resume"):
+            # Make a deep copy to ensure all nested data is properly copied
+            st.session_state.resume_data = st.session_state.edited_resume_data.copy()
+            
+            # Ensure phone number is updated in both places
+            phone = st.session_state.edited_resume_data.get("phone", "")
+            st.session_state.resume_data["phone"] = phone
+            
+            st.success("All changes applied successfully!")
+            # Add explanation about preview
+            st.info("Click 'Preview Theme' to see your changes reflected in the portfolio.")
+        
+        st.divider()
+        st.info("Note: Changes will be reflected in your portfolio when you preview or generate it.")
+
+# Fragment for choosing and previewing a theme
+@st.fragment
+def theme_picker(claude_api_key):
+    # Theme selection
+    # Use the themes from session state
+    theme = st.selectbox("Select a theme for your portfolio", st.session_state.themes)
+    
+    # Theme description
+    theme_descriptions = {
+        "Professional Classic": "A classic, professional portfolio with a clean, corporate aesthetic suitable for traditional industries.",
+        "Modern Minimalist": "A minimalist portfolio with ample white space, subtle animations, and a focus on typography.",
+        "Netflix Style": "A Netflix-inspired dark theme with card-based content layout and horizontal scrolling.",
+        "Amazon Style": "An Amazon-inspired layout with a user-friendly, information-rich design and clear sections.",
+        "Creative Portfolio": "An artistic portfolio with bold colors, unusual layouts, and creative elements.",
+        "Tech Professional": "A tech-focused portfolio with a dark mode aesthetic and code-like elements."
+    }
+    
+    if theme in theme_descriptions:
+        st.info(theme_descriptions[theme])
+    
+    # Additional customization options
+    st.subheader("Additional Customization")
+    accent_color = st.color_picker("Select accent color", "#4169E1")
+    
+    # Preview theme button
+    if st.button("Preview Theme"):
+        if claude_api_key:
+            with st.spinner("Generating theme preview..."):
+                try:
+                    # Always use the most recent edited resume data for generating the portfolio
+                    if "edited_resume_data" in st.session_state:
+                        resume_data = st.session_state.edited_resume_data.copy()
+                        # Update the main resume data with edited data for consistency
+                        st.session_state.resume_data = st.session_state.edited_resume_data.copy()
+                    else:
+                        resume_data = st.session_state.resume_data.copy()
+                    
+                    resume_data["theme_preferences"] = {
+                        "theme": theme,
+                        "accent_color": accent_color
+                    }
+                    
+                    # Generate preview
+                    preview_data = generate_portfolio(resume_data, theme, claude_api_key)
+                    
+                    # Store the generated portfolio
+                    st.session_state.generated_portfolio = preview_data
+                except Exception as e:
+                    show_error(str(e))
+                else:
+                    # Rerun the whole page once so the 'Generate & Download' tab shows it too
+                    st.rerun()
         else:
-            raise Exception(result.get("message", "Unknown error"))
-    except Exception as e:
-        raise Exception(f"Failed to save portfolio: {str(e)}")
+            st.warning("Please enter your Claude API key in the sidebar.")
+    
+    if st.session_state.generated_portfolio is not None:
+        # Show preview
+        st.subheader("Theme Preview")
+        show_portfolio_preview(st.session_state.generated_portfolio)
+        
+        # Suggest going to the next tab
+        st.info("Like what you see? Proceed to the 'Generate & Download' tab to finalize your portfolio.")
+
+# Fragment for saving and downloading the generated portfolio
+@st.fragment
+def portfolio_panel():
+    # Display the generated portfolio
+    st.subheader("Your Generated Portfolio")
+    show_portfolio_preview(st.session_state.generated_portfolio)
+    
+    # Tell the user if the page may be slow for visitors
+    page_weight = st.session_state.generated_portfolio.get("page_weight")
+    if page_weight and page_weight["over_budget"]:
+        metrics = page_weight["metrics"]
+        over = ", ".join(f"{name.replace('_', ' ')} {metrics[name]}" for name in page_weight["over_budget"])
+        st.warning(f"This portfolio is over its page-weight budget ({over}), so it may load slowly. Generating it again may help.")
+    
+    # Save portfolio section
+    st.subheader("Save Your Portfolio")
+    with st.form("save_portfolio"):
+        col1, col2 = st.columns(2)
+        with col1:
+            email = st.text_input("Email address", key="save_email")
+        with col2:
+            portfolio_name = st.text_input("Portfolio name", value="My Professional Portfolio")
+        save_clicked = st.form_submit_button("Save Portfolio")
+    
+    if save_clicked:
+        if email:
+            with st.spinner("Saving your portfolio..."):
+                try:
+                    theme = st.session_state.resume_data.get("theme_preferences", {}).get("theme", "Professional Classic")
+                    
+                    # Save portfolio
+                    portfolio_id = save_portfolio(
+                        email=email,
+                        portfolio_name=portfolio_name,
+                        resume_data=st.session_state.resume_data,
+                        theme=theme,
+                        html_content=st.session_state.generated_portfolio["html"]
+                    )
+                    
+                    st.success(f"Portfolio saved successfully! Portfolio ID: {portfolio_id}")
+                    st.info("You can view all your saved portfolios in the 'My Portfolios' page.")
+                except Exception as e:
+                    show_error(str(e))
+        else:
+            st.warning("Please enter your email address to save the portfolio.")
+    
+    # Download options
+    st.subheader("Download Options")
+    
+    col1, col2, col3 = st.columns(3)
+    preview_url = current_preview_url(st.session_state.generated_portfolio)
+    
+    with col1:
+        # Download HTML file
+        if preview_url:
+            st.link_button("Download HTML", f"{preview_url}?download=true")
+        else:
+            st.download_button(
+                label="Download HTML",
+                data=st.session_state.generated_portfolio["html"],
+                file_name="portfolio.html",
+                mime="text/html"
+            )
+    
+    with col2:
+        # Download ZIP file, built by the backend when the link is opened
+        if preview_url:
+            st.link_button("Download as ZIP", f"{preview_url}/zip")
+        else:
+            archive_download_button("Prepare ZIP", "Download as ZIP", "zip_bytes", "portfolio.zip", bundle=False)
+    
+    with col3:
+        # Styles and scripts as cacheable files, for hosting on a CDN
+        if preview_url:
+            st.link_button("Download static bundle", f"{preview_url}/zip?bundle=true&precompress=true")
+        else:
+            archive_download_button("Prepare static bundle", "Download static bundle", "bundle_zip_bytes", "portfolio-bundle.zip", bundle=True)
+    
+    # Deployment instructions
+    with st.expander("Deployment Instructions"):
+        st.markdown("""
+        ### How to deploy your portfolio website
+        
+        #### Option 1: Deploy on Netlify
+        1. Create a free account on [Netlify](https://www.netlify.com/)
+        2. From the Netlify dashboard, click on "Add new site" > "Deploy manually"
+        3. Drag and drop your HTML file or the extracted ZIP contents
+        4. Your site will be deployed instantly with a Netlify subdomain
+        
+        #### Option 2: Deploy on Vercel
+        1. Create a free account on [Vercel](https://vercel.com/)
+        2. From the Vercel dashboard, click on "New Project"
+        3. Import your project from GitHub (you'll need to push your HTML file to a repository)
+        4. Follow the prompts to deploy
+        
+        #### Option 3: Deploy on GitHub Pages
+        1. Create a GitHub repository
+        2. Upload your HTML file and rename it to "index.html"
+        3. Go to repository settings > Pages > and enable GitHub Pages
+        4. Your site will be available at https://yourusername.github.io/repositoryname/
+        """)
+
 
 # Main application
 def main():
@@ -155,6 +435,12 @@ def main():
             else:
                 claude_api_key = st.text_input("Claude API Key", type="password", help="Enter your Anthropic Claude API key")
                 st.info("Your API key is required to use the AI features. It's stored only in your session.")
+            
+            # Cached extractions and themes can be dropped, e.g. after a backend update
+            if st.button("Clear cached results"):
+                session_cache("extraction_cache", EXTRACTION_CACHE_SIZE).clear()
+                get_themes.clear()
+                st.success("Cached results cleared.")
         
         # File uploader for resume
         uploaded_file = st.file_uploader("Upload your resume (PDF format only)", type=["pdf"])
@@ -167,23 +453,12 @@ def main():
             if st.button("Extract Resume Information"):
                 with st.spinner("Extracting information from your resume..."):
                     try:
-                        # Use nest_asyncio to allow running asyncio in Streamlit
-                        import nest_asyncio
-                        nest_asyncio.apply()
-                        
-                        # Create a new event loop
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        
                         # Get resume information
-                        st.session_state.resume_data = loop.run_until_complete(extract_resume_info(uploaded_file))
+                        st.session_state.resume_data = extract_resume_info(uploaded_file)
                         st.success("Resume information extracted successfully!")
                         
                         # Get available themes
-                        st.session_state.themes = loop.run_until_complete(get_themes())
-                        
-                        # Cleanup
-                        loop.close()
+                        st.session_state.themes = get_themes()
                         
                         # Suggest going to the next tab
                         st.info("Proceed to the 'Customize Theme' tab to continue.")
@@ -195,298 +470,25 @@ def main():
     with tab2:
         st.header("Customize Your Portfolio")
         st.write("Select a theme and customize your portfolio appearance.")
-        
+
         if st.session_state.resume_data is None:
             st.info("Please upload and extract your resume information in the 'Upload Resume' tab first.")
         else:
-            # Display and edit extracted resume information
-            with st.expander("Edit Resume Information"):
-                # Initialize session state for editing if not already present
-                if "editing_resume" not in st.session_state:
-                    st.session_state.editing_resume = False
-                    st.session_state.edited_resume_data = st.session_state.resume_data.copy()
-                
-                # Edit personal information
-                st.subheader("Personal Information")
-                
-                # Create columns for displaying and editing
-                col1, col2, col3 = st.columns([1, 2, 1])
-                
-                with col1:
-                    st.write("Name:")
-                with col2:
-                    st.session_state.edited_resume_data["name"] = st.text_input(
-                        "Edit Name", 
-                        value=st.session_state.edited_resume_data.get("name", ""),
-                        label_visibility="collapsed"
-                    )
-                
-                col1, col2, col3 = st.columns([1, 2, 1])
-                with col1:
-                    st.write("Email:")
-                with col2:
-                    st.session_state.edited_resume_data["email"] = st.text_input(
-                        "Edit Email", 
-                        value=st.session_state.edited_resume_data.get("email", ""),
-                        label_visibility="collapsed"
-                    )
-                
-                col1, col2, col3 = st.columns([1, 2, 1])
-                with col1:
-                    st.write("Phone:")
-                with col2:
-                    st.session_state.edited_resume_data["phone"] = st.text_input(
-                        "Edit Phone", 
-                        value=st.session_state.edited_resume_data.get("phone", ""),
-                        label_visibility="collapsed"
-                    )
-                
-                # Display and edit sections
-                st.subheader("Resume Sections")
-                
-                # Section tabs: manage sections outside of the main expander
-                section_tabs = st.tabs(["Add New Section", "Edit Existing Sections"])
-                
-                with section_tabs[0]:
-                    # Add option to create a new section
-                    st.subheader("➕ Add New Section")
-                    new_section_name = st.text_input("New Section Name", key="new_section_name")
-                    new_section_content = st.text_area("New Section Content", key="new_section_content", height=150)
-                    if st.button("Add Section"):
-                        if new_section_name and new_section_content:
-                            # Create a copy of sections to avoid modifying during iteration
-                            sections = st.session_state.edited_resume_data.get("sections", {}).copy()
-                            # Add the new section to the edited sections
-                            sections[new_section_name] = new_section_content
-                            st.session_state.edited_resume_data["sections"] = sections
-                            st.success(f"Added new section: {new_section_name}")
-                            st.rerun()
-                        else:
-                            st.warning("Please provide both a section name and content.")
-                
-                with section_tabs[1]:
-                    # Get sections
-                    sections = st.session_state.edited_resume_data.get("sections", {}).copy()
-                    if not sections:
-                        st.info("No sections available to edit. Add sections in the 'Add New Section' tab.")
-                    else:
-                        # Create a selectbox to choose which section to edit
-                        section_to_edit = st.selectbox("Select section to edit:", list(sections.keys()))
-                        
-                        if section_to_edit:
-                            st.subheader(f"Editing: {section_to_edit}")
-                            edited_content = st.text_area(
-                                f"Section Content", 
-                                value=sections[section_to_edit],
-                                height=200,
-                                key=f"edit_{section_to_edit}"
-                            )
-                            
-                            col1, col2 = st.columns([1, 1])
-                            with col1:
-                                if st.button(f"Update Section", key=f"update_{section_to_edit}"):
-                                    sections[section_to_edit] = edited_content
-                                    st.session_state.edited_resume_data["sections"] = sections
-                                    st.success(f"Updated {section_to_edit}")
-                            with col2:
-                                if st.button(f"Delete Section", key=f"delete_{section_to_edit}"):
-                                    del sections[section_to_edit]
-                                    st.session_state.edited_resume_data["sections"] = sections
-                                    st.warning(f"Deleted {section_to_edit}")
-                                    st.rerun()
-                
-                # Apply all changes button
-                if st.button("Apply All Changes to Resume"):
-                    # Make a deep copy to ensure all nested data is properly copied
-                    st.session_state.resume_data = st.session_state.edited_resume_data.copy()
-                    
-                    # Ensure phone number is updated in both places
-                    phone = st.session_state.edited_resume_data.get("phone", "")
-                    st.session_state.resume_data["phone"] = phone
-                    
-                    st.success("All changes applied successfully!")
-                    # Add explanation about preview
-                    st.info("Click 'Preview Theme' to see your changes reflected in the portfolio.")
-                    
-                st.divider()
-                st.info("Note: Changes will be reflected in your portfolio when you preview or generate it.")
-            
-            # Theme selection
-            # Use the themes from session state
-            theme = st.selectbox("Select a theme for your portfolio", st.session_state.themes)
-            
-            # Theme description
-            theme_descriptions = {
-                "Professional Classic": "A classic, professional portfolio with a clean, corporate aesthetic suitable for traditional industries.",
-                "Modern Minimalist": "A minimalist portfolio with ample white space, subtle animations, and a focus on typography.",
-                "Netflix Style": "A Netflix-inspired dark theme with card-based content layout and horizontal scrolling.",
-                "Amazon Style": "An Amazon-inspired layout with a user-friendly, information-rich design and clear sections.",
-                "Creative Portfolio": "An artistic portfolio with bold colors, unusual layouts, and creative elements.",
-                "Tech Professional": "A tech-focused portfolio with a dark mode aesthetic and code-like elements."
-            }
-            
-            if theme in theme_descriptions:
-                st.info(theme_descriptions[theme])
-            
-            # Additional customization options
-            st.subheader("Additional Customization")
-            accent_color = st.color_picker("Select accent color", "#4169E1")
-            
-            # Preview theme button
-            if st.button("Preview Theme"):
-                if claude_api_key:
-                    with st.spinner("Generating theme preview..."):
-                        try:
-                            # Always use the most recent edited resume data for generating the portfolio
-                            if "edited_resume_data" in st.session_state:
-                                resume_data = st.session_state.edited_resume_data.copy()
-                                # Update the main resume data with edited data for consistency
-                                st.session_state.resume_data = st.session_state.edited_resume_data.copy()
-                            else:
-                                resume_data = st.session_state.resume_data.copy()
-                                
-                            resume_data["theme_preferences"] = {
-                                "theme": theme,
-                                "accent_color": accent_color
-                            }
-                            
-                            # Use nest_asyncio to allow running asyncio in Streamlit
-                            import nest_asyncio
-                            nest_asyncio.apply()
-                            
-                            # Create a new event loop
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            
-                            # Generate preview
-                            preview_data = loop.run_until_complete(generate_portfolio(resume_data, theme, claude_api_key))
-                            
-                            # Cleanup
-                            loop.close()
-                            
-                            # Show preview
-                            st.subheader("Theme Preview")
-                            components.html(preview_data["html"], height=500, scrolling=True)
-                            
-                            # Store the generated portfolio
-                            st.session_state.generated_portfolio = preview_data
-                            
-                            # Suggest going to the next tab
-                            st.info("Like what you see? Proceed to the 'Generate & Download' tab to finalize your portfolio.")
-                        except Exception as e:
-                            show_error(str(e))
-                else:
-                    st.warning("Please enter your Claude API key in the sidebar.")
-    
+            resume_editor()
+            theme_picker(claude_api_key)
+
     # Tab 3: Generate and download portfolio
     with tab3:
         st.header("Generate & Download Your Portfolio")
         st.write("Generate your final portfolio and download it for deployment.")
-        
+
         if st.session_state.resume_data is None:
             st.info("Please upload and extract your resume information in the 'Upload Resume' tab first.")
         elif st.session_state.generated_portfolio is None:
             st.info("Please customize and preview your theme in the 'Customize Theme' tab first.")
         else:
-            # Display the generated portfolio
-            st.subheader("Your Generated Portfolio")
-            components.html(st.session_state.generated_portfolio["html"], height=500, scrolling=True)
-            
-            # Save portfolio section
-            st.subheader("Save Your Portfolio")
-            col1, col2 = st.columns(2)
-            with col1:
-                email = st.text_input("Email address", key="save_email")
-            with col2:
-                portfolio_name = st.text_input("Portfolio name", value="My Professional Portfolio")
-                
-            if st.button("Save Portfolio"):
-                if email:
-                    with st.spinner("Saving your portfolio..."):
-                        try:
-                            theme = st.session_state.resume_data.get("theme_preferences", {}).get("theme", "Professional Classic")
-                            
-                            # Use nest_asyncio for async operations
-                            import nest_asyncio
-                            nest_asyncio.apply()
-                            
-                            # Create a new event loop
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            
-                            # Save portfolio
-                            portfolio_id = loop.run_until_complete(save_portfolio(
-                                email=email,
-                                portfolio_name=portfolio_name,
-                                resume_data=st.session_state.resume_data,
-                                theme=theme,
-                                html_content=st.session_state.generated_portfolio["html"]
-                            ))
-                            
-                            # Cleanup
-                            loop.close()
-                            
-                            st.success(f"Portfolio saved successfully! Portfolio ID: {portfolio_id}")
-                            st.info("You can view all your saved portfolios in the 'My Portfolios' page.")
-                        except Exception as e:
-                            show_error(str(e))
-                else:
-                    st.warning("Please enter your email address to save the portfolio.")
-            
-            # Download options
-            st.subheader("Download Options")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Download HTML file
-                st.download_button(
-                    label="Download HTML",
-                    data=st.session_state.generated_portfolio["html"],
-                    file_name="portfolio.html",
-                    mime="text/html"
-                )
-            
-            with col2:
-                # Download ZIP file
-                zip_bytes = base64.b64decode(st.session_state.generated_portfolio["zip_base64"])
-                st.download_button(
-                    label="Download as ZIP",
-                    data=zip_bytes,
-                    file_name="portfolio.zip",
-                    mime="application/zip"
-                )
-            
-            # Deployment instructions
-            with st.expander("Deployment Instructions"):
-                st.markdown("""
-                ### How to deploy your portfolio website
-                
-                #### Option 1: Deploy on Netlify
-                1. Create a free account on [Netlify](https://www.netlify.com/)
-                2. From the Netlify dashboard, click on "Add new site" > "Deploy manually"
-                3. Drag and drop your HTML file or the extracted ZIP contents
-                4. Your site will be deployed instantly with a Netlify subdomain
-                
-                #### Option 2: Deploy on Vercel
-                1. Create a free account on [Vercel](https://vercel.com/)
-                2. From the Vercel dashboard, click on "New Project"
-                3. Import your project from GitHub (you'll need to push your HTML file to a repository)
-                4. Follow the prompts to deploy
-                
-                #### Option 3: Deploy on GitHub Pages
-                1. Create a GitHub repository
-                2. Upload your HTML file and rename it to "index.html"
-                3. Go to repository settings > Pages > and enable GitHub Pages
-                4. Your site will be available at https://yourusername.github.io/repositoryname/
-                """)
+            portfolio_panel()
 
 # Run the application
 if __name__ == "__main__":
-    import asyncio
-    
-    # Add async support to Streamlit
-    async def main_async():
-        main()
-    
-    asyncio.run(main_async())
+    main()
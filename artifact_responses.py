@@ -0,0 +1,147 @@
+"""
+HTTP responses for serving stored artifacts with byte-range support.
+
+File-backed artifacts are sent with the ASGI zero-copy extension
+(``http.response.zerocopy``) when the server offers it, so the kernel can
+sendfile the data; otherwise the file is streamed in chunks.
+"""
+import anyio
+from starlette.responses import Response
+
+HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+
+def parse_range(range_header, size):
+    """
+    Parse a single-range HTTP Range header.
+
+    Args:
+        range_header: Value of the Range header, or None.
+        size: Total size of the artifact in bytes.
+
+    Returns:
+        Tuple (start, end) inclusive, None to serve the whole artifact, or
+        "unsatisfiable" when the range lies outside the artifact.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    # Multiple ranges would need a multipart response; serving the full body is allowed
+    if "," in spec:
+        return None
+
+    start_text, _, end_text = spec.partition("-")
+    try:
+        if start_text == "":
+            suffix = int(end_text)
+            if suffix <= 0:
+                return "unsatisfiable"
+            return max(size - suffix, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+def artifact_headers(etag, cache_control):
+    """Headers shared by every artifact response."""
+    return {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{etag}"',
+        "Cache-Control": cache_control
+    }
+
+def not_modified(request, etag):
+    """Whether the client already holds this version of the artifact."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return any(tag.strip().strip('"').removeprefix("W/").strip('"') == etag for tag in if_none_match.split(","))
+
+class FileRangeResponse(Response):
+    """
+    Sends a byte range of a file, using sendfile via the ASGI zero-copy extension when available.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path, start, end, status_code=200, headers=None, media_type=HTML_MEDIA_TYPE):
+        self.path = path
+        self.start = start
+        self.end = end
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        count = self.end - self.start + 1
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            with open(self.path, "rb") as artifact:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": artifact,
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False
+                })
+            return
+
+        async with await anyio.open_file(self.path, "rb") as artifact:
+            await artifact.seek(self.start)
+            remaining = count
+            while remaining > 0:
+                chunk = await artifact.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0 or count == 0:
+                # Empty artifact, or the file was shorter than expected
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def ranged_response(request, etag, size, path=None, data=None, cache_control="public, max-age=300",
+                    media_type=HTML_MEDIA_TYPE):
+    """
+    Build a 200, 206, 304 or 416 response for an artifact held in a file or in memory.
+
+    Args:
+        request: Incoming request, for its Range and If-None-Match headers.
+        etag: Content hash used as the entity tag.
+        size: Artifact size in bytes.
+        path: Local file path of the artifact, for file-backed artifacts.
+        data: Artifact bytes, for artifacts held in memory.
+        cache_control: Cache-Control header value.
+        media_type: Content type of the artifact.
+
+    Returns:
+        Starlette response.
+    """
+    headers = artifact_headers(etag, cache_control)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = parse_range(request.headers.get("range"), size)
+    if byte_range == "unsatisfiable":
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    if path is not None:
+        return FileRangeResponse(path, start, end, status_code=status_code, headers=headers, media_type=media_type)
+    return Response(content=data[start:end + 1], status_code=status_code, headers=headers, media_type=media_type)
@@ -0,0 +1,286 @@
+"""
+Pluggable storage for large portfolio artifacts.
+
+Portfolio HTML blobs can live outside the relational database, which then
+keeps only each blob's key, size and hash. The backend is chosen with the
+ARTIFACT_STORE environment variable:
+
+    db     Keep compressed blobs in the html_blobs table (default).
+    local  Store files under ARTIFACT_DIR (default "artifacts").
+    s3     Store objects in ARTIFACT_S3_BUCKET through boto3, optionally at
+           ARTIFACT_S3_ENDPOINT for S3-compatible services.
+
+Artifacts are content-addressed: a key is derived from the content hash and
+writing the same key twice is harmless. Writing an existing key refreshes its
+modification time, which the orphaned-artifact sweep (see
+PortfolioStore.sweep_orphaned_artifacts) treats as a sign that a save is
+about to reference it.
+"""
+import os
+import tempfile
+
+# Where artifacts are moved before the sweep deletes them
+QUARANTINE_PREFIX = "quarantine/"
+
+class ArtifactStore:
+    """
+    Interface implemented by artifact store backends.
+    """
+
+    def key_for(self, content_hash):
+        """Storage key for content with the given hash."""
+        return f"html/{content_hash[:2]}/{content_hash}.html"
+
+    def put(self, key, data):
+        """Store bytes under key."""
+        raise NotImplementedError
+
+    def get(self, key):
+        """Return the bytes stored under key."""
+        raise NotImplementedError
+
+    def get_range(self, key, start, end):
+        """Return bytes start..end (inclusive) stored under key."""
+        return self.get(key)[start:end + 1]
+
+    def exists(self, key):
+        """Whether key is stored."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove key if it is stored."""
+        raise NotImplementedError
+
+    def list_keys(self, prefix):
+        """Yield (key, modification time in seconds since the epoch) for each key starting with prefix."""
+        raise NotImplementedError
+
+    def modified_time(self, key):
+        """Modification time of key in seconds since the epoch, or None if it is not stored."""
+        raise NotImplementedError
+
+    def quarantine(self, key):
+        """
+        Move key under QUARANTINE_PREFIX, where reads and writes of key no longer see it.
+
+        A put() of key after the move writes a new file instead of reusing
+        the moved one, so the moved one can be checked and deleted safely.
+
+        Returns:
+            Tuple of (quarantine key, modification time of the moved
+            artifact), or None if key is not stored.
+        """
+        raise NotImplementedError
+
+    def restore(self, quarantine_key, key):
+        """Move a quarantined artifact back to key."""
+        raise NotImplementedError
+
+    def local_path(self, key):
+        """Filesystem path of key for zero-copy serving, or None if the backend is remote."""
+        return None
+
+class LocalArtifactStore(ArtifactStore):
+    """
+    Stores artifacts as files in a local directory.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def local_path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        # Keys are generated internally, but never let one escape the root
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Invalid artifact key: {key}")
+        return path
+
+    def put(self, key, data):
+        path = self.local_path(key)
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+                return
+            except FileNotFoundError:
+                # Swept meanwhile; write it again
+                pass
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial artifact
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def get(self, key):
+        with open(self.local_path(key), "rb") as artifact:
+            return artifact.read()
+
+    def get_range(self, key, start, end):
+        with open(self.local_path(key), "rb") as artifact:
+            artifact.seek(start)
+            return artifact.read(end - start + 1)
+
+    def exists(self, key):
+        return os.path.exists(self.local_path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def list_keys(self, prefix):
+        # Left-over temporary files are listed too, so the sweep removes them
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if not key.startswith(prefix):
+                    continue
+                try:
+                    yield key, os.path.getmtime(path)
+                except FileNotFoundError:
+                    pass
+
+    def modified_time(self, key):
+        try:
+            return os.path.getmtime(self.local_path(key))
+        except FileNotFoundError:
+            return None
+
+    def quarantine(self, key):
+        quarantine_key = QUARANTINE_PREFIX + key
+        path = self.local_path(quarantine_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            # A rename is atomic and keeps the time a last put() set
+            os.replace(self.local_path(key), path)
+        except FileNotFoundError:
+            return None
+        return quarantine_key, os.path.getmtime(path)
+
+    def restore(self, quarantine_key, key):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            # Content-addressed, so replacing a file a put() wrote meanwhile changes nothing
+            os.replace(self.local_path(quarantine_key), path)
+        except FileNotFoundError:
+            # Another worker's sweep dealt with it
+            pass
+
+class S3ArtifactStore(ArtifactStore):
+    """
+    Stores artifacts in an S3 or S3-compatible bucket. Requires boto3.
+    """
+
+    def __init__(self, bucket, endpoint_url=None, prefix=""):
+        try:
+            import boto3
+        except ImportError:
+            raise ImportError("The s3 artifact store requires the boto3 package")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _object_key(self, key):
+        return f"{self.prefix}{key}"
+
+    def put(self, key, data):
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+
+    def get(self, key):
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        return response["Body"].read()
+
+    def get_range(self, key, start, end):
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=self._object_key(key), Range=f"bytes={start}-{end}"
+        )
+        return response["Body"].read()
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError:
+            return False
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def list_keys(self, prefix):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._object_key(prefix)):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(self.prefix):], item["LastModified"].timestamp()
+
+    def modified_time(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError:
+            return None
+        return response["LastModified"].timestamp()
+
+    def quarantine(self, key):
+        # S3 has no rename. The time is read before the copy, so a put()
+        # between the two can't be told apart; the sweep's reference
+        # re-check after the move covers saves that committed by then.
+        modified = self.modified_time(key)
+        if modified is None:
+            return None
+        quarantine_key = QUARANTINE_PREFIX + key
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=self._object_key(quarantine_key),
+            CopySource={"Bucket": self.bucket, "Key": self._object_key(key)}
+        )
+        self.delete(key)
+        return quarantine_key, modified
+
+    def restore(self, quarantine_key, key):
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            CopySource={"Bucket": self.bucket, "Key": self._object_key(quarantine_key)}
+        )
+        self.delete(quarantine_key)
+
+_store = None
+
+def get_artifact_store():
+    """
+    The configured artifact store, created on first use.
+
+    Returns:
+        An ArtifactStore, or None when blobs are kept in the database.
+    """
+    global _store
+    if _store is None:
+        backend = os.environ.get("ARTIFACT_STORE", "db")
+        if backend == "local":
+            _store = LocalArtifactStore(os.environ.get("ARTIFACT_DIR", "artifacts"))
+        elif backend == "s3":
+            _store = S3ArtifactStore(
+                os.environ["ARTIFACT_S3_BUCKET"],
+                endpoint_url=os.environ.get("ARTIFACT_S3_ENDPOINT"),
+                prefix=os.environ.get("ARTIFACT_S3_PREFIX", "")
+            )
+        elif backend != "db":
+            raise ValueError(f"Unknown ARTIFACT_STORE backend: {backend}")
+    return _store
+
+def set_artifact_store(store):
+    """Replace the configured artifact store, e.g. for scripts and benchmarks."""
+    global _store
+    _store = store
@@ -0,0 +1,363 @@
+"""
+The backend the Streamlit pages talk to, over HTTP or embedded in-process.
+
+BACKEND_MODE selects it:
+
+    http      Call the FastAPI backend at the page's API_URL (default). Use
+              this when the frontend and backend are deployed separately.
+    embedded  Run the backend in the Streamlit process. Resume extraction
+              runs directly on the parser in a pool of worker processes,
+              and generation calls the LLM client directly. Results come
+              back as Python objects, so there is no JSON or base64 step.
+              The database endpoints go through the FastAPI app itself via
+              an in-memory ASGI transport, so they keep the same caching
+              and validation without a network hop.
+
+Environment variables:
+    BACKEND_MODE: "http" (default) or "embedded".
+    EMBEDDED_WORKERS: Extraction worker processes in embedded mode
+        (default: the CPU count, at most 4).
+    PUBLIC_API_URL: Backend URL as the user's browser reaches it, used for
+        preview and download links in http mode (default: the page's API_URL).
+"""
+import atexit
+import io
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from api_client import ApiClient, ApiError, get_api_client
+from resume_model import ParsedResume, resume_patch
+
+try:
+    import streamlit as st
+except ImportError:
+    st = None
+
+BACKEND_MODE = os.environ.get("BACKEND_MODE", "http")
+EMBEDDED_WORKERS = int(os.environ.get("EMBEDDED_WORKERS", str(min(4, os.cpu_count() or 1))))
+PUBLIC_API_URL = os.environ.get("PUBLIC_API_URL")
+
+def _load_parser():
+    """Import the PDF parser in a worker process before the first upload needs it."""
+    import resume_processor
+
+def _process_resume(file_bytes):
+    """Extract resume information in a worker process; the compact result pickles at about half the size."""
+    from resume_processor import ResumeProcessor
+    return ResumeProcessor.parse_resume(io.BytesIO(file_bytes))
+
+def _resume_json(resume_data):
+    """A resume dictionary as compact JSON, sending text the sections share with full_text once."""
+    resume_data = {key: value for key, value in resume_data.items() if key != "resume_id"}
+    return json.dumps(ParsedResume.from_dict(resume_data).to_wire())
+
+def _resume_fields(resume_data, extracted):
+    """
+    Form fields sending a resume to the backend.
+
+    Args:
+        resume_data: Dictionary containing resume information, possibly edited.
+        extracted: The ParsedResume it was edited from, or None.
+
+    Returns:
+        The stored extraction's resume_id and a patch of the user's edits if
+        the backend has it, otherwise the whole resume as resume_data.
+    """
+    resume_id = resume_data.get("resume_id")
+    if extracted is not None and resume_id and extracted.extra.get("resume_id") == resume_id:
+        return {"resume_id": resume_id, "resume_patch": json.dumps(resume_patch(extracted.to_dict(), resume_data))}
+    return {"resume_data": _resume_json(resume_data)}
+
+def _result(result, key):
+    """Return result[key] from a successful API response, or raise its error message."""
+    if result["status"] == "success":
+        return result[key]
+    raise Exception(result.get("message", "Unknown error"))
+
+class HttpBackend:
+    """
+    Calls every endpoint of the FastAPI backend through an ApiClient.
+    """
+
+    # Saved portfolios' HTML is loaded by the browser from portfolio_html_url,
+    # so portfolio details are fetched without it
+    details_include_html = False
+
+    def __init__(self, api, public_url=None):
+        self.api = api
+        self.public_url = (public_url or api.base_url).rstrip("/")
+
+    def extract_resume(self, filename, file_bytes, content_type):
+        """
+        Extract structured information from a resume PDF.
+
+        Args:
+            filename: Name of the uploaded file.
+            file_bytes: PDF contents.
+            content_type: MIME type of the upload.
+
+        Returns:
+            A ParsedResume; to_dict() gives the resume dictionary. Its
+            "resume_id" extra key, if any, references the backend's copy.
+        """
+        files = {"file": (filename, file_bytes, content_type)}
+        result = self.api.post("/extract-resume", files=files, params={"compact": "true"})
+        resume = ParsedResume.from_wire(_result(result, "data"))
+        if result.get("resume_id"):
+            resume.extra["resume_id"] = result["resume_id"]
+        return resume
+
+    def _post_resume(self, endpoint, data, resume_data, extracted):
+        """
+        POST form data with a resume, by reference when possible.
+
+        If the backend no longer has the referenced extraction (it expired
+        or another worker served the upload), the whole resume is sent instead.
+        """
+        fields = _resume_fields(resume_data, extracted)
+        try:
+            return self.api.post(endpoint, data={**data, **fields})
+        except ApiError as e:
+            if e.status_code != 404 or "resume_data" in fields:
+                raise
+        return self.api.post(endpoint, data={**data, "resume_data": _resume_json(resume_data)})
+
+    def get_themes(self):
+        """List the available theme names."""
+        return _result(self.api.get("/themes"), "themes")
+
+    def generate_portfolio(self, resume_data, theme, claude_api_key, extracted=None):
+        """
+        Generate a portfolio website.
+
+        Args:
+            resume_data: Dictionary containing resume information.
+            theme: Selected theme for the portfolio.
+            claude_api_key: API key for Anthropic's Claude.
+            extracted: The ParsedResume resume_data was edited from, if
+                known; then only the edits are uploaded.
+
+        Returns:
+            Dictionary with the portfolio "html", its "preview_url", which
+            serves the HTML and, under /zip, the ZIP package, and its
+            "page_weight" report.
+        """
+        result = self._post_resume("/generate-portfolio", {
+            "theme": theme,
+            "claude_api_key": claude_api_key
+        }, resume_data, extracted)
+        return {
+            "html": _result(result, "html"),
+            "preview_url": self.public_url + result["preview_url"],
+            "page_weight": result.get("page_weight")
+        }
+
+    def register_preview(self, html_content):
+        """
+        Store HTML on the backend so it can be previewed and downloaded by URL.
+
+        Returns:
+            Absolute preview URL, or None if previews are not served by URL.
+        """
+        return self.public_url + _result(self.api.post("/previews", data={"html_content": html_content}), "preview_url")
+
+    def preview_available(self, preview_url):
+        """
+        Whether the backend still serves a preview URL from register_preview().
+
+        Previews are kept in an evictable cache and are lost on restart;
+        registering the same HTML again restores the same URL.
+        """
+        return self.api.status("HEAD", preview_url[len(self.public_url):]) == 200
+
+    def portfolio_html_url(self, portfolio_id):
+        """URL serving a saved portfolio's HTML, or None if not served by URL."""
+        return f"{self.public_url}/portfolio/{portfolio_id}/html"
+
+    def save_portfolio(self, email, portfolio_name, resume_data, theme, html_content, extracted=None):
+        """
+        Save a portfolio for a user.
+
+        Args:
+            extracted: The ParsedResume resume_data was edited from, if
+                known; then only the edits are uploaded.
+
+        Returns:
+            ID of the saved portfolio.
+        """
+        return _result(self._post_resume("/save-portfolio", {
+            "email": email,
+            "theme": theme,
+            "html_content": html_content,
+            "portfolio_name": portfolio_name
+        }, resume_data, extracted), "portfolio_id")
+
+    def get_user_portfolios(self, email):
+        """List a user's portfolios."""
+        return _result(self.api.get(f"/user-portfolios/{email}"), "portfolios")
+
+    def get_user_portfolios_page(self, email, page, page_size):
+        """
+        Get one page of a user's portfolio summaries, newest first.
+
+        Returns:
+            Tuple of (total portfolios, list of summaries on this page).
+        """
+        result = self.api.get(f"/user-portfolios/{email}", params={"page": page, "page_size": page_size})
+        return _result(result, "total"), result["portfolios"]
+
+    def _portfolio_params(self):
+        return {"include_html": "true" if self.details_include_html else "false"}
+
+    def get_portfolio(self, portfolio_id):
+        """Get a portfolio with its resume, and its HTML when portfolio_html_url() is None."""
+        return _result(self.api.get(f"/portfolio/{portfolio_id}", params=self._portfolio_params()), "portfolio")
+
+    async def _aget_portfolio(self, portfolio_id):
+        result = await self.api.arequest("GET", f"/portfolio/{portfolio_id}", params=self._portfolio_params())
+        return _result(result, "portfolio")
+
+    def prefetch_portfolios(self, portfolio_ids):
+        """
+        Start fetching several portfolios concurrently without waiting for them.
+
+        Args:
+            portfolio_ids: IDs of the portfolios to fetch.
+
+        Returns:
+            Dictionary mapping each ID to a concurrent.futures.Future of its portfolio.
+        """
+        return {
+            portfolio_id: self.api.submit(self._aget_portfolio(portfolio_id))
+            for portfolio_id in portfolio_ids
+        }
+
+    def delete_portfolio(self, portfolio_id):
+        """Delete a portfolio. Returns True once it is deleted."""
+        _result(self.api.delete(f"/portfolio/{portfolio_id}"), "message")
+        return True
+
+class EmbeddedBackend(HttpBackend):
+    """
+    Runs extraction and generation in-process and the database endpoints on the embedded app.
+    """
+
+    # Pages show saved portfolios' HTML inline, as there is no URL to load it from
+    details_include_html = True
+
+    def __init__(self, workers=EMBEDDED_WORKERS):
+        import httpx
+        from api import app
+
+        super().__init__(ApiClient("http://embedded", transport=httpx.ASGITransport(app=app)))
+
+        # The embedded app owns its database, so it creates any missing
+        # tables itself instead of waiting for CREATE_SCHEMA or `python database.py`
+        import database
+        database.create_schema()
+
+        # Same startup as the server: engines, optional schema creation, warmup
+        self._lifespan = app.router.lifespan_context(app)
+        self.api._loop_thread.run(self._lifespan.__aenter__())
+
+        # PDF parsing holds the GIL, so parallel uploads need processes.
+        # Spawned workers don't inherit the Streamlit server's threads.
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        for _ in range(workers):
+            self._pool.submit(_load_parser)
+        atexit.register(self.close)
+
+    def extract_resume(self, filename, file_bytes, content_type):
+        # The same pre-flight check as /extract-resume, so scans and
+        # oversized files never reach a worker
+        from pdf_triage import triage_pdf
+        triage = triage_pdf(file_bytes)
+        if triage.status_code is not None:
+            raise ApiError(triage.message, triage.status_code)
+        return self._pool.submit(_process_resume, file_bytes).result()
+
+    def get_themes(self):
+        from theme_templates import ThemeTemplates
+        return ThemeTemplates.get_theme_options()
+
+    def generate_portfolio(self, resume_data, theme, claude_api_key, extracted=None):
+        from portfolio_generator import PortfolioGenerator
+        generator = PortfolioGenerator(claude_api_key)
+        # The LLM call waits on the network, so it runs in the session's own thread
+        html_content = generator.generate_portfolio(resume_data, theme)
+        # The embedded app has no address a browser can load, so the page
+        # shows the HTML inline and builds the ZIP files with create_zip
+        return {
+            "html": html_content,
+            "preview_url": None,
+            "page_weight": generator.page_weight.to_dict()
+        }
+
+    def create_zip(self, html_content, bundle=False):
+        """
+        Build a portfolio's ZIP package, for pages that can't link to /previews/{hash}/zip.
+
+        Args:
+            html_content: HTML string of the portfolio.
+            bundle: Build the static bundle, with precompressed copies, instead.
+
+        Returns:
+            ZIP file as bytes.
+        """
+        if bundle:
+            from static_bundle import create_bundle_zip
+            return create_bundle_zip(html_content, precompress=True)
+        from portfolio_generator import PortfolioGenerator
+        return PortfolioGenerator.create_zip_file(html_content)
+
+    def register_preview(self, html_content):
+        return None
+
+    def portfolio_html_url(self, portfolio_id):
+        return None
+
+    def close(self):
+        """Stop the worker processes and shut the embedded app down."""
+        if self._lifespan is None:
+            return
+        lifespan, self._lifespan = self._lifespan, None
+        self._pool.shutdown(cancel_futures=True)
+        self.api._loop_thread.run(lifespan.__aexit__(None, None, None))
+        self.api.close()
+
+_embedded_backend = None
+_embedded_lock = threading.Lock()
+
+def _get_embedded_backend():
+    """The process's embedded backend, started on first use and shared by every page."""
+    global _embedded_backend
+    with _embedded_lock:
+        if _embedded_backend is None:
+            _embedded_backend = EmbeddedBackend()
+        return _embedded_backend
+
+def get_backend(api_url, timeout=120.0, mode=BACKEND_MODE, public_url=PUBLIC_API_URL):
+    """
+    The shared backend for the configured mode.
+
+    Args:
+        api_url: FastAPI backend URL, used in http mode.
+        timeout: Request timeout in seconds, used in http mode.
+        public_url: Backend URL for links opened by the browser, used in http mode.
+        mode: "http" or "embedded".
+
+    Returns:
+        An HttpBackend, or the process's one EmbeddedBackend. Under Streamlit
+        the same instance is returned to every session and rerun.
+    """
+    if mode == "http":
+        return HttpBackend(get_api_client(api_url, timeout=timeout), public_url)
+    if mode == "embedded":
+        return _get_embedded_backend()
+    raise ValueError(f"Unknown BACKEND_MODE: {mode}")
+
+if st is not None:
+    get_backend = st.cache_resource(show_spinner=False)(get_backend)
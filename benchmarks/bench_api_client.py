@@ -0,0 +1,121 @@
+"""
+Benchmark per-call latency of the Streamlit pages' backend calls.
+
+Compares the old pattern, a new event loop and a new httpx.AsyncClient for
+every call, with the shared api_client.ApiClient, which keeps one event loop
+and a keep-alive connection pool for the whole process. By default a local
+uvicorn server is started on a throwaway SQLite database; pass --url to
+measure against a deployed backend, where each new connection also pays for
+DNS and a TLS handshake.
+
+Usage:
+    python benchmarks/bench_api_client.py [--calls 200] [--url https://...]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_client import ApiClient
+
+ENDPOINTS = ["/", "/themes", "/search?q=python"]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server():
+    """Start the API on a throwaway database. Returns (process, base URL)."""
+    db_dir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        CREATE_SCHEMA="1",
+        TRACE_LOG="0"
+    )
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        try:
+            httpx.get(f"{base_url}/")
+            return server, base_url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.terminate()
+    raise TimeoutError("API server did not start")
+
+def call_per_request_client(base_url, endpoint):
+    """What the pages did before: a fresh loop and client for each call."""
+    async def call():
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            response = await client.get(f"{base_url}{endpoint}")
+            return response.json()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(call())
+    finally:
+        loop.close()
+
+def measure(call, calls):
+    """Time calls sequentially, like a single Streamlit session. Returns latencies in ms."""
+    latencies = []
+    for index in range(calls):
+        start = time.perf_counter()
+        call(ENDPOINTS[index % len(ENDPOINTS)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def report(label, latencies):
+    ordered = sorted(latencies)
+    print(
+        f"{label:28s} {statistics.median(ordered):8.2f} {ordered[int(len(ordered) * 0.95)]:8.2f} "
+        f"{statistics.mean(ordered):8.2f}"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--url", help="Backend to measure instead of a local server")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = start_server()
+    try:
+        shared = ApiClient(base_url)
+        # Warm both paths once so imports and the server's first request aren't counted
+        call_per_request_client(base_url, "/")
+        shared.get("/")
+
+        per_request = measure(lambda endpoint: call_per_request_client(base_url, endpoint), args.calls)
+        pooled = measure(lambda endpoint: shared.get(endpoint), args.calls)
+
+        print(f"{args.calls} sequential calls to {base_url}")
+        print(f"{'client':28s} {'p50 ms':>8s} {'p95 ms':>8s} {'mean ms':>8s}")
+        report("new loop + client per call", per_request)
+        report("shared pooled client", pooled)
+        print(f"saved per call (mean):       {statistics.mean(per_request) - statistics.mean(pooled):8.2f} ms")
+        shared.close()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
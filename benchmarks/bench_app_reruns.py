@@ -0,0 +1,153 @@
+"""
+Measure how long app.py takes to rerun after an edit, with a large resume loaded.
+
+Drives the page with Streamlit's AppTest. Each session starts with a large
+extracted resume, the theme list and a generated portfolio already in
+session state, then repeats three interactions:
+
+    edit name       Change the name field and apply it.
+    switch section  Pick another section in the section editor.
+    switch theme    Pick another theme.
+
+Widgets inside an st.fragment rerun only their fragment. AppTest always
+reruns the whole script, so the fragment runs are requested here directly:
+the fragment storage is shared between AppTest runs and the rerun is
+queued with the fragment's ID, as the Streamlit server does when the
+browser reports a widget change inside a fragment.
+
+Pass --script to time another version of the page, e.g. one checked out
+from an earlier commit:
+
+    git show <commit>:app.py > /tmp/app_before.py
+    python benchmarks/bench_app_reruns.py --script /tmp/app_before.py
+
+Usage:
+    python benchmarks/bench_app_reruns.py [--script app.py] [--sections 60] [--repeat 20]
+"""
+import argparse
+import dataclasses
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from streamlit.runtime.fragment import MemoryFragmentStorage
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+
+THEMES = ["Professional Classic", "Modern Minimalist", "Netflix Style", "Amazon Style", "Creative Portfolio", "Tech Professional"]
+
+# One fragment storage for every run, and the fragments the next run is limited to
+_fragment_storage = MemoryFragmentStorage()
+_fragment_queue = []
+local_script_runner.MemoryFragmentStorage = lambda: _fragment_storage
+
+_request_rerun = local_script_runner.LocalScriptRunner.request_rerun
+
+def _request_fragment_rerun(self, rerun_data):
+    if _fragment_queue:
+        rerun_data = dataclasses.replace(rerun_data, fragment_id_queue=list(_fragment_queue), is_fragment_scoped_rerun=True)
+    return _request_rerun(self, rerun_data)
+
+local_script_runner.LocalScriptRunner.request_rerun = _request_fragment_rerun
+
+def fragment_id(function_name):
+    """ID of the stored fragment wrapping the function with this name, or None."""
+    for key, wrapped_fragment in _fragment_storage._fragments.items():
+        for cell in wrapped_fragment.__closure__ or ():
+            if getattr(cell.cell_contents, "__name__", None) == function_name:
+                return key
+    return None
+
+def make_resume(sections):
+    """A resume with many long sections, as extracted from a long CV."""
+    rng = random.Random(sections)
+    words = ["led", "built", "python", "platform", "team", "migrated", "latency", "customers", "design", "cloud"]
+    return {
+        "name": "Jordan Example",
+        "email": "jordan@example.com",
+        "phone": "+1 555 0100",
+        "full_text": "",
+        "sections": {
+            f"Section {index}": "\n".join(
+                "- " + " ".join(rng.choice(words) for _ in range(25)) for _ in range(20)
+            ) for index in range(sections)
+        }
+    }
+
+def make_portfolio(kb):
+    """A generated portfolio shown inline, as in embedded mode."""
+    html_content = "<html><body>" + "<p>portfolio content</p>" * (kb * 1024 // 24) + "</body></html>"
+    return {"html": html_content, "preview_url": None, "zip_bytes": html_content.encode("utf-8")}
+
+def start_session(script, args):
+    """Run the page once with the large resume already extracted."""
+    at = AppTest.from_file(script, default_timeout=60)
+    at.session_state.resume_data = make_resume(args.sections)
+    at.session_state.themes = THEMES
+    at.session_state.generated_portfolio = make_portfolio(args.kb)
+    at.run()
+    return at
+
+def widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+def edit_name(at, index):
+    widget(at.text_input, "Edit Name").input(f"Jordan Example {index}")
+    apply_name = [b for b in at.button if b.label == "Update Personal Information"]
+    if apply_name:
+        # Typing in the form reruns nothing; only submitting it does
+        apply_name[0].click()
+    return "resume_editor"
+
+def switch_section(at, index):
+    widget(at.selectbox, "Select section to edit:").select(f"Section {index % 10 + 1}")
+    return "resume_editor"
+
+def switch_theme(at, index):
+    widget(at.selectbox, "Select a theme for your portfolio").select(THEMES[(index + 1) % len(THEMES)])
+    return "theme_picker"
+
+def time_interaction(script, interact, args):
+    """Median milliseconds of the rerun after an interaction, and whether it was fragment-scoped."""
+    at = start_session(script, args)
+    timings = []
+    scoped = False
+    for index in range(args.repeat):
+        # A full run first, so every widget is present for the next interaction
+        _fragment_queue.clear()
+        at.run()
+        function_name = interact(at, index)
+        fragment = fragment_id(function_name)
+        if fragment is not None:
+            _fragment_queue.append(fragment)
+            scoped = True
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+        _fragment_queue.clear()
+        if at.exception:
+            raise AssertionError(f"The page raised: {at.exception[0].message}")
+    return statistics.median(timings), scoped
+
+def main(args):
+    script = os.path.abspath(args.script)
+    print(f"{script}: {args.sections} sections, {args.kb} KB inline preview")
+    print(f"{'interaction':>15s} {'rerun':>9s} {'median ms':>10s}")
+    for name, interact in [("edit name", edit_name), ("switch section", switch_section), ("switch theme", switch_theme)]:
+        median_ms, scoped = time_interaction(script, interact, args)
+        print(f"{name:>15s} {'fragment' if scoped else 'full':>9s} {median_ms:10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--script", default=os.path.join(ROOT, "app.py"), help="Streamlit page to time")
+    parser.add_argument("--sections", type=int, default=60, help="Sections in the sample resume")
+    parser.add_argument("--kb", type=int, default=200, help="Size of the generated portfolio HTML")
+    parser.add_argument("--repeat", type=int, default=20, help="Reruns timed per interaction")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,99 @@
+"""
+Benchmark serving portfolio HTML from the database versus the local artifact store.
+
+Seeds portfolios whose HTML is compressed in the html_blobs table and others
+whose HTML lives in a LocalArtifactStore, then reads /portfolio/{id}/html
+concurrently for each group.
+
+Usage:
+    python benchmarks/bench_artifact_serving.py [--portfolios 200] [--kb 200] [--requests 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a throwaway database before it is imported
+_work_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_work_dir, 'bench.db')}"
+os.environ.setdefault("TRACE_LOG", "0")
+
+import httpx
+
+from api import app
+from database import create_schema, AsyncSessionLocal, async_engine
+from artifact_store import LocalArtifactStore, set_artifact_store
+from portfolio_store import PortfolioStore
+
+# Tables are created explicitly, not when the database module is imported
+create_schema()
+
+def make_html(index, kb):
+    """Distinct, moderately compressible HTML of roughly kb kilobytes."""
+    rng = random.Random(index)
+    words = ["portfolio", "experience", "python", "design", "cloud", "team", "project", "impact"]
+    paragraphs = []
+    size = 0
+    while size < kb * 1024:
+        paragraph = "<p>" + " ".join(rng.choice(words) for _ in range(40)) + f" {rng.random()}</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    return f"<html><body><h1>Portfolio {index}</h1>{''.join(paragraphs)}</body></html>"
+
+async def seed(group, count, kb):
+    """Save count portfolios into the current store. Returns their IDs."""
+    items = [
+        {
+            "email": "bench@example.com",
+            "resume_info": {},
+            "theme": "Modern Minimalist",
+            "html_content": make_html(f"{group}-{index}", kb),
+            "portfolio_name": f"Portfolio {index}"
+        } for index in range(count)
+    ]
+    async with AsyncSessionLocal() as db:
+        return await PortfolioStore.save_portfolios_bulk(db, items)
+
+async def run(client, portfolio_ids, requests, concurrency):
+    """Read random portfolios concurrently. Returns (requests per second, MB per second)."""
+    queue = [random.choice(portfolio_ids) for _ in range(requests)]
+    received = 0
+
+    async def worker():
+        nonlocal received
+        while queue:
+            response = await client.get(f"/portfolio/{queue.pop()}/html")
+            response.raise_for_status()
+            received += len(response.content)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, received / elapsed / (1024 * 1024)
+
+async def main(args):
+    set_artifact_store(None)
+    db_ids = await seed("db", args.portfolios, args.kb)
+    set_artifact_store(LocalArtifactStore(os.path.join(_work_dir, "artifacts")))
+    file_ids = await seed("file", args.portfolios, args.kb)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, portfolio_ids in (("database blobs (zlib)", db_ids), ("local artifact store", file_ids)):
+            await run(client, portfolio_ids, min(200, args.requests), args.concurrency)
+            rps, mbps = await run(client, portfolio_ids, args.requests, args.concurrency)
+            print(f"{label:24s} {rps:10.1f} req/s {mbps:10.1f} MB/s")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--portfolios", type=int, default=200)
+    parser.add_argument("--kb", type=int, default=200, help="Approximate HTML size per portfolio")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
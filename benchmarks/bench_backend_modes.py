@@ -0,0 +1,131 @@
+"""
+Compare the Streamlit pages' backend calls in http and embedded mode.
+
+http mode talks to a local uvicorn server, so the numbers leave out the
+internet round trip and TLS that a remote backend adds. embedded mode runs
+the same calls in this process (see backend.py). Also reports the bytes a
+/generate-portfolio response carries over HTTP for a given page size: the
+HTML, which embedded mode doesn't serialize, and, only with
+include_downloads, its base64 preview URI and base64 ZIP.
+
+Usage:
+    python benchmarks/bench_backend_modes.py [--calls 20] [--kb 60]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Each mode gets its own throwaway database; set before the app is imported
+_work_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_work_dir, 'embedded.db')}"
+os.environ["CREATE_SCHEMA"] = "1"
+os.environ.setdefault("TRACE_LOG", "0")
+
+from backend import HttpBackend, EmbeddedBackend
+from api_client import ApiClient
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server():
+    """Start the API on its own database. Returns (process, base URL)."""
+    import subprocess
+    import httpx
+
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(_work_dir, 'http.db')}")
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        try:
+            httpx.get(f"{base_url}/")
+            return server, base_url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.terminate()
+    raise TimeoutError("API server did not start")
+
+def timed(function, calls):
+    """Median milliseconds of calls to function, after one warm-up call."""
+    function()
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+def run(backend, calls, pdf_bytes, html):
+    # Let the backend's background warmup finish so it doesn't compete for the CPU
+    time.sleep(3)
+    resume_data = backend.extract_resume("resume.pdf", pdf_bytes, "application/pdf")
+    portfolio_id = backend.save_portfolio("bench@example.com", "Bench", resume_data, "Modern Minimalist", html)
+    return {
+        "extract resume": timed(lambda: backend.extract_resume("resume.pdf", pdf_bytes, "application/pdf"), calls),
+        "themes": timed(backend.get_themes, calls),
+        "save portfolio": timed(
+            lambda: backend.save_portfolio("bench@example.com", "Bench", resume_data, "Modern Minimalist", html), calls
+        ),
+        "get portfolio": timed(lambda: backend.get_portfolio(portfolio_id), calls),
+        "list portfolios": timed(lambda: backend.get_user_portfolios("bench@example.com"), calls)
+    }
+
+def generate_payload_bytes(html, include_downloads=False):
+    """Size of the JSON /generate-portfolio sends for this HTML."""
+    from portfolio_generator import PortfolioGenerator
+    import base64
+
+    generator = PortfolioGenerator("unused")
+    content = {"status": "success", "html": html, "preview_url": "/preview/" + "0" * 64}
+    if include_downloads:
+        content["preview_uri"] = generator.encode_html_to_data_uri(html)
+        content["zip_base64"] = base64.b64encode(generator.create_zip_file(html)).decode("utf-8")
+    return len(json.dumps(content))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--kb", type=int, default=60, help="Portfolio HTML size")
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "sample_resume.pdf"), "rb") as pdf:
+        pdf_bytes = pdf.read()
+    html = "<html><body>" + "<section><h2>Experience</h2><p>Built data platforms.</p></section>" * (args.kb * 1024 // 70) + "</body></html>"
+
+    server, base_url = start_server()
+    try:
+        http_results = run(HttpBackend(ApiClient(base_url)), args.calls, pdf_bytes, html)
+    finally:
+        server.terminate()
+        server.wait()
+
+    embedded = EmbeddedBackend(workers=1)
+    try:
+        embedded_results = run(embedded, args.calls, pdf_bytes, html)
+    finally:
+        embedded.close()
+
+    print(f"Median of {args.calls} calls, http mode against a local server")
+    print(f"{'call':18s} {'http ms':>9s} {'embedded ms':>12s}")
+    for name in http_results:
+        print(f"{name:18s} {http_results[name]:9.2f} {embedded_results[name]:12.2f}")
+    print()
+    print(
+        f"/generate-portfolio response for {len(html) / 1024:.0f} KB of HTML: "
+        f"{generate_payload_bytes(html) / 1024:.0f} KB over HTTP "
+        f"({generate_payload_bytes(html, include_downloads=True) / 1024:.0f} KB with include_downloads), none embedded"
+    )
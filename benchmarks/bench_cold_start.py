@@ -0,0 +1,105 @@
+"""
+Measure API cold-start time: how long after the server process starts it answers.
+
+Starts uvicorn on an existing SQLite database several times and reports the
+median time from process start to the first response of GET /, the first
+database-backed response, and the first resume extraction. The database is
+created beforehand, as on a deployed instance that wakes up from sleep.
+
+Point --app-dir at another checkout to compare against an older version.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--app-dir .]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def prepare_database(app_dir, env):
+    """Create the schema once, outside the measured runs."""
+    subprocess.run(
+        [sys.executable, "-c", "import database\nif hasattr(database, 'create_schema'): database.create_schema()"],
+        cwd=app_dir, env=env, check=True
+    )
+
+def wait_for(client, url, deadline):
+    """Poll url until the server accepts the connection. Returns the response."""
+    while time.perf_counter() < deadline:
+        try:
+            return client.get(url)
+        except httpx.TransportError:
+            time.sleep(0.005)
+    raise TimeoutError(f"No response from {url}")
+
+def cold_start(app_dir, env, pdf_bytes):
+    """Start the server once. Returns seconds to first /, first DB read and first extraction."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(timeout=60) as client:
+            wait_for(client, f"{base}/", start + 60)
+            first_response = time.perf_counter() - start
+            client.get(f"{base}/user-portfolios/nobody@example.com")
+            first_db = time.perf_counter() - start
+            client.post(f"{base}/extract-resume", files={"file": ("resume.pdf", pdf_bytes, "application/pdf")})
+            first_extract = time.perf_counter() - start
+        return first_response, first_db, first_extract
+    finally:
+        server.terminate()
+        server.wait()
+
+def import_time(app_dir, env):
+    """Seconds to import the api module in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", "import time; start = time.perf_counter(); import api; print(time.perf_counter() - start)"],
+        cwd=app_dir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-dir", default=ROOT, help="Checkout of the API to start")
+    args = parser.parse_args()
+
+    app_dir = os.path.abspath(args.app_dir)
+    db_dir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        TRACE_LOG="0",
+        PYTHONDONTWRITEBYTECODE="0"
+    )
+    prepare_database(app_dir, env)
+    with open(os.path.join(ROOT, "sample_resume.pdf"), "rb") as pdf:
+        pdf_bytes = pdf.read()
+
+    # One unmeasured start so every measured run sees warm bytecode and OS caches
+    cold_start(app_dir, env, pdf_bytes)
+    imports = [import_time(app_dir, env) for _ in range(args.runs)]
+    runs = [cold_start(app_dir, env, pdf_bytes) for _ in range(args.runs)]
+
+    print(f"API at {app_dir}, median of {args.runs} runs")
+    print(f"import api:                 {statistics.median(imports) * 1000:8.1f} ms")
+    print(f"first response (GET /):     {statistics.median(run[0] for run in runs) * 1000:8.1f} ms")
+    print(f"first database response:    {statistics.median(run[1] for run in runs) * 1000:8.1f} ms")
+    print(f"first resume extraction:    {statistics.median(run[2] for run in runs) * 1000:8.1f} ms")
@@ -0,0 +1,123 @@
+"""
+Compare the single-pass entity scanner with the per-field regex passes it replaced.
+
+For synthetic resumes of growing length (contact details in the header,
+dated roles in repeated EXPERIENCE sections) reports median times of:
+
+    contact     Email, phone and name as parse_resume extracts them: two
+                findall() passes over the whole text and a split into lines,
+                vs one scan that stops at the first email and phone
+    experience  Finding the date ranges of every EXPERIENCE section: the
+                pattern looked up and run per call, vs the scanner
+    entities    Every email, phone, URL, date and date range in the text:
+                one finditer() pass per kind vs a single scan
+
+and checks both sides find the same contact details and date ranges.
+
+Usage:
+    python benchmarks/bench_entity_scanner.py [--sections 10,40,160,640] [--repeat 30]
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_scanner import DATE_RANGE, KINDS, _PATTERNS, scan
+from resume_processor import ResumeProcessor
+
+# The patterns as resume_processor and portfolio_generator used them
+OLD_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+OLD_PHONE_RE = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+OLD_DATE_PATTERN = r'(?:January|February|March|April|May|June|July|August|September|October|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[\s,]+\d{4}\s*[-–—]\s*(?:Present|Current|January|February|March|April|May|June|July|August|September|October|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)(?:[\s,]+\d{4})?'
+
+# One pattern per kind, each run over the whole text
+PER_KIND_RES = {kind: re.compile(_PATTERNS[kind], re.IGNORECASE) for kind in KINDS}
+
+HEADERS = ["EXPERIENCE", "EDUCATION", "SKILLS", "PROJECTS"]
+MONTHS = ["January", "Mar", "June", "Sep", "November"]
+
+def make_text(sections):
+    """Resume-like text with a contact header and the given number of sections."""
+    rng = random.Random(sections)
+    words = ["led", "built", "python", "platform", "team", "migrated", "latency", "customers", "design", "cloud"]
+    lines = ["Jordan Example", "jordan@example.com | (555) 010-0100 | github.com/jordan", ""]
+    for index in range(sections):
+        header = HEADERS[index % len(HEADERS)]
+        lines.append(header)
+        for role in range(3 if header == "EXPERIENCE" else 1):
+            if header == "EXPERIENCE":
+                start = 2000 + (index + role) % 20
+                lines.append(f"Software Engineer, Company {index}-{role}")
+                lines.append(f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {start + 2}")
+            lines.extend("- " + " ".join(rng.choice(words) for _ in range(15)) for _ in range(6))
+        lines.append("")
+    return "\n".join(lines)
+
+def old_contact(text, sections):
+    emails = OLD_EMAIL_RE.findall(text)
+    phones = OLD_PHONE_RE.findall(text)
+    lines = text.split('\n')
+    name = lines[0].strip() if lines else ""
+    return emails[0] if emails else "", phones[0] if phones else "", name
+
+def new_contact(text, sections):
+    email, phone = ResumeProcessor.extract_contact(text)
+    return email, phone, ResumeProcessor.extract_name(text, sections)
+
+def old_date_ranges(section):
+    """Date range spans as _parse_experiences found them, pattern looked up per call."""
+    return [match.span() for match in re.finditer(OLD_DATE_PATTERN, section, re.IGNORECASE)]
+
+def new_date_ranges(section):
+    return [(entity.start, entity.end) for entity in scan(section, [DATE_RANGE])]
+
+def old_entities(text):
+    return sum(len(pattern.findall(text)) for pattern in PER_KIND_RES.values())
+
+def new_entities(text):
+    return len(scan(text))
+
+def timing(function, repeat):
+    """Median microseconds of function()."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+def main(args):
+    print("Median microseconds, per-field passes -> single scan")
+    print(f"{'sections':>8s} {'text KB':>8s} {'contact':>18s} {'experience':>20s} {'entities':>20s}")
+    for sections in [int(count) for count in args.sections.split(",")]:
+        text = make_text(sections)
+        parsed = ResumeProcessor.extract_sections(text)
+        experience = [content for name, content in parsed.items() if name == "EXPERIENCE"]
+        if old_contact(text, parsed) != new_contact(text, parsed):
+            raise AssertionError("Contact details differ")
+        if [old_date_ranges(section) for section in experience] != [new_date_ranges(section) for section in experience]:
+            raise AssertionError("Date ranges differ")
+
+        contact = (timing(lambda: old_contact(text, parsed), args.repeat), timing(lambda: new_contact(text, parsed), args.repeat))
+        ranges = (
+            timing(lambda: [old_date_ranges(section) for section in experience], args.repeat),
+            timing(lambda: [new_date_ranges(section) for section in experience], args.repeat)
+        )
+        entities = (timing(lambda: old_entities(text), args.repeat), timing(lambda: new_entities(text), args.repeat))
+
+        def pair(times):
+            return f"{times[0]:8.0f} -> {times[1]:7.0f}"
+
+        print(f"{sections:8d} {len(text) / 1024:8.1f} {pair(contact):>18s} {pair(ranges):>20s} {pair(entities):>20s}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", default="10,40,160,640", help="Comma-separated section counts of synthetic resumes")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed repetitions per measurement")
+    args = parser.parse_args()
+    main(args)
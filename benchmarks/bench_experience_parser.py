@@ -0,0 +1,116 @@
+"""
+Time experience parsing for sections with many roles.
+
+For synthetic experience sections with a growing number of roles (heading,
+date range and bullets, some bullets wrapped onto a second line) reports
+median times of:
+
+    chunks      The previous _parse_experiences: split the text into raw
+                chunks on date ranges, with an rfind() per role
+    parse       The structured parser with an empty cache
+    cached      The structured parser for content it has parsed before, as
+                on every preview after the first
+    prompt      create_prompt for a resume with that section, cold and cached
+
+and checks every role comes back with its title, company, dates and bullets.
+
+Usage:
+    python benchmarks/bench_experience_parser.py [--roles 50,200,800] [--repeat 30]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import experience_parser
+from entity_scanner import DATE_RANGE, scan
+from experience_parser import parse_experiences
+from portfolio_generator import PortfolioGenerator
+
+MONTHS = ["Jan", "March", "June", "Sep", "November"]
+TITLES = ["Software Engineer", "Data Analyst", "Product Manager", "Platform Lead"]
+
+def make_section(roles):
+    """An experience section with the given number of roles, newest first."""
+    rng = random.Random(roles)
+    words = ["led", "built", "python", "platform", "team", "migrated", "latency", "customers", "design", "cloud"]
+    lines = ["PROFESSIONAL EXPERIENCE"]
+    for index in range(roles):
+        year = 2024 - index
+        lines.append(f"{TITLES[index % len(TITLES)]}, Company {index}")
+        lines.append(f"{rng.choice(MONTHS)} {year - 1} - {rng.choice(MONTHS)} {year}")
+        for _ in range(4):
+            lines.append("- " + " ".join(rng.choice(words) for _ in range(12)))
+            if rng.random() < 0.3:
+                lines.append(" ".join(rng.choice(words) for _ in range(6)))
+        lines.append("")
+    return "\n".join(lines)
+
+def chunks(experience_text):
+    """The raw-chunk split _parse_experiences made before it returned records."""
+    date_matches = scan(experience_text, [DATE_RANGE])
+    experiences = []
+    last_end = 0
+    for i, match in enumerate(date_matches):
+        start = match.start
+        if start < last_end:
+            continue
+        prev_break = max(experience_text.rfind('\n', 0, start), 0)
+        if i < len(date_matches) - 1:
+            end = date_matches[i + 1].start
+            prev_break_next = experience_text.rfind('\n', 0, end)
+            if prev_break_next > start:
+                end = prev_break_next
+            experiences.append(experience_text[prev_break:end].strip())
+            last_end = end
+        else:
+            experiences.append(experience_text[prev_break:].strip())
+    return experiences or [experience_text]
+
+def timing(function, repeat, setup=None):
+    """Median microseconds of function(), calling setup() untimed before each run."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+def main(args):
+    generator = object.__new__(PortfolioGenerator)
+    print("Median microseconds")
+    print(f"{'roles':>6s} {'text KB':>8s} {'chunks':>9s} {'parse':>9s} {'cached':>8s} {'prompt cold':>12s} {'prompt cached':>14s}")
+    for roles in [int(count) for count in args.roles.split(",")]:
+        section = make_section(roles)
+        resume = {"name": "Jordan Example", "sections": {"SKILLS": "Python", "EXPERIENCE": section}}
+
+        experiences = parse_experiences(section)
+        if len(experiences) != roles or len(chunks(section)) != roles:
+            raise AssertionError(f"Expected {roles} roles, parsed {len(experiences)}")
+        for index, experience in enumerate(experiences):
+            if (experience.title, experience.company) != (TITLES[index % len(TITLES)], f"Company {index}") \
+                    or not experience.end or len(experience.bullets) != 4:
+                raise AssertionError(f"Role {index} parsed as {experience!r}")
+
+        chunk_us = timing(lambda: chunks(section), args.repeat)
+        parse_us = timing(lambda: parse_experiences(section), args.repeat, setup=experience_parser.clear_cache)
+        cached_us = timing(lambda: parse_experiences(section), args.repeat)
+        prompt_cold = timing(lambda: generator.create_prompt(resume, {}), args.repeat, setup=experience_parser.clear_cache)
+        prompt_cached = timing(lambda: generator.create_prompt(resume, {}), args.repeat)
+        print(
+            f"{roles:6d} {len(section) / 1024:8.1f} {chunk_us:9.0f} {parse_us:9.0f} {cached_us:8.0f} "
+            f"{prompt_cold:12.0f} {prompt_cached:14.0f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--roles", default="50,200,800", help="Comma-separated role counts of synthetic sections")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed repetitions per measurement")
+    args = parser.parse_args()
+    main(args)
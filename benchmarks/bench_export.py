@@ -0,0 +1,179 @@
+"""
+Measure memory use of the streaming portfolio export as the portfolio count grows.
+
+Seeds users with increasing numbers of portfolios, downloads each user's
+/user-portfolios/{email}/export archive through the ASGI app and records the
+peak Python memory allocated during the download with tracemalloc. Each
+archive is checked: every file must pass its CRC check and the manifest must
+list every portfolio. For comparison the same archive is also built the
+buffered way, loading every portfolio and writing the ZIP into a BytesIO as
+create_zip_file does.
+
+Usage:
+    python benchmarks/bench_export.py [--counts 100,500,2000] [--kb 20]
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a throwaway database before it is imported
+_work_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_work_dir, 'bench.db')}"
+os.environ.setdefault("TRACE_LOG", "0")
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+import database
+from api import app
+from database import create_schema, AsyncSessionLocal, Portfolio, User
+from portfolio_store import PortfolioStore
+
+# Tables are created explicitly, not when the database module is imported
+create_schema()
+
+def make_html(seed, kb):
+    """Distinct, moderately compressible HTML of roughly kb kilobytes."""
+    rng = random.Random(seed)
+    words = ["portfolio", "experience", "python", "design", "cloud", "team", "project", "impact"]
+    paragraphs = []
+    size = 0
+    while size < kb * 1024:
+        paragraph = "<p>" + " ".join(rng.choice(words) for _ in range(40)) + f" {rng.random()}</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    return f"<html><body><h1>Portfolio {seed}</h1>{''.join(paragraphs)}</body></html>"
+
+async def seed(email, count, kb):
+    """Save count distinct portfolios for one user, in batches."""
+    for start in range(0, count, 200):
+        items = [
+            {
+                "email": email,
+                "resume_info": {},
+                "theme": "Modern Minimalist",
+                "html_content": make_html(f"{email}-{index}", kb),
+                "portfolio_name": f"Portfolio {index}"
+            } for index in range(start, min(start + 200, count))
+        ]
+        async with AsyncSessionLocal() as db:
+            await PortfolioStore.save_portfolios_bulk(db, items)
+
+async def download(path, out):
+    """Send one GET request to the ASGI app and write the response body to out. Returns the status."""
+    status = None
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            out.write(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80)
+    }
+    await app(scope, receive, send)
+    disconnected.set()
+    return status
+
+async def buffered_export(email):
+    """The archive built in memory, as create_zip_file builds a single portfolio's."""
+    async with AsyncSessionLocal() as db:
+        user_id = (await db.execute(select(User.id).filter(User.email == email))).scalar()
+        portfolios = (await db.execute(
+            select(Portfolio).options(joinedload(Portfolio.html_blob)).filter(Portfolio.user_id == user_id)
+        )).scalars().all()
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for portfolio in portfolios:
+                archive.writestr(f"portfolios/{portfolio.id}.html", portfolio.html)
+        return buffer.getvalue()
+
+async def measure(coroutine_function):
+    """Run a coroutine under tracemalloc. Returns (result, peak MiB above the starting point, seconds)."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = await coroutine_function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, (peak - baseline) / (1024 * 1024), elapsed
+
+def check_archive(path, count):
+    """Verify an exported archive holds count portfolios, a matching manifest and valid CRCs."""
+    with zipfile.ZipFile(path) as archive:
+        bad_file = archive.testzip()
+        if bad_file is not None:
+            raise AssertionError(f"CRC mismatch in {bad_file}")
+        manifest = json.loads(archive.read("manifest.json"))
+        files = [name for name in archive.namelist() if name.startswith("portfolios/")]
+    if manifest["portfolio_count"] != count or len(files) != count:
+        raise AssertionError(f"Expected {count} portfolios, archive has {len(files)}, manifest lists {manifest['portfolio_count']}")
+    if sorted(entry["file"] for entry in manifest["portfolios"]) != sorted(files):
+        raise AssertionError("Manifest does not match the archive contents")
+
+async def main(args):
+    counts = [int(count) for count in args.counts.split(",")]
+    for count in counts:
+        await seed(f"export{count}@example.com", count, args.kb)
+
+    print(f"{'portfolios':>10s} {'archive MB':>11s} {'stream peak MiB':>16s} {'stream s':>9s} {'buffered peak MiB':>18s} {'buffered s':>11s}")
+    for count in counts:
+        email = f"export{count}@example.com"
+        archive_path = os.path.join(_work_dir, f"export{count}.zip")
+        with open(archive_path, "wb") as out:
+            status, stream_peak, stream_seconds = await measure(
+                lambda: download(f"/user-portfolios/{email}/export", out)
+            )
+        if status != 200:
+            raise AssertionError(f"Export returned {status}")
+        check_archive(archive_path, count)
+
+        data, buffered_peak, buffered_seconds = await measure(lambda: buffered_export(email))
+        print(
+            f"{count:10d} {os.path.getsize(archive_path) / 1e6:11.1f} {stream_peak:16.1f} {stream_seconds:9.2f} "
+            f"{buffered_peak:18.1f} {buffered_seconds:11.2f}"
+        )
+        del data
+
+    await database.async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", default="100,500,2000", help="Comma-separated portfolio counts")
+    parser.add_argument("--kb", type=int, default=20, help="Approximate HTML size of each portfolio")
+    args = parser.parse_args()
+    asyncio.run(main(args))
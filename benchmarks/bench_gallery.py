@@ -0,0 +1,166 @@
+"""
+Measure perceived load times of the My Portfolios gallery against a local backend.
+
+Seeds one user with many portfolios on a local uvicorn server, then replays
+what the page does through backend.HttpBackend:
+
+    all at once  Load every summary, then fetch a portfolio's details only
+                 when its "View" button is clicked (the previous gallery).
+    paginated    Load one page of summaries, start prefetching the visible
+                 portfolios concurrently, and serve "View" from the prefetch
+                 or the session cache.
+
+Reported times are what a user waits for: the first gallery render, the
+first "View" right after the render or after a short pause, and switching
+back to portfolios viewed before.
+
+Usage:
+    python benchmarks/bench_gallery.py [--portfolios 500] [--kb 60] [--views 12]
+"""
+import argparse
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_client import ApiClient
+from backend import HttpBackend
+
+EMAIL = "gallery@example.com"
+PAGE_SIZE = 12
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server():
+    """Start the API on a throwaway database. Returns (process, base URL)."""
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        CREATE_SCHEMA="1",
+        TRACE_LOG="0",
+        # Without the server's read cache every pass pays for its database reads
+        CACHE_TTL="0"
+    )
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        try:
+            httpx.get(f"{base_url}/")
+            return server, base_url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.terminate()
+    raise TimeoutError("API server did not start")
+
+def make_html(index, kb):
+    """Distinct portfolio HTML of roughly kb kilobytes."""
+    rng = random.Random(index)
+    words = ["portfolio", "experience", "python", "design", "cloud", "team", "project", "impact"]
+    body = "".join(
+        "<p>" + " ".join(rng.choice(words) for _ in range(40)) + "</p>"
+        for _ in range(kb * 1024 // 300)
+    )
+    return f"<html><body><h1>Portfolio {index}</h1>{body}</body></html>"
+
+def seed(base_url, count, kb):
+    with httpx.Client(base_url=base_url, timeout=300) as client:
+        for start in range(0, count, 100):
+            response = client.post("/save-portfolios", json={"portfolios": [
+                {
+                    "email": EMAIL,
+                    "resume_data": {"name": "Gallery User", "sections": {"SKILLS": "Python"}},
+                    "theme": "Modern Minimalist",
+                    "html_content": make_html(index, kb),
+                    "portfolio_name": f"Portfolio {index}"
+                } for index in range(start, min(start + 100, count))
+            ]})
+            response.raise_for_status()
+
+def elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+def all_at_once(backend, views, pause):
+    """The previous gallery: every summary up front, details fetched on each click."""
+    start = time.perf_counter()
+    portfolios = backend.get_user_portfolios(EMAIL)
+    first_render = elapsed_ms(start)
+
+    visible = [portfolio["id"] for portfolio in portfolios[:views]]
+    time.sleep(pause)
+    view_times = []
+    for portfolio_id in visible:
+        start = time.perf_counter()
+        backend.get_portfolio(portfolio_id)
+        view_times.append(elapsed_ms(start))
+
+    # Clicking an earlier portfolio again fetched it again
+    start = time.perf_counter()
+    backend.get_portfolio(visible[0])
+    switch_back = elapsed_ms(start)
+    return first_render, view_times, switch_back
+
+def paginated(backend, views, pause):
+    """The new gallery: one page of summaries, visible details prefetched concurrently."""
+    cache = {}
+    start = time.perf_counter()
+    total, portfolios = backend.get_user_portfolios_page(EMAIL, 1, PAGE_SIZE)
+    prefetches = backend.prefetch_portfolios([portfolio["id"] for portfolio in portfolios])
+    first_render = elapsed_ms(start)
+
+    visible = [portfolio["id"] for portfolio in portfolios[:views]]
+    time.sleep(pause)
+    view_times = []
+    for portfolio_id in visible:
+        start = time.perf_counter()
+        cache[portfolio_id] = prefetches.pop(portfolio_id).result()
+        view_times.append(elapsed_ms(start))
+
+    start = time.perf_counter()
+    cache[visible[0]]
+    switch_back = elapsed_ms(start)
+    return first_render, view_times, switch_back
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--portfolios", type=int, default=500)
+    parser.add_argument("--kb", type=int, default=60, help="Approximate HTML size of each portfolio")
+    parser.add_argument("--views", type=int, default=PAGE_SIZE, help="Portfolios viewed in a row")
+    parser.add_argument("--pause", type=float, default=0.5, help="Seconds between the render and the first click")
+    args = parser.parse_args()
+
+    server, base_url = start_server()
+    try:
+        seed(base_url, args.portfolios, args.kb)
+        backend = HttpBackend(ApiClient(base_url))
+        # Let the server's background warmup finish so it doesn't compete for the CPU
+        time.sleep(3)
+
+        print(f"{args.portfolios} portfolios of ~{args.kb} KB, {args.views} views, local server")
+        print(f"{'gallery':14s} {'pause s':>8s} {'first render':>13s} {'first view':>11s} {'median view':>12s} {'switch back':>12s}")
+        for pause in (0.0, args.pause):
+            for label, flow in (("all at once", all_at_once), ("paginated", paginated)):
+                first_render, view_times, switch_back = flow(backend, args.views, pause)
+                print(
+                    f"{label:14s} {pause:8.1f} {first_render:10.1f} ms {view_times[0]:8.1f} ms "
+                    f"{statistics.median(view_times):9.1f} ms {switch_back:9.1f} ms"
+                )
+    finally:
+        server.terminate()
+        server.wait()
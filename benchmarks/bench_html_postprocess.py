@@ -0,0 +1,140 @@
+"""
+Measure what post-processing does to generated portfolio HTML, and its cost.
+
+Builds portfolios shaped like the model's output: indented markup with
+comments, a stylesheet that is partly repeated in a second <style> block,
+a duplicated font link and commented JS, wrapped in a Markdown fence. For
+each size, and for a copy cut off mid-document as a max_tokens stop leaves
+it, reports:
+
+    bytes       Size before -> after, raw and gzip-compressed as served
+    ms          Median time of process_html()
+    repairs     What was repaired
+
+and checks that processing the output again changes nothing.
+
+Usage:
+    python benchmarks/bench_html_postprocess.py [--cards 10,40,160] [--repeat 30]
+"""
+import argparse
+import gzip
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_postprocess import process_html
+
+FONT_LINK = '    <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@400;700&display=swap">\n'
+
+BASE_CSS = """
+        /* Layout */
+        body {
+            margin: 0;
+            font-family: 'Inter', sans-serif;
+            color: #222;
+        }
+
+        .container { max-width: 1100px; margin: 0 auto; padding: 0 24px; }
+
+        /* Cards */
+        .card {
+            background: #fff;
+            border-radius: 12px;
+            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.08);
+            padding: 24px;
+        }
+
+        .card h3 { margin-top: 0; color: var(--accent); }
+
+        @media (max-width: 768px) {
+            .container { padding: 0 12px; }
+        }
+"""
+
+SCRIPT = """
+    <script>
+        // Reveal cards as they scroll into view
+        const observer = new IntersectionObserver((entries) => {
+            entries.forEach(entry => {
+                /* Only animate once */
+                if (entry.isIntersecting) {
+                    entry.target.classList.add('visible');
+                    observer.unobserve(entry.target);
+                }
+            });
+        });
+
+        document.querySelectorAll('.card').forEach(card => observer.observe(card));
+    </script>
+"""
+
+def make_portfolio(cards):
+    """A model-style portfolio with the given number of experience cards."""
+    rng = random.Random(cards)
+    words = ["led", "built", "python", "platform", "team", "migrated", "latency", "customers", "design", "cloud"]
+    parts = [
+        "Here is your portfolio website:\n\n```html\n<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n",
+        "    <meta charset=\"UTF-8\">\n    <title>Jordan Example - Portfolio</title>\n",
+        FONT_LINK,
+        "    <style>" + BASE_CSS + "    </style>\n",
+        FONT_LINK,
+        # The model often repeats part of its stylesheet with a few additions
+        "    <style>" + BASE_CSS + "        .visible { opacity: 1; }\n    </style>\n",
+        "</head>\n<body>\n    <!-- Experience section -->\n    <section class=\"container\">\n",
+    ]
+    for index in range(cards):
+        bullets = "".join(
+            f"                <li>{' '.join(rng.choice(words) for _ in range(12))}</li>\n" for _ in range(4)
+        )
+        parts.append(
+            f"        <!-- Card {index} -->\n"
+            f"        <div class=\"card\">\n"
+            f"            <h3>Software Engineer, Company {index}</h3>\n"
+            f"            <p class=\"dates\">   Jan {2000 + index % 20}   -   Present   </p>\n"
+            f"            <ul>\n{bullets}            </ul>\n"
+            f"        </div>\n"
+        )
+    parts.append("    </section>\n" + SCRIPT + "</body>\n</html>\n```\n\nLet me know if you'd like any changes!")
+    return "".join(parts)
+
+def truncated(html):
+    """The portfolio cut off inside a tag, two thirds of the way through."""
+    cut = html.index("<div class=\"card\">", len(html) * 2 // 3) + 12
+    return html[:cut]
+
+def timing(function, repeat):
+    """Median milliseconds of function() and its last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def main(args):
+    print(f"{'portfolio':>16s} {'bytes':>17s} {'gzip bytes':>15s} {'ms':>6s}  repairs")
+    for cards in [int(count) for count in args.cards.split(",")]:
+        html = make_portfolio(cards)
+        for label, document in [(f"{cards} cards", html), (f"{cards}, truncated", truncated(html))]:
+            ms, (processed, stats) = timing(lambda: process_html(document), args.repeat)
+            if process_html(processed)[0] != processed:
+                raise AssertionError("Processing the output again changed it")
+            before = len(document.encode("utf-8"))
+            after = len(processed.encode("utf-8"))
+            gzip_before = len(gzip.compress(document.encode("utf-8")))
+            gzip_after = len(gzip.compress(processed.encode("utf-8")))
+            print(
+                f"{label:>16s} {before:7d} -> {after:6d} {gzip_before:6d} -> {gzip_after:5d} {ms:6.2f}  "
+                f"{', '.join(stats['repairs']) or '-'}; {stats['rules_removed']} rules, {stats['links_removed']} links removed"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", default="10,40,160", help="Comma-separated experience card counts")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed repetitions per portfolio")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,48 @@
+"""
+Measure the page-weight analysis of generated portfolios.
+
+For model-style portfolios of several sizes (see bench_html_postprocess),
+post-processed as they are stored, reports the median time of
+analyze_page() and its metrics, so its cost can be weighed against the
+LLM call it follows and the save it is part of.
+
+Usage:
+    python benchmarks/bench_page_weight.py [--cards 10,40,160] [--repeat 30]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("TRACE_LOG", "0")
+
+from bench_html_postprocess import make_portfolio
+from html_postprocess import process_html
+from page_weight import analyze_page
+
+def timing(function, repeat):
+    """Median milliseconds of function() and its last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def main(args):
+    print(f"{'portfolio':>10s} {'ms':>6s}  metrics")
+    for cards in [int(count) for count in args.cards.split(",")]:
+        html, _ = process_html(make_portfolio(cards))
+        ms, report = timing(lambda: analyze_page(html), args.repeat)
+        metrics = ", ".join(f"{name} {value}" for name, value in report.metrics.items())
+        print(f"{cards:4d} cards {ms:6.2f}  {metrics}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", default="10,40,160", help="Comma-separated experience card counts")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed repetitions per portfolio")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,80 @@
+"""
+Compare PDF pre-flight triage with the full parse it saves.
+
+Builds a set of uploads (the sample resume, text PDFs of several lengths
+and scanned, image-only PDFs) and reports for each:
+
+    verdict     What pdf_triage decides (fast_path, normal, image_only, too_large)
+    triage ms   Median time of triage_pdf()
+    parse ms    Median time of the full ResumeProcessor.parse_resume() the
+                upload got before, and the text it yielded
+
+Text PDFs need reportlab and scans need Pillow, both installed with the app.
+
+Usage:
+    python benchmarks/bench_pdf_triage.py [--repeat 20]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("TRACE_LOG", "0")
+
+from PIL import Image
+from reportlab.pdfgen import canvas
+
+from pdf_triage import triage_pdf
+from resume_processor import ResumeProcessor
+
+def text_pdf(pages):
+    """A PDF with a full page of text on every page."""
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page in range(pages):
+        for line in range(50):
+            pdf.drawString(50, 800 - line * 15, f"Line {line} of page {page}: built and migrated a cloud platform")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+def scanned_pdf(pages):
+    """A PDF of page-sized noise images, like a scan with no OCR layer."""
+    images = [Image.effect_noise((1275, 1650), 64).convert("RGB") for _ in range(pages)]
+    buffer = io.BytesIO()
+    images[0].save(buffer, format="PDF", save_all=True, append_images=images[1:])
+    return buffer.getvalue()
+
+def timing(function, repeat):
+    """Median milliseconds of function() and its last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def main(args):
+    with open(os.path.join(ROOT, "sample_resume.pdf"), "rb") as sample:
+        uploads = [("sample_resume", sample.read())]
+    uploads += [(f"text, {pages} pages", text_pdf(pages)) for pages in (2, 8, 40)]
+    uploads += [(f"scan, {pages} pages", scanned_pdf(pages)) for pages in (1, 4)]
+
+    print(f"{'upload':>16s} {'KB':>7s} {'verdict':>11s} {'triage ms':>10s} {'parse ms':>9s} {'text chars':>11s}")
+    for label, data in uploads:
+        triage_ms, triage = timing(lambda: triage_pdf(data), args.repeat)
+        parse_ms, resume = timing(lambda: ResumeProcessor.parse_resume(io.BytesIO(data)), max(1, args.repeat // 4))
+        print(
+            f"{label:>16s} {len(data) / 1024:7.0f} {triage.verdict:>11s} {triage_ms:10.2f} "
+            f"{parse_ms:9.1f} {len(resume.full_text.strip()):11d}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions of triage (the parse runs a quarter as often)")
+    args = parser.parse_args()
+    main(args)
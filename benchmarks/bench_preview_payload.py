@@ -0,0 +1,96 @@
+"""
+Compare what a Streamlit rerun sends for a generated portfolio, inline vs by URL.
+
+With inline previews every rerun of the Generate & Download tab puts the
+whole HTML document into the page (components.html) and hands the HTML and
+the ZIP bytes to two download buttons, so all of it is sent again whenever
+any widget changes. With URL previews the rerun only sends three URLs, and
+the browser loads the page from /preview/{hash} once and then revalidates it
+with a 304.
+
+For each HTML size this registers a preview through the ASGI app, then prints
+the bytes each rerun sends both ways, and the size and time of the first
+preview load and of a revalidation.
+
+Usage:
+    python benchmarks/bench_preview_payload.py [--kb 20,100,500] [--repeat 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a throwaway database before it is imported
+_work_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_work_dir, 'bench.db')}"
+os.environ.setdefault("TRACE_LOG", "0")
+
+import httpx
+
+from api import app
+from portfolio_generator import PortfolioGenerator
+
+PUBLIC_URL = "https://api.example.com"
+
+def make_html(seed, kb):
+    """Distinct, moderately compressible HTML of roughly kb kilobytes."""
+    rng = random.Random(seed)
+    words = ["portfolio", "experience", "python", "design", "cloud", "team", "project", "impact"]
+    paragraphs = []
+    size = 0
+    while size < kb * 1024:
+        paragraph = "<p>" + " ".join(rng.choice(words) for _ in range(40)) + f" {rng.random()}</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    return f"<html><body><h1>Portfolio {seed}</h1>{''.join(paragraphs)}</body></html>"
+
+async def timed_get(client, url, repeat, headers=None):
+    """Mean milliseconds of repeat GETs. Returns (last response, mean ms)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = await client.get(url, headers=headers)
+    return response, (time.perf_counter() - start) * 1000 / repeat
+
+async def main(args):
+    sizes = [int(kb) for kb in args.kb.split(",")]
+    print(
+        f"{'html KB':>8s} {'inline rerun KB':>16s} {'url rerun B':>12s} "
+        f"{'first load KB':>14s} {'first ms':>9s} {'304 B':>6s} {'304 ms':>7s}"
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for kb in sizes:
+            html_content = make_html(kb, kb)
+            html_bytes = len(html_content.encode("utf-8"))
+
+            # Inline: the iframe srcdoc plus both download buttons' data
+            inline_bytes = 2 * html_bytes + len(PortfolioGenerator.create_zip_file(html_content))
+
+            response = await client.post("/previews", data={"html_content": html_content})
+            preview_url = PUBLIC_URL + response.json()["preview_url"]
+            urls = [preview_url, f"{preview_url}?download=true", f"{preview_url}/zip"]
+            url_bytes = sum(len(url) for url in urls)
+
+            path = response.json()["preview_url"]
+            first, first_ms = await timed_get(client, path, args.repeat)
+            revalidated, revalidate_ms = await timed_get(
+                client, path, args.repeat, headers={"If-None-Match": first.headers["etag"]}
+            )
+            if first.status_code != 200 or revalidated.status_code != 304:
+                raise AssertionError(f"Expected 200 then 304, got {first.status_code} and {revalidated.status_code}")
+
+            print(
+                f"{html_bytes / 1024:8.0f} {inline_bytes / 1024:16.1f} {url_bytes:12d} "
+                f"{len(first.content) / 1024:14.1f} {first_ms:9.2f} {len(revalidated.content):6d} {revalidate_ms:7.2f}"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kb", default="20,100,500", help="Comma-separated HTML sizes in kilobytes")
+    parser.add_argument("--repeat", type=int, default=50, help="Requests per timing")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,208 @@
+"""
+Benchmark concurrent throughput of the read endpoints against a local SQLite database.
+
+Compares the async handlers in api.py with the previous pattern of running
+synchronous SessionLocal queries inside async handlers. Both apps run the same
+queries behind the same tracing middleware, and the read cache is off unless
+CACHE_TTL is set, so only the database layer differs.
+
+Each scenario adds a simulated storage latency to every SQL statement, slept
+in the thread that runs it, to stand in for page cache misses or a slow disk.
+At 0 ms every page is in memory: blocking calls then cost less than aiosqlite's
+thread round trips on one core, and the async path only pulls ahead when the
+worker threads have more cores to run on. Once statements wait on storage, the
+sync path serializes every wait on the event loop while the async path
+overlaps them.
+
+Usage:
+    python benchmarks/bench_read_endpoints.py [--requests 2000] [--concurrency 50] [--users 100] [--portfolios-per-user 50] [--latency-ms 0 1]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a throwaway database before it is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("TRACE_LOG", "0")
+os.environ.setdefault("CACHE_TTL", "0")
+
+import httpx
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import contains_eager, undefer
+from sqlalchemy.orm.attributes import set_committed_value
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+import database
+from api import app
+from database import create_schema, SessionLocal, User, Portfolio, Resume, ResumeSection, HtmlBlob
+from html_blobs import html_hash, compress_html
+from tracing import TracingMiddleware
+
+# Seconds slept per statement; changed between scenarios
+storage_latency = 0.0
+
+def _simulate_storage_latency(statement):
+    if storage_latency:
+        time.sleep(storage_latency)
+
+@event.listens_for(database.engine, "connect")
+def _trace_sync_connection(dbapi_connection, connection_record):
+    dbapi_connection.set_trace_callback(_simulate_storage_latency)
+
+@event.listens_for(database.async_engine.sync_engine, "connect")
+def _trace_async_connection(dbapi_connection, connection_record):
+    # aiosqlite calls the callback on its worker thread, where the statement runs
+    dbapi_connection.run_async(lambda connection: connection.set_trace_callback(_simulate_storage_latency))
+
+# Tables are created explicitly, not when the database module is imported
+create_schema()
+
+def seed(users, portfolios_per_user):
+    """Insert sample users, portfolios and resumes with sections. Returns (emails, portfolio_ids)."""
+    db = SessionLocal()
+    html = "<html><body>" + "<p>Portfolio content</p>" * 100 + "</body></html>"
+    codec, data, size = compress_html(html)
+    blob_hash = html_hash(html)
+    emails = [f"user{u}@example.com" for u in range(users)]
+    db.execute(insert(User), [{"email": email} for email in emails])
+    user_ids = db.execute(select(User.id)).scalars().all()
+    db.execute(insert(HtmlBlob), [{
+        "hash": blob_hash, "codec": codec, "data": data, "size": size,
+        "stored_size": len(data), "ref_count": len(user_ids) * portfolios_per_user
+    }])
+    db.execute(insert(Portfolio), [
+        {"user_id": user_id, "name": f"Portfolio {p}", "theme": "Modern Minimalist", "html_blob_hash": blob_hash}
+        for user_id in user_ids for p in range(portfolios_per_user)
+    ])
+    portfolio_ids = db.execute(select(Portfolio.id)).scalars().all()
+    db.execute(insert(Resume), [
+        {"portfolio_id": portfolio_id, "extracted_name": "Sample User"}
+        for portfolio_id in portfolio_ids
+    ])
+    resume_ids = db.execute(select(Resume.id)).scalars().all()
+    db.execute(insert(ResumeSection), [
+        {"resume_id": resume_id, "section": section, "position": position, "content": content}
+        for resume_id in resume_ids
+        for position, (section, content) in enumerate((("SKILLS", "Python"), ("EXPERIENCE", "Engineer at Example")))
+    ])
+    db.commit()
+    db.close()
+    return emails, portfolio_ids
+
+def build_sync_app():
+    """The previous handler pattern: the same queries, blocking inside async endpoints."""
+    sync_app = FastAPI()
+    sync_app.add_middleware(TracingMiddleware)
+
+    @sync_app.get("/user-portfolios/{email}")
+    async def get_user_portfolios(email: str):
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(User.id.label("user_id"), Portfolio.id, Portfolio.name, Portfolio.theme,
+                       Portfolio.created_at, Portfolio.is_favorite)
+                .outerjoin(Portfolio, Portfolio.user_id == User.id)
+                .filter(User.email == email)
+            ).all()
+            return JSONResponse(content={"status": "success", "portfolios": [
+                {"id": p.id, "name": p.name, "theme": p.theme,
+                 "created_at": p.created_at.isoformat(), "is_favorite": p.is_favorite}
+                for p in rows if p.id is not None
+            ]})
+        finally:
+            db.close()
+
+    @sync_app.get("/portfolio/{portfolio_id}")
+    async def get_portfolio(portfolio_id: int):
+        db = SessionLocal()
+        try:
+            portfolio = db.execute(
+                select(Portfolio)
+                .outerjoin(Portfolio.resume)
+                .outerjoin(Portfolio.html_blob)
+                .options(
+                    undefer(Portfolio.page_weight_json),
+                    contains_eager(Portfolio.resume),
+                    contains_eager(Portfolio.html_blob)
+                )
+                .filter(Portfolio.id == portfolio_id)
+            ).scalars().first()
+            resume = portfolio.resume
+            set_committed_value(resume, "sections", db.execute(
+                select(ResumeSection)
+                .filter(ResumeSection.resume_id == resume.id)
+                .order_by(ResumeSection.position)
+            ).scalars().all())
+            return JSONResponse(content={"status": "success", "portfolio": {
+                "id": portfolio.id, "name": portfolio.name, "theme": portfolio.theme,
+                "created_at": portfolio.created_at.isoformat(), "is_favorite": portfolio.is_favorite,
+                "page_weight": None,
+                "resume": {"name": resume.extracted_name, "email": resume.extracted_email,
+                           "phone": resume.extracted_phone, "sections": resume.section_map()},
+                "html_content": portfolio.html
+            }})
+        finally:
+            db.close()
+
+    return sync_app
+
+async def run(target_app, paths, concurrency):
+    """Issue every request in paths with the given concurrency. Returns requests per second."""
+    transport = httpx.ASGITransport(app=target_app)
+    queue = list(paths)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while queue:
+                response = await client.get(queue.pop())
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return len(paths) / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--portfolios-per-user", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 1],
+                        help="Simulated storage latency per statement, one scenario each")
+    args = parser.parse_args()
+
+    emails, portfolio_ids = seed(args.users, args.portfolios_per_user)
+    paths = []
+    for i in range(args.requests):
+        if i % 2:
+            paths.append(f"/user-portfolios/{emails[i % len(emails)]}")
+        else:
+            paths.append(f"/portfolio/{portfolio_ids[i % len(portfolio_ids)]}")
+
+    async def measure(target):
+        # Warm up connections and code paths before measuring
+        await run(target, paths[:100], args.concurrency)
+        return await run(target, paths, args.concurrency)
+
+    async def measure_all():
+        global storage_latency
+        for latency_ms in args.latency_ms:
+            storage_latency = latency_ms / 1000
+            print(f"{latency_ms:g} ms storage latency per statement")
+            for label, target in (("sync session in async handler", build_sync_app()), ("async session", app)):
+                rps = await measure(target)
+                print(f"  {label:32s} {rps:10.1f} req/s")
+        await database.async_engine.dispose()
+
+    # One event loop for the whole run: pooled async connections are bound to it
+    asyncio.run(measure_all())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Compare sending the whole resume with referencing the stored extraction by ID.
+
+For resumes of growing length, extracts the text once, stores it as
+/extract-resume does, applies a typical edit (a new name and one rewritten
+section) and then, through the ASGI app:
+
+    upload    Size of the resume form field(s) of a save request, sent as
+              str(dict) (the old generate request), the resume dictionary
+              as JSON, the compact format, and resume_id + resume_patch
+    parse     Server time to turn those fields into a resume dictionary:
+              eval() of str(dict) as /generate-portfolio used to, and the
+              current parsing of each request format
+    save      Median /save-portfolio latency with a full compact resume
+              vs resume_id + resume_patch
+
+Usage:
+    python benchmarks/bench_resume_handles.py [--sections 10,40,160] [--repeat 30]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a throwaway database before it is imported
+_work_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_work_dir, 'bench.db')}"
+os.environ.setdefault("TRACE_LOG", "0")
+
+import httpx
+
+import database
+from api import app, _store_resume, _request_resume
+from database import create_schema
+from resume_model import ParsedResume, resume_patch
+from resume_processor import ResumeProcessor
+
+# Tables are created explicitly, not when the database module is imported
+create_schema()
+
+HEADERS = ["EXPERIENCE", "EDUCATION", "SKILLS", "PROJECTS", "CERTIFICATIONS", "PUBLICATIONS", "AWARDS", "VOLUNTEER"]
+
+def make_text(sections):
+    """Resume-like text with a header and the given number of sections."""
+    rng = random.Random(sections)
+    words = ["led", "built", "python", "platform", "team", "migrated", "latency", "customers", "design", "cloud"]
+    lines = ["Jordan Example", "jordan@example.com | 555-010-0100", ""]
+    for index in range(sections):
+        lines.append(f"{HEADERS[index % len(HEADERS)]} {index}")
+        lines.extend("- " + " ".join(rng.choice(words) for _ in range(15)) for _ in range(8))
+        lines.append("")
+    return "\n".join(lines)
+
+def parse_timing(function, repeat):
+    """Median microseconds of function()."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+async def async_parse_timing(function, repeat):
+    """Median microseconds of await function()."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await function()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+async def save_timing(client, fields, repeat):
+    """Median milliseconds of a /save-portfolio request with the given resume fields."""
+    timings = []
+    for index in range(repeat):
+        data = {"email": "handles@example.com", "theme": "Modern Minimalist", "html_content": f"<p>{index}</p>", **fields}
+        start = time.perf_counter()
+        response = await client.post("/save-portfolio", data=data)
+        timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise AssertionError(f"Save failed: {response.text}")
+    return statistics.median(timings)
+
+async def main(args):
+    print(f"{'sections':>8s} {'str(dict)':>10s} {'dict JSON':>10s} {'compact':>10s} {'id+patch':>10s} "
+          f"{'eval us':>8s} {'compact us':>10s} {'id+patch us':>11s} {'save full ms':>12s} {'save id ms':>10s}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for sections in [int(count) for count in args.sections.split(",")]:
+            text = make_text(sections)
+            extracted = ParsedResume(text, ResumeProcessor.extract_section_spans(text), name="Jordan Example")
+            resume_id = await _store_resume(extracted)
+
+            # A typical edit: a new name and one rewritten section
+            edited = extracted.to_dict()
+            edited["name"] = "Jordan Q. Example"
+            first_section = next(iter(edited["sections"]))
+            edited["sections"][first_section] += "\n- added after review"
+
+            legacy = str(edited)
+            dict_json = json.dumps(edited)
+            compact = json.dumps(ParsedResume.from_dict(edited).to_wire())
+            patch = json.dumps(resume_patch(extracted.to_dict(), edited))
+            if await _request_resume(None, resume_id, patch) != edited or await _request_resume(compact, None, None) != edited:
+                raise AssertionError("Patched resume differs from the edited one")
+
+            eval_us = parse_timing(lambda: eval(legacy), args.repeat)
+            compact_us = await async_parse_timing(lambda: _request_resume(compact, None, None), args.repeat)
+            patch_us = await async_parse_timing(lambda: _request_resume(None, resume_id, patch), args.repeat)
+            save_full = await save_timing(client, {"resume_data": compact}, args.repeat)
+            save_id = await save_timing(client, {"resume_id": resume_id, "resume_patch": patch}, args.repeat)
+
+            def kb(value):
+                return f"{len(value.encode()) / 1024:9.1f}K"
+
+            print(
+                f"{sections:8d} {kb(legacy):>10s} {kb(dict_json):>10s} {kb(compact):>10s} {kb(resume_id + patch):>10s} "
+                f"{eval_us:8.0f} {compact_us:10.0f} {patch_us:11.0f} {save_full:12.1f} {save_id:10.1f}"
+            )
+
+    await database.async_engine.dispose()
+    if database.async_write_engine is not database.async_engine:
+        await database.async_write_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", default="10,40,160", help="Comma-separated section counts of synthetic resumes")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed repetitions per measurement")
+    args = parser.parse_args()
+    asyncio.run(main(args))
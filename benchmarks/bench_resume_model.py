@@ -0,0 +1,104 @@
+"""
+Compare the resume dictionary with the compact ParsedResume in memory and on the wire.
+
+For the sample resume and for synthetic resumes of growing length, builds
+both representations from the same extracted text and reports:
+
+    memory      Python memory allocated for the resume, measured with
+                tracemalloc (the extracted text itself is shared and not counted
+                for either, as the PDF parser produces it in both cases)
+    extract     /extract-resume response body, dictionary vs compact=true
+    generate    /generate-portfolio resume_data field, str(dict) as the
+                frontend sent it vs compact JSON
+    pickle      Bytes sent back from an embedded-mode extraction worker
+
+Usage:
+    python benchmarks/bench_resume_model.py [--sections 10,40,160]
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_model import ParsedResume
+from resume_processor import ResumeProcessor
+
+HEADERS = ["EXPERIENCE", "EDUCATION", "SKILLS", "PROJECTS", "CERTIFICATIONS", "PUBLICATIONS", "AWARDS", "VOLUNTEER"]
+
+def make_text(sections):
+    """Resume-like text with a header and the given number of sections."""
+    rng = random.Random(sections)
+    words = ["led", "built", "python", "platform", "team", "migrated", "latency", "customers", "design", "cloud"]
+    lines = ["Jordan Example", "jordan@example.com | 555-010-0100", ""]
+    for index in range(sections):
+        lines.append(f"{HEADERS[index % len(HEADERS)]} {index}")
+        lines.extend("- " + " ".join(rng.choice(words) for _ in range(15)) for _ in range(8))
+        lines.append("")
+    return "\n".join(lines)
+
+def build_dict(text):
+    sections = ResumeProcessor.extract_sections(text)
+    return {
+        "full_text": text,
+        "sections": sections,
+        "email": ResumeProcessor.extract_email(text),
+        "phone": ResumeProcessor.extract_phone(text),
+        "name": ResumeProcessor.extract_name(text, sections)
+    }
+
+def build_compact(text):
+    resume = ParsedResume(text, ResumeProcessor.extract_section_spans(text))
+    resume.email = ResumeProcessor.extract_email(text)
+    resume.phone = ResumeProcessor.extract_phone(text)
+    resume.name = ResumeProcessor.extract_name(text, resume.sections)
+    return resume
+
+def allocated(build, text):
+    """Bytes still allocated after building a resume from text. Returns (resume, bytes)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    resume = build(text)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return resume, size
+
+def row(label, text):
+    resume_dict, dict_memory = allocated(build_dict, text)
+    resume, compact_memory = allocated(build_compact, text)
+    if resume.to_dict() != resume_dict or ParsedResume.from_dict(resume_dict).to_dict() != resume_dict:
+        raise AssertionError("Compact resume does not round-trip to the same dictionary")
+
+    extract_dict = len(json.dumps({"status": "success", "data": resume_dict}).encode())
+    extract_compact = len(json.dumps({"status": "success", "data": resume.to_wire()}).encode())
+    generate_dict = len(str(resume_dict).encode())
+    generate_compact = len(json.dumps(ParsedResume.from_dict(resume_dict).to_wire()).encode())
+    pickle_dict = len(pickle.dumps(resume_dict))
+    pickle_compact = len(pickle.dumps(resume))
+
+    def pair(before, after):
+        return f"{before / 1024:7.1f} -> {after / 1024:6.1f}"
+
+    print(
+        f"{label:>16s} {len(text) / 1024:8.1f} {pair(dict_memory, compact_memory)} {pair(extract_dict, extract_compact)} "
+        f"{pair(generate_dict, generate_compact)} {pair(pickle_dict, pickle_compact)}"
+    )
+
+def main(args):
+    print("Sizes in KB, dictionary -> compact")
+    print(f"{'resume':>16s} {'text':>8s} {'memory':>17s} {'extract':>17s} {'generate':>17s} {'pickle':>17s}")
+    sample_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_resume.pdf")
+    with open(sample_path, "rb") as sample:
+        row("sample_resume", ResumeProcessor.extract_text_from_pdf(sample))
+    for sections in [int(count) for count in args.sections.split(",")]:
+        row(f"{sections} sections", make_text(sections))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", default="10,40,160", help="Comma-separated section counts of synthetic resumes")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,102 @@
+"""
+Benchmark portfolio saves per second against a local SQLite database.
+
+Compares the previous save sequence (user lookup plus three commits with
+refreshes), the single-transaction save in PortfolioStore, and the batched
+bulk save.
+
+Usage:
+    python benchmarks/bench_save_portfolio.py [--saves 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a throwaway database before it is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from sqlalchemy import select
+
+from database import create_schema, AsyncSessionLocal, async_engine, User, Portfolio, Resume
+from portfolio_store import PortfolioStore
+
+# Tables are created explicitly, not when the database module is imported
+create_schema()
+
+RESUME_INFO = {
+    "full_text": "Jane Doe\nEXPERIENCE\nEngineer at Example Corp\n" * 20,
+    "sections": {"EXPERIENCE": "Engineer at Example Corp", "SKILLS": "Python, SQL"},
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "phone": "555-123-4567"
+}
+HTML = "<html><body>" + "<p>Portfolio content</p>" * 200 + "</body></html>"
+
+async def legacy_save(db, email):
+    """The previous save sequence: one commit and refresh per record."""
+    user = (await db.execute(select(User).filter(User.email == email))).scalars().first()
+    if not user:
+        user = User(email=email)
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+    portfolio = Portfolio(user_id=user.id, name="Legacy", theme="Modern Minimalist", html_content=HTML)
+    db.add(portfolio)
+    await db.commit()
+    await db.refresh(portfolio)
+    db.add(Resume(
+        portfolio_id=portfolio.id,
+        sections_json=json.dumps(RESUME_INFO["sections"]),
+        **PortfolioStore._resume_row(RESUME_INFO)
+    ))
+    await db.commit()
+    return portfolio.id
+
+async def single_save(db, email):
+    return await PortfolioStore.save_portfolio(db, email, RESUME_INFO, "Modern Minimalist", HTML, "Single")
+
+async def measure_each(save, saves, emails):
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        for i in range(saves):
+            await save(db, emails[i % len(emails)])
+        return saves / (time.perf_counter() - start)
+
+async def measure_bulk(saves, emails):
+    items = [
+        {
+            "email": emails[i % len(emails)],
+            "resume_info": RESUME_INFO,
+            "theme": "Modern Minimalist",
+            "html_content": HTML,
+            "portfolio_name": "Bulk"
+        } for i in range(saves)
+    ]
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        await PortfolioStore.save_portfolios_bulk(db, items)
+        return saves / (time.perf_counter() - start)
+
+async def main(saves):
+    emails = [f"user{i}@example.com" for i in range(50)]
+    results = [
+        ("legacy (3 commits per save)", await measure_each(legacy_save, saves, emails)),
+        ("single transaction", await measure_each(single_save, saves, emails)),
+        ("bulk, one transaction", await measure_bulk(saves, emails)),
+    ]
+    for label, rate in results:
+        print(f"{label:30s} {rate:10.1f} saves/s")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--saves", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.saves))
@@ -0,0 +1,120 @@
+"""
+Benchmark /search query latency against a large local SQLite database.
+
+Generates synthetic resumes (100k by default), saves them with the bulk save
+path so the search index is maintained the same way as in production, then
+times ranked queries with and without theme and user filters.
+
+Usage:
+    python benchmarks/bench_search.py [--resumes 100000] [--repeat 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a throwaway database before it is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from database import create_schema, AsyncSessionLocal, async_engine
+from portfolio_store import PortfolioStore
+from search_index import SearchIndex
+
+# Tables are created explicitly, not when the database module is imported
+create_schema()
+
+# Real resumes mention a long tail of employers and skills; Zipf-weighted
+# vocabularies keep a few terms very common ("Kubernetes" ends up in roughly
+# one resume in six) and most of them rare
+COMPANIES = ["Google", "Amazon", "Microsoft", "Meta", "Apple", "IBM", "Accenture", "Deloitte", "Oracle",
+             "Goldman Sachs", "JPMorgan", "Netflix", "Stripe", "Shopify", "Salesforce", "Uber", "Airbnb"]
+COMPANIES += [f"Company{n}" for n in range(300 - len(COMPANIES))]
+SKILLS = ["Python", "SQL", "Java", "JavaScript", "AWS", "Kubernetes", "Docker", "React", "Go", "Terraform",
+          "PostgreSQL", "TypeScript", "Spark", "Kafka", "Rust", "Django", "FastAPI", "Airflow", "Snowflake"]
+SKILLS += [f"Skill{n}" for n in range(200 - len(SKILLS))]
+COMPANY_WEIGHTS = [1 / (rank + 1) for rank in range(len(COMPANIES))]
+SKILL_WEIGHTS = [1 / (rank + 1) for rank in range(len(SKILLS))]
+TITLES = ["Software Engineer", "Data Engineer", "Product Manager", "SRE", "Analyst", "Designer"]
+THEMES = ["Modern Minimalist", "Netflix Style", "Professional Corporate", "Creative Portfolio"]
+FILLER = ("designed built shipped maintained scaled migrated improved reduced latency cost "
+          "reliability pipelines services dashboards teams customers platform").split()
+
+QUERIES = ["Kubernetes", "Goldman", "Python Kafka", "Terraform AWS", "Goldman Sachs Rust", "kube*",
+           "Company250", "platform"]
+
+def synthetic_item(i, rng):
+    """One saved portfolio with a plausible resume."""
+    jobs = []
+    for company in rng.choices(COMPANIES, COMPANY_WEIGHTS, k=rng.randint(2, 4)):
+        jobs.append(
+            f"{rng.choice(TITLES)} at {company}\n"
+            + " ".join(rng.choice(FILLER) for _ in range(40))
+        )
+    skills = ", ".join(dict.fromkeys(rng.choices(SKILLS, SKILL_WEIGHTS, k=6)))
+    sections = {"EXPERIENCE": "\n".join(jobs), "SKILLS": skills}
+    name = f"Candidate {i}"
+    return {
+        "email": f"user{i % 5000}@example.com",
+        "resume_info": {
+            "full_text": f"{name}\nEXPERIENCE\n{sections['EXPERIENCE']}\nSKILLS\n{skills}",
+            "sections": sections,
+            "name": name
+        },
+        "theme": rng.choice(THEMES),
+        # Shared HTML keeps the blob table small, it isn't part of the benchmark
+        "html_content": "<html><body>portfolio</body></html>",
+        "portfolio_name": f"{name} Portfolio"
+    }
+
+async def populate(resumes, chunk):
+    rng = random.Random(42)
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for offset in range(0, resumes, chunk):
+            items = [synthetic_item(i, rng) for i in range(offset, min(resumes, offset + chunk))]
+            await PortfolioStore.save_portfolios_bulk(db, items)
+    return time.perf_counter() - start
+
+async def time_query(repeat, query, **filters):
+    latencies = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            total, _results = await SearchIndex.search(db, query, **filters)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return total, latencies
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def main(resumes, repeat):
+    elapsed = await populate(resumes, 5000)
+    print(f"Indexed {resumes} resumes in {elapsed:.1f}s ({resumes / elapsed:.0f}/s)")
+    print()
+    print(f"{'query':40s} {'matches':>8s} {'p50 ms':>8s} {'p95 ms':>8s}")
+
+    cases = [(query, {}) for query in QUERIES] + [
+        ("Kubernetes", {"theme": "Netflix Style"}),
+        ("Python", {"email": "user42@example.com"}),
+        ("Python", {"page": 50}),
+    ]
+    for query, filters in cases:
+        total, latencies = await time_query(repeat, query, **filters)
+        label = query + "".join(f" [{key}={value}]" for key, value in filters.items())
+        print(f"{label:40s} {total:8d} {statistics.median(latencies):8.2f} {percentile(latencies, 0.95):8.2f}")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per query")
+    args = parser.parse_args()
+    asyncio.run(main(args.resumes, args.repeat))
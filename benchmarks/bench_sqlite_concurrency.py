@@ -0,0 +1,157 @@
+"""
+Benchmark mixed read and write throughput of the API on SQLite.
+
+Runs the same workload twice in fresh processes, once with SQLite's defaults
+(SQLITE_TUNING=0: rollback journal, writes on any pooled connection) and once
+with the SQLite profile in database.py (WAL, tuned pragmas, a single queued
+writer connection). Concurrent clients read portfolios and save new ones
+through the ASGI app; the report shows throughput, failures and latency for
+each.
+
+Usage:
+    python benchmarks/bench_sqlite_concurrency.py [--requests 2000] [--concurrency 32] [--write-ratio 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESUME_INFO = {
+    "full_text": "Jane Doe\nEXPERIENCE\nEngineer at Example Corp\nSKILLS\nPython, SQL",
+    "sections": {"EXPERIENCE": "Engineer at Example Corp", "SKILLS": "Python, SQL"},
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "phone": "555-123-4567"
+}
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def run_workload(requests, concurrency, write_ratio, seed_portfolios):
+    """Run the mixed workload in this process. Returns a result dictionary."""
+    import httpx
+    from api import app
+    from database import AsyncWriteSessionLocal, async_engine, async_write_engine, create_schema
+    from portfolio_store import PortfolioStore
+
+    create_schema()
+
+    html = "<html><body>" + "<p>Portfolio content</p>" * 100 + "</body></html>"
+    async with AsyncWriteSessionLocal() as db:
+        portfolio_ids = await PortfolioStore.save_portfolios_bulk(db, [
+            {
+                "email": f"user{i % 50}@example.com",
+                "resume_info": RESUME_INFO,
+                "theme": "Modern Minimalist",
+                "html_content": html,
+                "portfolio_name": f"Seed {i}"
+            } for i in range(seed_portfolios)
+        ])
+
+    rng = random.Random(7)
+    plan = [rng.random() < write_ratio for _ in range(requests)]
+    reads, writes, failures = [], [], []
+    next_request = iter(range(requests))
+
+    async def client(c):
+        for i in next_request:
+            start = time.perf_counter()
+            if plan[i]:
+                response = await c.post("/save-portfolio", data={
+                    "email": f"user{i % 50}@example.com",
+                    "resume_data": json.dumps(RESUME_INFO),
+                    "theme": "Modern Minimalist",
+                    "html_content": html + str(i),
+                    "portfolio_name": f"Portfolio {i}"
+                })
+                latencies = writes
+            elif i % 2:
+                response = await c.get(f"/portfolio/{rng.choice(portfolio_ids)}")
+                latencies = reads
+            else:
+                response = await c.get(f"/user-portfolios/user{i % 50}@example.com")
+                latencies = reads
+            if response.status_code == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                failures.append(response.json().get("message", str(response.status_code)))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as c:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(c) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    await async_engine.dispose()
+    if async_write_engine is not async_engine:
+        await async_write_engine.dispose()
+
+    return {
+        "throughput": (len(reads) + len(writes)) / elapsed,
+        "reads": len(reads),
+        "writes": len(writes),
+        "failures": len(failures),
+        "failure_sample": failures[:1],
+        "read_p50": statistics.median(reads) if reads else 0.0,
+        "read_p95": percentile(reads, 0.95),
+        "write_p50": statistics.median(writes) if writes else 0.0,
+        "write_p95": percentile(writes, 0.95)
+    }
+
+def run_profile(tuning, args):
+    """Run the workload in a fresh process so the engines are configured from scratch."""
+    db_dir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        SQLITE_TUNING=tuning,
+        TRACE_LOG="0"
+    )
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker",
+         "--requests", str(args.requests),
+         "--concurrency", str(args.concurrency),
+         "--write-ratio", str(args.write_ratio),
+         "--seed-portfolios", str(args.seed_portfolios)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # Request logging may precede the result, which is always the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed-portfolios", type=int, default=1000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(run_workload(args.requests, args.concurrency, args.write_ratio, args.seed_portfolios))
+        print(json.dumps(result))
+        sys.exit(0)
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent clients, {args.write_ratio:.0%} writes")
+    print()
+    print(f"{'profile':18s} {'req/s':>8s} {'failed':>7s} {'read p50':>9s} {'read p95':>9s} {'write p50':>10s} {'write p95':>10s}")
+    for label, tuning in (("SQLite defaults", "0"), ("SQLite profile", "1")):
+        result = run_profile(tuning, args)
+        print(
+            f"{label:18s} {result['throughput']:8.1f} {result['failures']:7d} "
+            f"{result['read_p50']:9.1f} {result['read_p95']:9.1f} "
+            f"{result['write_p50']:10.1f} {result['write_p95']:10.1f}"
+        )
+        if result["failure_sample"]:
+            print(f"    e.g. {result['failure_sample'][0][:120]}")
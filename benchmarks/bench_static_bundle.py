@@ -0,0 +1,64 @@
+"""
+Compare what visitors download from the single-file export and the static bundle.
+
+For model-style portfolios of several sizes (see bench_html_postprocess),
+post-processed as they are stored, reports gzip-compressed bytes of:
+
+    first view    Everything the page needs: the single HTML file, vs
+                  index.html and its CSS and JS files
+    repeat view   What is downloaded again once the assets are cached: the
+                  single HTML file again, vs only index.html
+
+and the median time of building the bundle, with and without precompression.
+
+Usage:
+    python benchmarks/bench_static_bundle.py [--cards 10,40,160] [--repeat 20]
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("TRACE_LOG", "0")
+
+from bench_html_postprocess import make_portfolio
+from html_postprocess import process_html
+from static_bundle import build_bundle
+
+def gzip_size(data):
+    return len(gzip.compress(data))
+
+def timing(function, repeat):
+    """Median milliseconds of function() and its last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def main(args):
+    print("Gzip bytes, single file -> bundle")
+    print(f"{'portfolio':>10s} {'first view':>16s} {'repeat view':>16s} {'build ms':>9s} {'precompressed ms':>17s}")
+    for cards in [int(count) for count in args.cards.split(",")]:
+        html, _ = process_html(make_portfolio(cards))
+        build_ms, files = timing(lambda: build_bundle(html), args.repeat)
+        precompress_ms, _ = timing(lambda: build_bundle(html, precompress=True), args.repeat)
+        single = gzip_size(html.encode("utf-8"))
+        index = gzip_size(files["index.html"])
+        assets = sum(gzip_size(data) for path, data in files.items() if path.startswith("assets/"))
+        print(
+            f"{cards:4d} cards {single:7d} -> {index + assets:6d} {single:7d} -> {index:6d} "
+            f"{build_ms:9.2f} {precompress_ms:17.2f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", default="10,40,160", help="Comma-separated experience card counts")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per portfolio")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,340 @@
+"""
+Read-through cache for API responses.
+
+Cached values are encoded JSON response bodies, so a hit is sent as-is with
+no database access and no re-serialization. There are two tiers:
+
+    local   A size-bounded LRU with a TTL in each worker process.
+    shared  An optional backend that all workers read and write, so one
+            worker's miss becomes every worker's hit.
+
+Writes invalidate the affected keys in the local tier of the worker that
+handled them and in the shared tier. Other workers' local entries expire
+after CACHE_TTL seconds, which bounds how stale they can get.
+
+Environment variables:
+    CACHE_TTL: Local entry lifetime in seconds (default 30, 0 disables caching).
+    CACHE_MAX_ENTRIES: Local entry limit (default 1000).
+    CACHE_MAX_BYTES: Local size limit in bytes (default 64 MiB).
+    CACHE_BACKEND: Shared backend, "none" (default), "memory" or "redis".
+    CACHE_SHARED_TTL: Shared entry lifetime in seconds (default 300).
+    CACHE_SHARED_MAX_ENTRIES: Entry limit of the memory backend (default 10000).
+    CACHE_SHARED_MAX_BYTES: Size limit of the memory backend in bytes (default 256 MiB).
+    CACHE_REDIS_URL: Redis URL for the redis backend.
+    PREVIEW_TTL: Lifetime in seconds of stored portfolio previews (default 86400).
+    PREVIEW_MAX_BYTES: Local size limit of stored previews in bytes (default 64 MiB).
+    RESUME_TTL: Lifetime in seconds of stored resume extractions (default 3600).
+    RESUME_MAX_BYTES: Local size limit of stored resume extractions in bytes (default 32 MiB).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, Counter
+
+class LRUCache:
+    """
+    Thread-safe LRU cache of bytes values, bounded by entry count and total size.
+    """
+
+    def __init__(self, max_entries, max_bytes, ttl):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value under key, evicting least recently used entries to stay in bounds.
+
+        Args:
+            key: Cache key.
+            value: Bytes to store.
+            ttl: Lifetime in seconds, if not the cache's own.
+
+        Returns:
+            Number of entries evicted.
+        """
+        if len(value) > self.max_bytes:
+            return 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self.size += len(value)
+            evicted = 0
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+            return evicted
+
+    def delete(self, key):
+        """Remove key if present."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self.size -= len(value)
+
+class InMemorySharedBackend:
+    """
+    Shared backend kept in this process.
+
+    Stands in for an external cache in tests and benchmarks: every ReadCache
+    created with the same instance shares its entries, like workers sharing
+    a Redis server. Like a Redis server with an eviction policy, it drops the
+    least recently used entries to stay within its limits.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=256 * 1024 * 1024):
+        self._entries = LRUCache(max_entries, max_bytes, ttl=0)
+
+    async def get(self, key):
+        return self._entries.get(key)
+
+    async def set(self, key, value, ttl):
+        self._entries.set(key, value, ttl)
+
+    async def delete(self, keys):
+        for key in keys:
+            self._entries.delete(key)
+
+class RedisSharedBackend:
+    """
+    Shared backend on a Redis server. Requires the redis package.
+    """
+
+    def __init__(self, url, prefix="portfolio-cache:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ImportError("The redis cache backend requires the redis package")
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key):
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def delete(self, keys):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+class ReadCache:
+    """
+    Two-tier read-through cache with hit rate counters.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024, ttl=30, shared=None, shared_ttl=300):
+        self.enabled = ttl > 0
+        self.local = LRUCache(max_entries, max_bytes, ttl)
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.counts = Counter()
+        # Sequence number of the latest invalidation, overall and per key.
+        # Only the most recently invalidated keys are remembered; a read
+        # older than the newest forgotten invalidation is never cached.
+        self._sequence = 0
+        self._invalidated = OrderedDict()
+        self._max_invalidated = max_entries
+        self._forgotten = 0
+
+    def generation(self, key):
+        """
+        Current generation of key, to pass to set() after loading the value.
+
+        A write that invalidates key in between moves past this generation,
+        so a read that started before the write can't cache what it loaded.
+        """
+        return self._sequence
+
+    def _invalidated_since(self, key, generation):
+        return self._invalidated.get(key, self._forgotten) > generation
+
+    async def get(self, key):
+        """
+        Look key up in the local tier, then the shared one.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Cached bytes, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        value = self.local.get(key)
+        if value is not None:
+            self.counts["local_hits"] += 1
+            return value
+        if self.shared is not None:
+            try:
+                value = await self.shared.get(key)
+            except Exception as e:
+                # The shared tier is an optimization; fall back to the database
+                self.counts["shared_errors"] += 1
+                print(f"Shared cache read failed for {key}: {str(e)}")
+            if value is not None:
+                self.counts["shared_hits"] += 1
+                self.local.set(key, value)
+                return value
+        self.counts["misses"] += 1
+        return None
+
+    async def set(self, key, value, generation):
+        """
+        Cache a freshly loaded value unless key was invalidated since the load began.
+
+        Args:
+            key: Cache key.
+            value: Bytes to cache.
+            generation: Result of generation(key) taken before loading the value.
+        """
+        if not self.enabled or self._invalidated_since(key, generation):
+            return
+        self.counts["evictions"] += self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value, self.shared_ttl)
+            except Exception as e:
+                self.counts["shared_errors"] += 1
+                print(f"Shared cache write failed for {key}: {str(e)}")
+
+    async def invalidate(self, *keys):
+        """
+        Drop keys from both tiers after a write.
+
+        Args:
+            *keys: Cache keys to drop.
+        """
+        for key in keys:
+            self._sequence += 1
+            self._invalidated[key] = self._sequence
+            self._invalidated.move_to_end(key)
+            self.local.delete(key)
+        while len(self._invalidated) > self._max_invalidated:
+            _, self._forgotten = self._invalidated.popitem(last=False)
+        self.counts["invalidations"] += len(keys)
+        if self.shared is not None and keys:
+            try:
+                await self.shared.delete(list(keys))
+            except Exception as e:
+                self.counts["shared_errors"] += 1
+                print(f"Shared cache invalidation failed for {', '.join(keys)}: {str(e)}")
+
+    def stats(self):
+        """
+        Hit rates and sizes for the debug endpoint.
+
+        Returns:
+            Dictionary of counters and ratios.
+        """
+        hits = self.counts["local_hits"] + self.counts["shared_hits"]
+        lookups = hits + self.counts["misses"]
+        return {
+            "enabled": self.enabled,
+            "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+            "lookups": lookups,
+            "local_hits": self.counts["local_hits"],
+            "shared_hits": self.counts["shared_hits"],
+            "misses": self.counts["misses"],
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "local_hit_rate": round(self.counts["local_hits"] / lookups, 4) if lookups else 0.0,
+            "invalidations": self.counts["invalidations"],
+            "evictions": self.counts["evictions"],
+            "shared_errors": self.counts["shared_errors"],
+            "local_entries": len(self.local),
+            "local_bytes": self.local.size
+        }
+
+def portfolio_key(portfolio_id, include_html=True):
+    """Cache key of the /portfolio/{id} response, with or without its HTML."""
+    return f"portfolio:{portfolio_id}" if include_html else f"portfolio:{portfolio_id}:no-html"
+
+def portfolio_keys(portfolio_id):
+    """Cache keys of every /portfolio/{id} response variant, for invalidation."""
+    return portfolio_key(portfolio_id), portfolio_key(portfolio_id, include_html=False)
+
+def user_portfolios_key(email):
+    """Cache key of the /user-portfolios/{email} response."""
+    return f"user-portfolios:{email}"
+
+def preview_key(preview_hash):
+    """Cache key of a stored /preview/{hash} document."""
+    return f"preview:{preview_hash}"
+
+def resume_key(resume_id):
+    """Cache key of a stored resume extraction."""
+    return f"resume:{resume_id}"
+
+def _shared_backend_from_env():
+    backend = os.environ.get("CACHE_BACKEND", "none")
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return InMemorySharedBackend(
+            max_entries=int(os.environ.get("CACHE_SHARED_MAX_ENTRIES", "10000")),
+            max_bytes=int(os.environ.get("CACHE_SHARED_MAX_BYTES", str(256 * 1024 * 1024)))
+        )
+    if backend == "redis":
+        return RedisSharedBackend(os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+# One shared backend (and Redis connection pool) for all the caches below;
+# their keys have distinct prefixes
+shared_backend = _shared_backend_from_env()
+
+read_cache = ReadCache(
+    max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.environ.get("CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.environ.get("CACHE_TTL", "30")),
+    shared=shared_backend,
+    shared_ttl=int(os.environ.get("CACHE_SHARED_TTL", "300"))
+)
+
+# Generated portfolios that aren't saved yet, served to the frontend's
+# preview iframe; content-addressed, so entries are never invalidated
+preview_store = ReadCache(
+    max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.environ.get("PREVIEW_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.environ.get("PREVIEW_TTL", "86400")),
+    shared=shared_backend,
+    shared_ttl=int(os.environ.get("PREVIEW_TTL", "86400"))
+)
+
+# Extracted resumes, referenced by ID from generate and save requests so the
+# client doesn't upload them again; entries are only replaced, never edited
+resume_store = ReadCache(
+    max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.environ.get("RESUME_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl=float(os.environ.get("RESUME_TTL", "3600")),
+    shared=shared_backend,
+    shared_ttl=int(os.environ.get("RESUME_TTL", "3600"))
+)
@@ -1,10 +1,17 @@
 import os
+import json
+import threading
 from datetime import datetime
 import ssl
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, make_url, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, LargeBinary, UniqueConstraint
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import sessionmaker, relationship, deferred
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from html_blobs import decompress_html
+from artifact_store import get_artifact_store
+from search_index import create_search_index
 
 # Get database URL from environment variable
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///portfolio_generator.db")
@@ -25,18 +32,94 @@ if DATABASE_URL.startswith('postgresql'):
         "sslmode": "require"
     }
 
-# Create SQLAlchemy engine with connection pooling and retry settings
-engine = create_engine(
-    DATABASE_URL,
-    connect_args=connect_args,
-    poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=1800  # Recycle connections after 30 minutes
+# SQLite profile for single-node deployments: WAL lets readers run while a
+# write is in progress, and all API writes share one connection so they queue
+# in the pool instead of failing with "database is locked". Set SQLITE_TUNING=0
+# to use SQLite's defaults.
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+SQLITE_TUNING = IS_SQLITE and os.environ.get("SQLITE_TUNING", "1") != "0"
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # Durable in WAL mode except on power loss
+    "busy_timeout": 5000,  # Milliseconds to wait for a lock held by another process
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024  # Negative values are in KiB, so 64 MiB per connection
+}
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to every new connection."""
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def _use_immediate_transactions(engine):
+    """
+    Start every transaction on engine with BEGIN IMMEDIATE.
+    
+    A deferred transaction that reads before it writes can fail at once with
+    "database is locked" when another connection wrote in between; taking the
+    write lock up front makes it wait for busy_timeout instead.
+    
+    Args:
+        engine: Synchronous engine, or the sync_engine of an async engine.
+    """
+    @event.listens_for(engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself rather than the sqlite3 module
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+# Session factories are bound to the engines by init_engines()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+def _async_database_url(url):
+    """
+    Map a synchronous database URL onto its async driver.
+    
+    Args:
+        url: Database URL as configured in DATABASE_URL.
+        
+    Returns:
+        The same URL using asyncpg for PostgreSQL and aiosqlite for SQLite.
+    """
+    scheme, _, rest = url.partition("://")
+    driver = scheme.split("+", 1)[0]
+    if driver == "postgresql":
+        # sslmode is a libpq query option; asyncpg takes an SSL context instead
+        async_url = make_url(f"postgresql+asyncpg://{rest}")
+        return async_url.difference_update_query(["sslmode"]).render_as_string(hide_password=False)
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+ASYNC_DATABASE_URL = _async_database_url(DATABASE_URL)
+
+# asyncpg does not understand the libpq keyword arguments above, so the SSL
+# context and timeout are passed in its own form
+async_connect_args = {}
+if ASYNC_DATABASE_URL.startswith('postgresql+asyncpg'):
+    async_connect_args = {
+        "ssl": ssl_context,
+        "timeout": 10
+    }
+
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+AsyncWriteSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 class User(Base):
@@ -55,18 +138,60 @@ class Portfolio(Base):
     __tablename__ = "portfolios"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     name = Column(String(255))
     theme = Column(String(100))
-    html_content = Column(Text)
+    html_content = Column(Text)  # Legacy inline HTML, replaced by html_blob_hash
+    html_blob_hash = Column(String(64), ForeignKey("html_blobs.hash"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     is_favorite = Column(Boolean, default=False)
+    # Page-weight report as JSON (see page_weight); load it explicitly so
+    # listings never pull it
+    page_weight_json = deferred(Column(Text), raiseload=True)
     
     # Relationship to user
     user = relationship("User", back_populates="portfolios")
     
+    # Relationship to the compressed HTML; load it explicitly so listings
+    # never pull blob data
+    html_blob = relationship("HtmlBlob", lazy="raise")
+    
     # Relationship to resume
     resume = relationship("Resume", back_populates="portfolio", uselist=False)
+    
+    @property
+    def html(self):
+        """HTML of the portfolio, decompressed from its blob when it has one."""
+        if self.html_blob_hash is None:
+            return self.html_content
+        return self.html_blob.html
+
+class HtmlBlob(Base):
+    """Compressed, content-addressed portfolio HTML shared by identical portfolios."""
+    __tablename__ = "html_blobs"
+
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the uncompressed HTML
+    codec = Column(String(16), nullable=False)
+    data = Column(LargeBinary)  # NULL when the blob lives in the artifact store
+    storage_key = Column(String(255))  # Artifact store key, if stored externally
+    size = Column(Integer, nullable=False)  # Uncompressed size in bytes
+    stored_size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def stored_bytes(self):
+        """The blob's stored bytes, from the row or from the artifact store."""
+        if self.storage_key is None:
+            return self.data
+        store = get_artifact_store()
+        if store is None:
+            raise ValueError(f"Blob {self.hash} is in an artifact store, but ARTIFACT_STORE is not configured")
+        return store.get(self.storage_key)
+    
+    @property
+    def html(self):
+        """Decompressed HTML."""
+        return decompress_html(self.codec, self.stored_bytes())
 
 class Resume(Base):
     """Resume model for storing uploaded resume information."""
@@ -79,19 +204,177 @@ class Resume(Base):
     extracted_name = Column(String(255))
     extracted_email = Column(String(255))
     extracted_phone = Column(String(255))
-    sections_json = Column(Text)  # JSON string of extracted sections
+    sections_json = Column(Text)  # Legacy JSON string of sections, replaced by resume_sections
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship to portfolio
     portfolio = relationship("Portfolio", back_populates="resume")
+    
+    # Relationship to sections in resume order; load it explicitly
+    sections = relationship(
+        "ResumeSection",
+        back_populates="resume",
+        order_by="ResumeSection.position",
+        cascade="all, delete-orphan",
+        lazy="raise"
+    )
+    
+    def section_map(self):
+        """Sections as an ordered {name: content} dictionary, reading legacy JSON if not migrated."""
+        if self.sections:
+            return {section.section: section.content for section in self.sections}
+        if self.sections_json:
+            return json.loads(self.sections_json)
+        return {}
+
+class ResumeSection(Base):
+    """One section of a resume, stored on its own so it can be read, updated and queried alone."""
+    __tablename__ = "resume_sections"
+    __table_args__ = (UniqueConstraint("resume_id", "section", name="uq_resume_sections_resume_section"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False)
+    section = Column(String(100), nullable=False, index=True)  # Canonical name, e.g. "SKILLS"
+    position = Column(Integer, nullable=False)  # Order within the resume
+    content = Column(Text, nullable=False)
+    
+    # Relationship to resume
+    resume = relationship("Resume", back_populates="sections")
+
+
+_engine_lock = threading.Lock()
+_engines_ready = False
+
+def init_engines():
+    """
+    Create the database engines and bind the session factories to them.
+    
+    Nothing connects to the database until the first query, and calling this
+    again is a no-op. The API calls it during startup; other code gets the
+    engines created on first access to database.engine, database.async_engine
+    or database.async_write_engine.
+    """
+    global engine, async_engine, async_write_engine, _engines_ready
+    if _engines_ready:
+        return
+    with _engine_lock:
+        if _engines_ready:
+            return
+
+        # Create SQLAlchemy engine with connection pooling and retry settings
+        if SQLITE_TUNING:
+            # Local file connections are cheap and never go stale, so no recycling
+            engine = create_engine(
+                DATABASE_URL,
+                poolclass=QueuePool,
+                pool_size=5,
+                max_overflow=10,
+                pool_timeout=30
+            )
+            event.listen(engine, "connect", _apply_sqlite_pragmas)
+        else:
+            engine = create_engine(
+                DATABASE_URL,
+                connect_args=connect_args,
+                poolclass=QueuePool,
+                pool_size=5,
+                max_overflow=10,
+                pool_timeout=30,
+                pool_recycle=1800  # Recycle connections after 30 minutes
+            )
+
+        # Async engine used by the FastAPI handlers so queries don't block the event loop
+        if SQLITE_TUNING:
+            # Sessions already roll back when they close, so skip the pool's
+            # second rollback; each one is a round trip to aiosqlite's thread
+            async_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=5,
+                max_overflow=10,
+                pool_timeout=30,
+                pool_reset_on_return=None
+            )
+            event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
 
-# Create tables in the database
-Base.metadata.create_all(bind=engine)
+            # SQLite allows one writer at a time, so API writes go through a single
+            # connection and wait their turn in the pool while readers carry on
+            async_write_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=1,
+                max_overflow=0,
+                pool_timeout=30
+            )
+            event.listen(async_write_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+            _use_immediate_transactions(async_write_engine.sync_engine)
+        else:
+            async_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                connect_args=async_connect_args,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=5,
+                max_overflow=10,
+                pool_timeout=30,
+                pool_recycle=1800,
+                pool_pre_ping=True
+            )
 
-# Dependency to get the database session
-def get_db():
+            # Other databases handle concurrent writers themselves
+            async_write_engine = async_engine
+
+        SessionLocal.configure(bind=engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+        AsyncWriteSessionLocal.configure(bind=async_write_engine)
+        _engines_ready = True
+
+def __getattr__(name):
+    # Engines are created on first use so importing this module stays cheap
+    if name in ("engine", "async_engine", "async_write_engine"):
+        init_engines()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_schema_created = False
+
+def create_schema():
+    """
+    Create missing tables and the search index.
+    
+    Runs at most once per process. The API only calls it at startup when
+    CREATE_SCHEMA=1, and the embedded backend when it starts; otherwise run
+    `python database.py` once per database.
+    """
+    global _schema_created
+    if _schema_created:
+        return
+    init_engines()
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        create_search_index(connection)
+    _schema_created = True
+
+# Dependency to get an async database session for the API
+async def get_db():
+    init_engines()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency for endpoints that write; on SQLite these share the single writer connection
+async def get_write_db():
+    init_engines()
+    async with AsyncWriteSessionLocal() as db:
+        yield db
+
+# Synchronous session generator for scripts and other non-async callers
+def get_sync_db():
+    init_engines()
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+if __name__ == "__main__":
+    create_schema()
+    print("Database schema is up to date")
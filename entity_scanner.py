@@ -0,0 +1,117 @@
+"""
+Single-pass scanner for contact details and dates in resume text.
+
+Emails, phone numbers, URLs, dates and date ranges used to be found with a
+separate pattern each, every one of them run over the whole text even when
+only its first match was kept. Here they are alternatives of one pattern,
+so a single pass over the text finds all of them as typed spans, and a
+scan for the first match of each kind stops as soon as it has them.
+
+Where two kinds could match the same characters, the earliest match wins
+and the kinds are tried in the order of KINDS, e.g. a date range is not
+also reported as two dates, and digits inside a URL are not a phone
+number. A scan for some of the kinds uses a pattern of just those, so
+text the other kinds would have claimed can match them.
+"""
+import functools
+import re
+
+EMAIL = "email"
+PHONE = "phone"
+URL = "url"
+DATE_RANGE = "date_range"
+DATE = "date"
+
+KINDS = (URL, EMAIL, DATE_RANGE, DATE, PHONE)
+
+# Month names, full or abbreviated, as the experience splitter has always accepted them
+_MONTH = r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)'
+
+# "March 2020", "03/2020" or a bare year
+_DATE = rf'(?=[JFMASOND\d])(?:\b{_MONTH}[\s,]+\d{{4}}|\b\d{{1,2}}/\d{{4}}\b|\b(?:19|20)\d{{2}}\b)'
+
+# A date, a dash and a later date, "Present" or a month whose year is implied
+_DATE_RANGE = rf'{_DATE}\s*[-–—]\s*(?:Present|Current|Now\b|{_MONTH}(?:[\s,]+\d{{4}})?|\d{{1,2}}/\d{{4}}\b|(?:19|20)\d{{2}}\b)'
+
+# Lookaheads on the first character let a scan pass over words that can't
+# start an entity of that kind without trying each of its alternatives
+_PATTERNS = {
+    # A URL does not end in the punctuation of the sentence around it
+    URL: r'(?=[hwlg])(?:https?://|www\.|\b(?:linkedin|github|gitlab)\.com/)[^\s<>()"\']*[^\s<>()"\'.,;:!?]',
+    EMAIL: r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    DATE_RANGE: _DATE_RANGE,
+    DATE: _DATE,
+    # International numbers start with a country code; others are the national format
+    PHONE: r'(?=[+(\d])(?:\+\d{1,3}[-.\s]?(?:\(?\d{1,4}\)?[-.\s]?){1,4}\d{2,4}|\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})',
+}
+
+@functools.lru_cache(maxsize=None)
+def _compile(kinds):
+    """The pattern matching the given kinds, each a named group so a match reports its kind."""
+    alternatives = '|'.join(f'(?P<{kind}>{_PATTERNS[kind]})' for kind in kinds)
+    # Entities start a word, so positions inside one are rejected before any alternative is tried
+    return re.compile(rf'(?<![A-Za-z0-9])(?:{alternatives})', re.IGNORECASE)
+
+# The pattern for every kind is compiled once at import
+ENTITY_RE = _compile(KINDS)
+
+class Entity:
+    """
+    A typed span of resume text.
+    """
+
+    __slots__ = ("kind", "start", "end", "text")
+
+    def __init__(self, kind, start, end, text):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"Entity({self.kind!r}, {self.start}, {self.end}, {self.text!r})"
+
+def scan(text, kinds=None, first=False):
+    """
+    Find entities in text in a single pass.
+
+    Args:
+        text: Text to scan.
+        kinds: Kinds of entity to report, or None for all of them.
+        first: Report only the first entity of each kind, and stop scanning
+            once every requested kind has been found.
+
+    Returns:
+        List of Entity spans in text order.
+    """
+    wanted = KINDS if kinds is None else tuple(kind for kind in KINDS if kind in kinds)
+    if not wanted:
+        return []
+    found = set()
+    entities = []
+    for match in _compile(wanted).finditer(text):
+        kind = match.lastgroup
+        if first and kind in found:
+            continue
+        entities.append(Entity(kind, match.start(), match.end(), match.group()))
+        if first:
+            found.add(kind)
+            if len(found) == len(wanted):
+                break
+    return entities
+
+def first_of_kind(text, *kinds):
+    """
+    The first match of each kind, from one pass that stops when all are found.
+
+    Args:
+        text: Text to scan.
+        *kinds: Kinds of entity to look for.
+
+    Returns:
+        Dictionary mapping each kind to the matched text, "" if not found.
+    """
+    values = dict.fromkeys(kinds, "")
+    for entity in scan(text, kinds, first=True):
+        values[entity.kind] = entity.text
+    return values
@@ -0,0 +1,289 @@
+"""
+Structured parsing of a resume's experience section.
+
+The section is read one line at a time. Each line is classified once as
+blank, bullet, dated (it holds a date range) or plain text, using date
+range spans from a single entity scan of the whole section. Every dated
+line starts a role. When the date range is all the line holds, the plain
+lines just above it (at most two, up to a blank line or bullet) are its
+heading; otherwise the dated line is the whole heading. The lines after it
+are the role's bullets until the next role's heading. Plain lines that don't
+continue a bullet are kept as the role's notes, between the bullets where
+they appeared, so no text is lost or reordered. A section without date
+ranges is split on lines that look like job titles instead. Both passes are
+linear in the length of the section.
+
+Parsed sections are memoized by the SHA-256 of their content, so building
+the prompt again for a preview of the same resume parses nothing.
+"""
+import hashlib
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+
+from entity_scanner import DATE_RANGE, scan
+
+# Parsed experience sections kept, least recently used evicted first
+EXPERIENCE_CACHE_SIZE = 256
+
+# Lines that start a role when the section has no date ranges to split on
+JOB_TITLE_RE = re.compile(r'[A-Z][a-zA-Z\s,]+(Developer|Engineer|Designer|Manager|Director|Analyst|Consultant|Specialist|Coordinator|Assistant|Lead|Head|Chief|Officer|Administrator|Supervisor)\b', re.IGNORECASE)
+
+# Longest line, in words, taken for a job title rather than a sentence
+MAX_TITLE_WORDS = 10
+
+# Bullet markers as they come out of PDF text
+BULLET_RE = re.compile(r'^(?:[-*•▪◦●‣–—]|o(?=\s))\s*')
+
+# Separators between a title and a company on one line, most specific first
+HEADING_SEPARATORS = (" at ", " | ", " - ", " – ", " — ", ", ")
+
+# The dash between the start and end of a date range
+DATE_RANGE_DASH_RE = re.compile(r'\s*[-–—]\s*')
+
+# Punctuation left around a date range removed from a heading line
+_HEADING_TRIM = " \t|,-–—·•()"
+
+# Plain lines above a bare dated line that are taken as the role's heading
+MAX_HEADING_LINES = 2
+
+# How a line ends when its text wraps onto the next line
+WRAP_ENDINGS = (",", ";", ":", "&", "/", "-", " and", " or", " of", " to", " for", " with", " the")
+
+_BLANK, _BULLET, _DATED, _TEXT = range(4)
+
+class Experience:
+    """
+    One role from an experience section.
+    """
+
+    __slots__ = ("title", "company", "start", "end", "body")
+
+    def __init__(self, title="", company="", start="", end="", bullets=(), notes=(), body=None):
+        self.title = title
+        self.company = company
+        self.start = start
+        self.end = end
+        # ("bullet" or "note", text) pairs in resume order; without one the
+        # bullets come first
+        if body is None:
+            body = [("bullet", bullet) for bullet in bullets] + [("note", note) for note in notes]
+        self.body = tuple(body)
+
+    @property
+    def bullets(self):
+        """The bulleted lines, in order."""
+        return tuple(text for kind, text in self.body if kind == "bullet")
+
+    @property
+    def notes(self):
+        """Plain lines that aren't part of a bullet, in order."""
+        return tuple(text for kind, text in self.body if kind == "note")
+
+    @property
+    def dates(self):
+        """The date range as written, e.g. "June 2022 - Present"."""
+        return f"{self.start} - {self.end}" if self.end else self.start
+
+    def to_dict(self):
+        """The role as a JSON-serializable dictionary."""
+        return {
+            "title": self.title,
+            "company": self.company,
+            "start": self.start,
+            "end": self.end,
+            "bullets": list(self.bullets),
+            "notes": list(self.notes)
+        }
+
+    def to_text(self):
+        """The role as labelled lines followed by its bullets and notes in resume order, for a prompt."""
+        lines = [
+            f"{label}: {value}" for label, value in
+            (("Title", self.title), ("Company", self.company), ("Dates", self.dates)) if value
+        ]
+        lines.extend(f"- {text}" if kind == "bullet" else text for kind, text in self.body)
+        return "\n".join(lines)
+
+    def __eq__(self, other):
+        return isinstance(other, Experience) and self.to_dict() == other.to_dict() and self.body == other.body
+
+    def __repr__(self):
+        return f"Experience({self.title!r}, {self.company!r}, {self.dates!r}, {len(self.bullets)} bullets)"
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def parse_experiences(experience_text):
+    """
+    Parse an experience section into roles, memoized by its content.
+
+    Args:
+        experience_text: Text content of the experience section.
+
+    Returns:
+        Tuple of Experience records in the order they appear.
+    """
+    key = hashlib.sha256(experience_text.encode("utf-8")).digest()
+    with _cache_lock:
+        experiences = _cache.get(key)
+        if experiences is not None:
+            _cache.move_to_end(key)
+            return experiences
+
+    experiences = _parse(experience_text)
+    with _cache_lock:
+        _cache[key] = experiences
+        while len(_cache) > EXPERIENCE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return experiences
+
+def clear_cache():
+    """Forget every parsed section."""
+    with _cache_lock:
+        _cache.clear()
+
+def _classify(text, date_ranges):
+    """
+    Split text into lines and classify each one.
+
+    Returns:
+        List of (kind, line, date range text or None) tuples; bullet lines
+        have their marker removed and dated lines the date range.
+    """
+    raw_lines = text.split("\n")
+    line_starts = list(accumulate((len(line) + 1 for line in raw_lines[:-1]), initial=0))
+
+    # The first date range on each line that has one
+    dated = {}
+    for entity in date_ranges:
+        if entity.kind == DATE_RANGE:
+            dated.setdefault(bisect_right(line_starts, entity.start) - 1, entity)
+
+    lines = []
+    for index, line in enumerate(raw_lines):
+        stripped = line.strip()
+        if not stripped:
+            lines.append((_BLANK, "", None))
+        elif index in dated:
+            date_range = dated[index]
+            offset = line_starts[index]
+            rest = line[:date_range.start - offset] + " " + line[date_range.end - offset:]
+            lines.append((_DATED, rest.strip(_HEADING_TRIM), date_range.text))
+        else:
+            bullet = BULLET_RE.match(stripped)
+            if bullet:
+                lines.append((_BULLET, stripped[bullet.end():], None))
+            else:
+                lines.append((_TEXT, stripped, None))
+    return lines
+
+def _split_heading(parts):
+    """Title and company from a role's heading lines."""
+    parts = [part for part in parts if part]
+    if not parts:
+        return "", ""
+    if len(parts) == 1:
+        for separator in HEADING_SEPARATORS:
+            first, found, second = parts[0].partition(separator)
+            if found:
+                break
+        else:
+            return parts[0], ""
+    else:
+        first, found, second = parts[0], "\n", " ".join(parts[1:])
+    first, second = first.strip(), second.strip()
+    # "Company" before "Job Title" is as common as the other way round
+    if JOB_TITLE_RE.match(second) and not JOB_TITLE_RE.match(first):
+        first, second = second, first
+    return first, second
+
+def _is_title(line):
+    """Whether a plain line looks like a job title that starts a role."""
+    return len(line.split()) <= MAX_TITLE_WORDS and JOB_TITLE_RE.match(line) is not None
+
+def _wraps(previous, line):
+    """Whether a plain line is the rest of the line above it, wrapped by the PDF layout."""
+    return line[:1].islower() or previous.endswith(WRAP_ENDINGS)
+
+def _role(heading, date_range, body):
+    """
+    Build one Experience.
+
+    Args:
+        heading: Heading parts, in order.
+        date_range: The role's date range as written, or None.
+        body: The (kind, line) pairs after the heading. Plain lines right
+            after a dated line complete a heading that has no company yet;
+            other plain lines continue the bullet or note right above them
+            if they look wrapped, and are kept as notes otherwise.
+    """
+    title, company = _split_heading(heading)
+    lines = []
+    # Whether the next plain line may continue the last bullet or note
+    continues = False
+    in_heading = date_range is not None
+    for kind, line in body:
+        if kind == _TEXT and in_heading and not company:
+            heading.append(line)
+            title, company = _split_heading(heading)
+            continue
+        in_heading = False
+        if kind == _BLANK:
+            continues = False
+        elif kind == _BULLET:
+            lines.append(("bullet", line))
+            continues = True
+        elif continues and _wraps(lines[-1][1], line):
+            lines[-1] = (lines[-1][0], lines[-1][1] + " " + line)
+        else:
+            lines.append(("note", line))
+            continues = True
+    start, end = "", ""
+    if date_range:
+        parts = DATE_RANGE_DASH_RE.split(date_range, maxsplit=1)
+        start, end = parts[0], parts[1] if len(parts) > 1 else ""
+    return Experience(title, company, start, end, body=lines)
+
+def _parse(experience_text):
+    """Parse an experience section without the cache."""
+    lines = _classify(experience_text, scan(experience_text, [DATE_RANGE]))
+
+    # The section usually starts with its own header, e.g. "WORK EXPERIENCE"
+    first = next((index for index, (kind, _, _) in enumerate(lines) if kind != _BLANK), None)
+    if first is not None and lines[first][0] == _TEXT and lines[first][1].isupper():
+        lines[first] = (_BLANK, "", None)
+
+    # Where each role's heading starts, and the line with its date range if it has one
+    roles = []
+    dated = [index for index, (kind, _, _) in enumerate(lines) if kind == _DATED]
+    if dated:
+        for index in dated:
+            start = index
+            # A dated line that also names the title or company is the whole heading
+            if not lines[index][1]:
+                while index - start < MAX_HEADING_LINES and start > 0 and lines[start - 1][0] == _TEXT:
+                    start -= 1
+            roles.append((start, index))
+    else:
+        roles = [(index, index) for index, (kind, line, _) in enumerate(lines) if kind == _TEXT and _is_title(line)]
+    if not roles:
+        body = [(kind, line) for kind, line, _ in lines]
+        return (_role([], None, body),) if any(kind != _BLANK for kind, _ in body) else ()
+
+    experiences = []
+    for number, (start, heading_end) in enumerate(roles):
+        end = roles[number + 1][0] if number + 1 < len(roles) else len(lines)
+        kind, line, date_range = lines[heading_end]
+        heading = [text for _, text, _ in lines[start:heading_end]] + [line]
+        # Lines above the first role's heading are kept as the start of its body
+        before = [(kind, text) for kind, text, _ in lines[:start]] if number == 0 else []
+        body = [(kind, text) for kind, text, _ in lines[heading_end + 1:end]]
+        experience = _role(heading, date_range, body)
+        if before:
+            preamble = _role([], None, before)
+            experience.body = preamble.body + experience.body
+        experiences.append(experience)
+    return tuple(experiences)
@@ -0,0 +1,77 @@
+"""
+Hashing and compression for content-addressed portfolio HTML.
+
+Identical HTML always hashes to the same key, so saving the same output twice
+stores one compressed copy. zstd is used when the optional ``zstandard``
+package is installed, otherwise zlib. The codec is stored with each blob so
+either can be read back regardless of what is installed for writing. Blobs
+kept in an external artifact store use the "identity" codec so they can be
+served straight from the file with byte ranges.
+"""
+import hashlib
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+DEFAULT_CODEC = "zstd" if zstandard is not None else "zlib"
+
+def html_hash(html_content):
+    """
+    Content hash used as the blob key.
+
+    Args:
+        html_content: HTML string.
+
+    Returns:
+        Hex SHA-256 of the UTF-8 encoded HTML.
+    """
+    return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+
+def compress_html(html_content, codec=DEFAULT_CODEC):
+    """
+    Compress HTML for storage.
+
+    Args:
+        html_content: HTML string.
+        codec: "zstd", "zlib" or "identity".
+
+    Returns:
+        Tuple of (codec, compressed bytes, uncompressed size in bytes).
+    """
+    raw = html_content.encode("utf-8")
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        return codec, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), len(raw)
+    if codec == "zlib":
+        return codec, zlib.compress(raw, ZLIB_LEVEL), len(raw)
+    if codec == "identity":
+        return codec, raw, len(raw)
+    raise ValueError(f"Unknown HTML blob codec: {codec}")
+
+def decompress_html(codec, data):
+    """
+    Decompress stored HTML.
+
+    Args:
+        codec: Codec the blob was written with.
+        data: Compressed bytes.
+
+    Returns:
+        HTML string.
+    """
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("Reading zstd blobs requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    if codec == "identity":
+        return bytes(data).decode("utf-8")
+    raise ValueError(f"Unknown HTML blob codec: {codec}")
@@ -0,0 +1,370 @@
+"""
+Post-processing of generated portfolio HTML.
+
+The model's output is stored, previewed and downloaded, so it is cleaned up
+once, right after generation:
+
+    unwrap      Drop a Markdown fence or prose around the document, which is
+                left behind when the response is cut off before its closing fence.
+    repair      Add a missing doctype (without it browsers render in quirks
+                mode), charset and viewport meta tags; drop a truncated tag at
+                the end and stray closing tags; close a script, style or
+                comment left open; close elements still open at the end.
+    minify      Remove HTML comments and collapse whitespace outside pre and
+                textarea to one space. It is only dropped next to
+                document-structure and head tags, since CSS can make any
+                other element inline (nav items, skill tags), where the
+                space between two of them shows.
+                Minify CSS. Strip JS comments, indentation and blank lines,
+                keeping line breaks so automatic semicolons still apply.
+    dedupe      Keep one copy of identical CSS rules and stylesheet <link>s,
+                dropping <style> blocks left empty. An earlier copy can
+                always go, as the later identical one wins the cascade anyway.
+
+Everything works on one tokenization of the document with precompiled
+patterns and no HTML parser dependency, and takes a few milliseconds for a
+typical portfolio. process_html() also returns what it did, with the byte
+counts before and after.
+"""
+import re
+import time
+
+# Elements that never have a closing tag
+VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr"
+))
+
+# Elements whose end tag may be left out; the parser closes them implicitly
+OPTIONAL_CLOSE_TAGS = frozenset((
+    "p", "li", "dt", "dd", "option", "optgroup", "tr", "td", "th",
+    "thead", "tbody", "tfoot", "colgroup", "rt", "rp"
+))
+
+# Elements that whitespace next to is never rendered
+STRUCTURE_TAGS = frozenset(("html", "head", "body", "title", "meta", "link"))
+
+# Elements that render nothing themselves; whitespace between two of them
+# (or one and a structure tag) can go, but not between one and text, where
+# it may be the only space between two words
+HIDDEN_TAGS = frozenset(("style", "script", "noscript"))
+
+# The document's tokens: comments, raw-text elements with their content, tags and text
+TOKEN_RE = re.compile(
+    r'(?P<comment><!--[\s\S]*?(?:-->|$))'
+    r'|(?P<raw><(?P<raw_name>script|style|pre|textarea)\b[^>]*>(?P<raw_body>[\s\S]*?)(?P<raw_end></(?P=raw_name)\s*>|$))'
+    r'|(?P<tag><(?P<close>/)?(?P<name>[A-Za-z][A-Za-z0-9-]*|!doctype)\b[^>]*(?:>|$))'
+    r'|(?P<text>[^<]+|<)',
+    re.IGNORECASE
+)
+
+# Where the document starts in a response with text around it
+DOCUMENT_START_RE = re.compile(r'<!doctype\s+html|<html[\s>]', re.IGNORECASE)
+DOCUMENT_END_RE = re.compile(r'</html\s*>', re.IGNORECASE)
+
+WHITESPACE_RE = re.compile(r'\s+')
+STYLESHEET_LINK_RE = re.compile(r'rel\s*=\s*["\']?stylesheet', re.IGNORECASE)
+
+# CSS strings are kept as they are; comments go and whitespace collapses around punctuation
+CSS_TOKEN_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*[\s\S]*?\*/|\s+')
+# Space before ":" only goes inside declarations; ".a :hover" is not ".a:hover"
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*|\s*(:)\s*(?=[^{}]*})|(:)\s+')
+CSS_EMPTY_SEMICOLON_RE = re.compile(r';+}')
+CSS_STRING_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+
+# What ends or nests a top-level CSS statement, with strings skipped whole
+CSS_STATEMENT_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[{};]')
+
+# JS strings and template literals are kept and block comments go. Line
+# breaks are kept, but not the indentation, blank lines and comments (a
+# line comment is a "//" after whitespace) around them.
+JS_TOKEN_RE = re.compile(
+    r'(?P<string>"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)'
+    r'|(?P<block>/\*[\s\S]*?\*/)'
+    r'|(?P<newline>(?:[ \t]+//[^\n]*)?(?:[ \t]*\n\s*(?://[^\n]*|/\*[\s\S]*?\*/[ \t]*)*)+)'
+    r'|(?P<comment>(?:^|[ \t]+)//[^\n]*)'
+)
+
+DOCTYPE = "<!DOCTYPE html>"
+CHARSET_META = '<meta charset="utf-8">'
+VIEWPORT_META = '<meta name="viewport" content="width=device-width, initial-scale=1">'
+
+def _unwrap(html):
+    """The HTML document without a Markdown fence or prose around it."""
+    start = DOCUMENT_START_RE.search(html)
+    if start:
+        html = html[start.start():]
+    end = None
+    for end in DOCUMENT_END_RE.finditer(html):
+        pass
+    if end:
+        html = html[:end.end()]
+    return html.strip()
+
+def _minify_css(css):
+    """Minified CSS, with strings left untouched."""
+    def token(match):
+        if match.group(1):
+            return match.group(1)
+        return "" if match.group(0).startswith("/*") else " "
+    css = CSS_TOKEN_RE.sub(token, css)
+    # Strings may hold the punctuation, so they are set aside while spacing is removed
+    parts = CSS_STRING_RE.split(css)
+    for index in range(0, len(parts), 2):
+        parts[index] = CSS_EMPTY_SEMICOLON_RE.sub("}", CSS_PUNCTUATION_RE.sub(r"\1\2\3", parts[index]))
+    return "".join(parts).strip()
+
+def _css_rules(css):
+    """Split minified CSS into top-level statements, each a rule or at-rule."""
+    rules = []
+    depth = 0
+    start = 0
+    for match in CSS_STATEMENT_RE.finditer(css):
+        char = match.group()
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:match.end()])
+                start = match.end()
+        elif char == ";" and depth == 0:
+            rules.append(css[start:match.end()])
+            start = match.end()
+    if start < len(css):
+        rules.append(css[start:])
+    return rules
+
+def _minify_js(js):
+    """JS without comments, indentation or blank lines, keeping line breaks for automatic semicolons."""
+    def token(match):
+        kind = match.lastgroup
+        if kind == "string":
+            return match.group()
+        if kind == "block":
+            return " "
+        return "\n" if kind == "newline" else ""
+    return JS_TOKEN_RE.sub(token, js).strip()
+
+class _Pipeline:
+    """
+    One run of the pipeline over a document, collecting what it changed.
+    """
+
+    def __init__(self):
+        self.repairs = []
+        self.rules_removed = 0
+        self.styles_removed = 0
+        self.links_removed = 0
+
+    def run(self, html):
+        tokens = self._tokenize(html)
+        tokens = self._dedupe_rules(tokens)
+        return self._serialize(tokens)
+
+    def _tokenize(self, html):
+        """
+        Tokens as (kind, name, text) with raw-text content minified, repairing as it goes.
+
+        kind is "open", "close", "raw", "text" or "other" (doctype and the like).
+        """
+        tokens = []
+        stack = []
+        has_doctype = False
+        for match in TOKEN_RE.finditer(html):
+            if match.group("comment") is not None:
+                comment = match.group("comment")
+                if not comment.endswith("-->"):
+                    self.repairs.append("unclosed comment")
+                # Conditional comments are kept; others are dropped either way
+                if comment.startswith("<!--[if"):
+                    tokens.append(("other", "", comment if comment.endswith("-->") else comment + "-->"))
+            elif match.group("raw") is not None:
+                tokens.append(self._raw_token(match))
+            elif match.group("tag") is not None:
+                tag = match.group("tag")
+                name = match.group("name").lower()
+                if not tag.endswith(">"):
+                    # Output cut off inside a tag
+                    self.repairs.append("truncated tag")
+                    continue
+                if name == "!doctype":
+                    has_doctype = True
+                    tokens.append(("other", name, WHITESPACE_RE.sub(" ", tag)))
+                elif match.group("close"):
+                    if name not in stack:
+                        if name not in VOID_TAGS:
+                            self.repairs.append(f"stray </{name}>")
+                        continue
+                    # Elements left open inside this one are closed by it
+                    while stack.pop() != name:
+                        pass
+                    tokens.append(("close", name, f"</{name}>"))
+                else:
+                    if name not in VOID_TAGS and not tag.endswith("/>"):
+                        stack.append(name)
+                    tokens.append(("open", name, tag))
+            else:
+                tokens.append(("text", "", match.group("text")))
+
+        unclosed = [name for name in stack if name not in OPTIONAL_CLOSE_TAGS]
+        if unclosed:
+            self.repairs.append("unclosed " + ", ".join(f"<{name}>" for name in unclosed))
+        tokens.extend(("close", name, f"</{name}>") for name in reversed(unclosed))
+        if not has_doctype:
+            self.repairs.append("missing doctype")
+            tokens.insert(0, ("other", "!doctype", DOCTYPE))
+        self._add_head_meta(tokens)
+        return tokens
+
+    def _raw_token(self, match):
+        """A script, style, pre or textarea element, its content minified where that is safe."""
+        name = match.group("raw_name").lower()
+        raw = match.group("raw")
+        start_tag = raw[:len(raw) - len(match.group("raw_body")) - len(match.group("raw_end"))]
+        body = match.group("raw_body")
+        if not match.group("raw_end"):
+            self.repairs.append(f"unclosed <{name}>")
+        if name == "style":
+            body = _minify_css(body)
+        elif name == "script":
+            body = _minify_js(body)
+        return ("raw", name, (start_tag, body, f"</{name}>"))
+
+    def _add_head_meta(self, tokens):
+        """Insert charset and viewport meta tags into the head if they are missing."""
+        head = None
+        has_charset = has_viewport = False
+        for index, (kind, name, text) in enumerate(tokens):
+            if kind == "open" and name == "head":
+                head = index
+            elif kind == "open" and name == "meta":
+                lowered = text.lower()
+                if "charset" in lowered and not has_charset:
+                    # The charset should come first, so new tags go after it
+                    has_charset = True
+                    head = index
+                has_viewport = has_viewport or "viewport" in lowered
+            elif kind == "open" and name == "body":
+                break
+        if head is None:
+            return
+        missing = []
+        if not has_charset:
+            missing.append(("open", "meta", CHARSET_META))
+            self.repairs.append("missing charset")
+        if not has_viewport:
+            missing.append(("open", "meta", VIEWPORT_META))
+            self.repairs.append("missing viewport")
+        tokens[head + 1:head + 1] = missing
+
+    def _dedupe_rules(self, tokens):
+        """
+        Drop earlier copies of identical CSS rules, style blocks and stylesheet links.
+
+        The last copy is the one kept, as it is the one that wins the cascade.
+        Only plain rules and @media blocks are compared; other at-rules
+        depend on where they are. Style blocks with attributes (e.g. media)
+        apply conditionally and are left alone.
+        """
+        styles = [
+            index for index, (kind, name, text) in enumerate(tokens)
+            if kind == "raw" and name == "style" and text[0].lower().replace(" ", "") == "<style>"
+        ]
+        statements = {index: _css_rules(tokens[index][2][1]) for index in styles}
+
+        # The last position of every comparable statement and stylesheet link
+        last = {}
+        for index in styles:
+            for position, rule in enumerate(statements[index]):
+                if not rule.startswith("@") or rule.startswith("@media"):
+                    last[rule] = (index, position)
+        last_link = {}
+        for index, (kind, name, text) in enumerate(tokens):
+            if kind == "open" and name == "link" and STYLESHEET_LINK_RE.search(text):
+                last_link[text] = index
+
+        result = []
+        for index, token in enumerate(tokens):
+            kind, name, text = token
+            if index in statements:
+                kept = [
+                    rule for position, rule in enumerate(statements[index])
+                    if last.get(rule, (index, position)) == (index, position)
+                ]
+                self.rules_removed += len(statements[index]) - len(kept)
+                start_tag, _, end_tag = text
+                if not kept:
+                    self.styles_removed += 1
+                    continue
+                token = (kind, name, (start_tag, "".join(kept), end_tag))
+            elif kind == "open" and last_link.get(text, index) != index:
+                self.links_removed += 1
+                continue
+            result.append(token)
+        return result
+
+    @staticmethod
+    def _droppable(before, after):
+        """Whether whitespace-only text between these two tokens can be left out."""
+        if before is None or after is None or before[0] == "other":
+            return True
+        if before[1] in STRUCTURE_TAGS or after[1] in STRUCTURE_TAGS:
+            return True
+        hidden = STRUCTURE_TAGS | HIDDEN_TAGS
+        return before[1] in hidden and after[1] in hidden
+
+    def _serialize(self, tokens):
+        """Join the tokens, collapsing text whitespace and dropping it where it never renders."""
+        # Text on both sides of a removed token becomes one run of text
+        merged = []
+        for token in tokens:
+            if token[0] == "text" and merged and merged[-1][0] == "text":
+                merged[-1] = ("text", "", merged[-1][2] + token[2])
+            else:
+                merged.append(token)
+        tokens = merged
+
+        parts = []
+        count = len(tokens)
+        for index, (kind, name, text) in enumerate(tokens):
+            if kind == "raw":
+                parts.append("".join(text))
+            elif kind == "text":
+                if text.isspace():
+                    before = tokens[index - 1] if index else None
+                    after = tokens[index + 1] if index + 1 < count else None
+                    if self._droppable(before, after):
+                        continue
+                    parts.append(" ")
+                else:
+                    parts.append(WHITESPACE_RE.sub(" ", text))
+            else:
+                parts.append(text)
+        return "".join(parts)
+
+def process_html(html):
+    """
+    Unwrap, repair, minify and dedupe generated portfolio HTML.
+
+    Args:
+        html: HTML as the model returned it.
+
+    Returns:
+        Tuple of (processed HTML, stats dictionary with "bytes_before",
+        "bytes_after", "repairs", "rules_removed", "styles_removed",
+        "links_removed" and "ms").
+    """
+    start = time.perf_counter()
+    pipeline = _Pipeline()
+    processed = pipeline.run(_unwrap(html))
+    stats = {
+        "bytes_before": len(html.encode("utf-8")),
+        "bytes_after": len(processed.encode("utf-8")),
+        "repairs": pipeline.repairs,
+        "rules_removed": pipeline.rules_removed,
+        "styles_removed": pipeline.styles_removed,
+        "links_removed": pipeline.links_removed,
+        "ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+    return processed, stats
@@ -0,0 +1,97 @@
+"""
+Prepare html_blobs for an external artifact store and move blobs into it.
+
+Adds the html_blobs.storage_key column and makes html_blobs.data nullable on
+databases created before artifact stores existed. With --move, blobs still
+held in the database are written to the store configured by ARTIFACT_STORE
+(uncompressed, so they can be served with byte ranges) and their row keeps
+only the key, size and hash. Safe to re-run.
+
+Usage:
+    ARTIFACT_STORE=local ARTIFACT_DIR=artifacts python migrations/artifact_store.py --move
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, select, update, text
+
+from database import create_schema, engine, SessionLocal, HtmlBlob
+from artifact_store import get_artifact_store
+from html_blobs import decompress_html
+
+def upgrade_schema():
+    """Add storage_key and drop NOT NULL from data. Returns True if anything changed."""
+    columns = {column["name"]: column for column in inspect(engine).get_columns("html_blobs")}
+    if "storage_key" in columns and columns["data"]["nullable"]:
+        return False
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            # SQLite cannot change a column's nullability, so rebuild the table.
+            # legacy_alter_table stops the rename from rewriting the foreign key
+            # in portfolios to point at the old table.
+            old_columns = [name for name in columns if name in HtmlBlob.__table__.columns]
+            column_list = ", ".join(old_columns)
+            conn.execute(text("PRAGMA legacy_alter_table = ON"))
+            conn.execute(text("ALTER TABLE html_blobs RENAME TO html_blobs_old"))
+            HtmlBlob.__table__.create(conn)
+            conn.execute(text(
+                f"INSERT INTO html_blobs ({column_list}) SELECT {column_list} FROM html_blobs_old"
+            ))
+            conn.execute(text("DROP TABLE html_blobs_old"))
+            conn.execute(text("PRAGMA legacy_alter_table = OFF"))
+        else:
+            if "storage_key" not in columns:
+                conn.execute(text("ALTER TABLE html_blobs ADD COLUMN storage_key VARCHAR(255)"))
+            conn.execute(text("ALTER TABLE html_blobs ALTER COLUMN data DROP NOT NULL"))
+    return True
+
+def move_blobs(batch_size):
+    """Write database-held blobs to the artifact store. Returns (blobs moved, bytes moved)."""
+    store = get_artifact_store()
+    if store is None:
+        raise SystemExit("Set ARTIFACT_STORE to local or s3 to move blobs out of the database")
+
+    moved = 0
+    moved_bytes = 0
+    db = SessionLocal()
+    try:
+        while True:
+            blobs = db.execute(
+                select(HtmlBlob).filter(HtmlBlob.storage_key.is_(None)).limit(batch_size)
+            ).scalars().all()
+            if not blobs:
+                break
+            for blob in blobs:
+                raw = decompress_html(blob.codec, blob.data).encode("utf-8")
+                storage_key = store.key_for(blob.hash)
+                store.put(storage_key, raw)
+                db.execute(
+                    update(HtmlBlob)
+                    .filter(HtmlBlob.hash == blob.hash)
+                    .values(codec="identity", data=None, storage_key=storage_key, stored_size=len(raw))
+                )
+                moved_bytes += len(raw)
+            db.commit()
+            moved += len(blobs)
+            print(f"Moved {moved} blobs...")
+    finally:
+        db.close()
+    return moved, moved_bytes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--move", action="store_true", help="Move database blobs into the artifact store")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    # Create any tables the migration expects that the database doesn't have yet
+    create_schema()
+
+    if upgrade_schema():
+        print("Upgraded html_blobs for artifact storage")
+    if args.move:
+        moved, moved_bytes = move_blobs(args.batch_size)
+        print(f"Moved {moved} blobs ({moved_bytes:,} bytes) to the artifact store")
@@ -0,0 +1,143 @@
+"""
+Move inline Portfolio.html_content into compressed, deduplicated HTML blobs.
+
+Adds the portfolios.html_blob_hash column if it is missing, converts every
+portfolio that still stores inline HTML, and prints a report of the storage
+savings and read-path latency before and after. Safe to re-run: converted
+rows are skipped.
+
+Usage:
+    python migrations/html_blobs.py [--batch-size 200] [--sample 200] [--vacuum]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, select, update, func, text
+from sqlalchemy.orm import joinedload
+
+from database import create_schema, engine, async_engine, AsyncSessionLocal, Portfolio, HtmlBlob
+from portfolio_store import PortfolioStore
+
+def add_blob_column():
+    """Add portfolios.html_blob_hash and its index to databases created before blobs existed."""
+    columns = {column["name"] for column in inspect(engine).get_columns("portfolios")}
+    if "html_blob_hash" in columns:
+        return False
+    with engine.begin() as conn:
+        conn.execute(text(
+            "ALTER TABLE portfolios ADD COLUMN html_blob_hash VARCHAR(64) REFERENCES html_blobs(hash)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_portfolios_html_blob_hash ON portfolios (html_blob_hash)"
+        ))
+    return True
+
+async def time_reads(portfolio_ids):
+    """Read each portfolio's HTML the way the API does. Returns per-read latencies in ms."""
+    latencies = []
+    async with AsyncSessionLocal() as db:
+        for portfolio_id in portfolio_ids:
+            start = time.perf_counter()
+            portfolio = (await db.execute(
+                select(Portfolio).options(joinedload(Portfolio.html_blob)).filter(Portfolio.id == portfolio_id)
+            )).scalars().first()
+            portfolio.html
+            latencies.append((time.perf_counter() - start) * 1000)
+            db.expunge_all()
+    return latencies
+
+async def convert(batch_size):
+    """Convert inline HTML in batches. Returns (rows converted, raw bytes, blob hashes used)."""
+    converted = 0
+    raw_bytes = 0
+    used_hashes = set()
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(
+                select(Portfolio.id, Portfolio.html_content)
+                .filter(Portfolio.html_blob_hash.is_(None), Portfolio.html_content.is_not(None))
+                .order_by(Portfolio.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+
+            # Each batch commits on its own so a large table converts incrementally
+            blob_hashes = await PortfolioStore.acquire_blobs(db, [row.html_content for row in rows])
+            for row, blob_hash in zip(rows, blob_hashes):
+                await db.execute(
+                    update(Portfolio)
+                    .filter(Portfolio.id == row.id)
+                    .values(html_blob_hash=blob_hash, html_content=None)
+                )
+                raw_bytes += len(row.html_content.encode("utf-8"))
+                used_hashes.add(blob_hash)
+            await db.commit()
+            converted += len(rows)
+            print(f"Converted {converted} portfolios...")
+    return converted, raw_bytes, used_hashes
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def main(batch_size, sample, vacuum):
+    if add_blob_column():
+        print("Added portfolios.html_blob_hash column")
+
+    async with AsyncSessionLocal() as db:
+        sample_ids = (await db.execute(
+            select(Portfolio.id)
+            .filter(Portfolio.html_blob_hash.is_(None), Portfolio.html_content.is_not(None))
+            .limit(sample)
+        )).scalars().all()
+
+    before = await time_reads(sample_ids)
+    converted, raw_bytes, used_hashes = await convert(batch_size)
+    after = await time_reads(sample_ids)
+
+    blob_count = len(used_hashes)
+    stored_bytes = 0
+    async with AsyncSessionLocal() as db:
+        hashes = list(used_hashes)
+        for start in range(0, len(hashes), 500):
+            stored_bytes += (await db.execute(
+                select(func.sum(HtmlBlob.stored_size)).filter(HtmlBlob.hash.in_(hashes[start:start + 500]))
+            )).scalar() or 0
+    await async_engine.dispose()
+
+    if vacuum and engine.dialect.name == "sqlite":
+        # SQLite only returns freed pages to the filesystem on VACUUM
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+
+    print()
+    print("HTML blob migration report")
+    print("==========================")
+    print(f"Portfolios converted:        {converted}")
+    print(f"Inline HTML before:          {raw_bytes:,} bytes")
+    print(f"Distinct blobs referenced:   {blob_count}")
+    print(f"Stored blob bytes:           {stored_bytes:,} bytes")
+    if raw_bytes:
+        print(f"Savings on converted rows:   {100 * (1 - stored_bytes / raw_bytes):.1f}%")
+    if before:
+        print(f"Read latency before (ms):    p50 {statistics.median(before):.3f}  p95 {percentile(before, 0.95):.3f}")
+        print(f"Read latency after (ms):     p50 {statistics.median(after):.3f}  p95 {percentile(after, 0.95):.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--sample", type=int, default=200, help="Portfolios timed before and after")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM SQLite databases afterwards")
+    args = parser.parse_args()
+    # Create any tables the migration expects that the database doesn't have yet
+    create_schema()
+    asyncio.run(main(args.batch_size, args.sample, args.vacuum))
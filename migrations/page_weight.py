@@ -0,0 +1,84 @@
+"""
+Add portfolios.page_weight_json and fill it in for existing portfolios.
+
+Adds the column on databases created before page-weight reports were
+stored. With --backfill, every portfolio without a report is analyzed (see
+page_weight) and the ones over budget are listed. Safe to re-run: portfolios
+that have a report are skipped.
+
+Usage:
+    python migrations/page_weight.py --backfill [--batch-size 200]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, select, update, text
+from sqlalchemy.orm import joinedload
+
+from database import create_schema, engine, SessionLocal, Portfolio
+from page_weight import analyze_page
+
+def upgrade_schema():
+    """Add the page_weight_json column. Returns True if it was missing."""
+    columns = {column["name"] for column in inspect(engine).get_columns("portfolios")}
+    if "page_weight_json" in columns:
+        return False
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE portfolios ADD COLUMN page_weight_json TEXT"))
+    return True
+
+def backfill(batch_size):
+    """Store a report for each portfolio without one. Returns (portfolios analyzed, IDs over budget)."""
+    analyzed = 0
+    over_budget = []
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while True:
+            portfolios = db.execute(
+                select(Portfolio)
+                .options(joinedload(Portfolio.html_blob))
+                .filter(Portfolio.page_weight_json.is_(None), Portfolio.id > last_id)
+                .order_by(Portfolio.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not portfolios:
+                break
+            last_id = portfolios[-1].id
+
+            for portfolio in portfolios:
+                report = analyze_page(portfolio.html or "")
+                if report.over_budget:
+                    over_budget.append(portfolio.id)
+                db.execute(
+                    update(Portfolio)
+                    .filter(Portfolio.id == portfolio.id)
+                    .values(page_weight_json=json.dumps(report.to_dict()))
+                )
+            # Each batch commits on its own so a large table fills in incrementally
+            db.commit()
+            analyzed += len(portfolios)
+            print(f"Analyzed {analyzed} portfolios...")
+    finally:
+        db.close()
+    return analyzed, over_budget
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backfill", action="store_true", help="Analyze portfolios saved without a report")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    # Create any tables the migration expects that the database doesn't have yet
+    create_schema()
+
+    if upgrade_schema():
+        print("Added portfolios.page_weight_json")
+    if args.backfill:
+        analyzed, over_budget = backfill(args.batch_size)
+        print(f"Analyzed {analyzed} portfolios, {len(over_budget)} over budget")
+        if over_budget:
+            print(f"Over budget: {', '.join(map(str, over_budget))}")
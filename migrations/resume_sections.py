@@ -0,0 +1,90 @@
+"""
+Move Resume.sections_json into rows of the resume_sections table.
+
+The resume_sections table is created automatically; this converts every
+resume that still stores its sections as a JSON string and clears the
+string. Safe to re-run: converted resumes are skipped.
+
+Usage:
+    python migrations/resume_sections.py [--batch-size 500]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, update, insert
+
+from database import create_schema, async_engine, AsyncSessionLocal, Resume, ResumeSection
+from portfolio_store import PortfolioStore
+
+async def convert(batch_size):
+    """Convert resumes in batches. Returns (resumes converted, sections created, unreadable resume IDs)."""
+    converted = 0
+    created = 0
+    unreadable = []
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(
+                select(Resume.id, Resume.sections_json)
+                .filter(Resume.sections_json.is_not(None), Resume.id > last_id)
+                .order_by(Resume.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            section_rows = []
+            converted_ids = []
+            for row in rows:
+                try:
+                    sections = json.loads(row.sections_json or "{}")
+                except ValueError:
+                    # Leave it in place so nothing is lost
+                    unreadable.append(row.id)
+                    continue
+                section_rows.extend(
+                    dict(section_row, resume_id=row.id)
+                    for section_row in PortfolioStore._section_rows({"sections": sections})
+                )
+                converted_ids.append(row.id)
+
+            # Each batch commits on its own so a large table converts incrementally
+            if section_rows:
+                await db.execute(insert(ResumeSection), section_rows)
+            if converted_ids:
+                await db.execute(
+                    update(Resume)
+                    .filter(Resume.id.in_(converted_ids))
+                    .values(sections_json=None)
+                )
+            await db.commit()
+            converted += len(converted_ids)
+            created += len(section_rows)
+            print(f"Converted {converted} resumes...")
+    return converted, created, unreadable
+
+async def main(batch_size):
+    converted, created, unreadable = await convert(batch_size)
+    await async_engine.dispose()
+
+    print()
+    print("Resume sections migration report")
+    print("================================")
+    print(f"Resumes converted:    {converted}")
+    print(f"Section rows created: {created}")
+    if unreadable:
+        print(f"Unreadable JSON left in place for resume IDs: {', '.join(map(str, unreadable))}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    # Create any tables the migration expects that the database doesn't have yet
+    create_schema()
+    asyncio.run(main(args.batch_size))
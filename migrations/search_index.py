@@ -0,0 +1,77 @@
+"""
+Build the full-text search index for portfolios saved before it existed.
+
+Creates the index, and the portfolios.user_id index used by per-user search,
+if they are missing and indexes every portfolio from its resume's text. Safe
+to re-run: existing entries are replaced.
+
+Usage:
+    python migrations/search_index.py [--batch-size 500]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from database import create_schema, engine, async_engine, AsyncSessionLocal, Portfolio, Resume
+from search_index import SearchIndex, create_search_index, search_document
+
+async def backfill(batch_size):
+    """Index portfolios in ID order, one commit per batch. Returns the number indexed."""
+    indexed = 0
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(
+                select(
+                    Portfolio.id,
+                    Portfolio.name,
+                    Resume.extracted_name,
+                    Resume.content_text,
+                    Resume.sections_json
+                )
+                .outerjoin(Resume, Resume.portfolio_id == Portfolio.id)
+                .filter(Portfolio.id > last_id)
+                .order_by(Portfolio.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+
+            documents = {}
+            for row in rows:
+                resume_info = {
+                    "name": row.extracted_name or "",
+                    "full_text": row.content_text or "",
+                    "sections": row.sections_json or "{}"
+                }
+                # A portfolio has at most one resume, keep the first if not
+                documents.setdefault(row.id, (row.id, *search_document(row.name, resume_info)))
+            await SearchIndex.index_portfolios(db, list(documents.values()))
+            await db.commit()
+
+            indexed += len(documents)
+            last_id = rows[-1].id
+            print(f"Indexed {indexed} portfolios...")
+    return indexed
+
+async def main(batch_size):
+    with engine.begin() as conn:
+        create_search_index(conn)
+        for index in Portfolio.__table__.indexes:
+            index.create(conn, checkfirst=True)
+    indexed = await backfill(batch_size)
+    await async_engine.dispose()
+    print(f"Search index built for {indexed} portfolios")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    # Create any tables the migration expects that the database doesn't have yet
+    create_schema()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,343 @@
+"""
+Offline page-weight and render-performance analysis of portfolio HTML.
+
+Generated portfolios are checked against budgets without loading them in a
+browser, from one pass of the standard library's HTML parser:
+
+    total_bytes         Size of the document, inline CSS and JS included
+    dom_nodes           Elements in the document
+    external_requests   Distinct URLs the page loads (stylesheets, scripts,
+                        images, frames, CSS url()s), plus one font file per
+                        family a font stylesheet such as Google Fonts serves
+    render_blocking     Stylesheets, CSS @imports and classic scripts without
+                        async or defer, which hold up the first paint
+    web_fonts           Font families loaded from font stylesheets or @font-face
+    unused_css_bytes    An estimate of CSS in rules no element can match: a
+                        rule counts as used when every class, ID and tag name in
+                        one of its selectors occurs in the page or in a script
+                        string, ignoring how they are combined
+    inline_image_bytes  Inline <svg> markup and data: image URIs
+
+A metric over its budget is listed in the report's over_budget, and
+corrective_instructions() turns those into instructions for generating the
+page again (see PAGE_WEIGHT_REGENERATIONS in portfolio_generator).
+
+Environment variables (budgets):
+    PAGE_BUDGET_TOTAL_BYTES (default 150000)
+    PAGE_BUDGET_DOM_NODES (default 1500)
+    PAGE_BUDGET_EXTERNAL_REQUESTS (default 10)
+    PAGE_BUDGET_RENDER_BLOCKING (default 2)
+    PAGE_BUDGET_WEB_FONTS (default 2)
+    PAGE_BUDGET_UNUSED_CSS_BYTES (default 10000)
+    PAGE_BUDGET_INLINE_IMAGE_BYTES (default 50000)
+"""
+import os
+import re
+import time
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, parse_qs
+
+from tracing import span
+
+DEFAULT_BUDGETS = {
+    "total_bytes": int(os.environ.get("PAGE_BUDGET_TOTAL_BYTES", "150000")),
+    "dom_nodes": int(os.environ.get("PAGE_BUDGET_DOM_NODES", "1500")),
+    "external_requests": int(os.environ.get("PAGE_BUDGET_EXTERNAL_REQUESTS", "10")),
+    "render_blocking": int(os.environ.get("PAGE_BUDGET_RENDER_BLOCKING", "2")),
+    "web_fonts": int(os.environ.get("PAGE_BUDGET_WEB_FONTS", "2")),
+    "unused_css_bytes": int(os.environ.get("PAGE_BUDGET_UNUSED_CSS_BYTES", "10000")),
+    "inline_image_bytes": int(os.environ.get("PAGE_BUDGET_INLINE_IMAGE_BYTES", "50000"))
+}
+
+# Hosts of stylesheets that serve web fonts
+FONT_STYLESHEET_HOSTS = ("fonts.googleapis.com", "fonts.bunny.net", "use.typekit.net")
+
+# Link relations that make the browser fetch the URL
+FETCHED_LINK_RELS = frozenset(("stylesheet", "icon", "shortcut", "apple-touch-icon", "preload", "modulepreload", "manifest"))
+
+# Attributes holding a URL the browser loads, by element
+URL_ATTRIBUTES = {
+    "img": ("src",),
+    "source": ("src",),
+    "video": ("src", "poster"),
+    "audio": ("src",),
+    "iframe": ("src",),
+    "embed": ("src",),
+    "object": ("data",),
+    "input": ("src",)
+}
+
+# URL schemes that are not requests
+NON_REQUEST_SCHEMES = ("data:", "javascript:", "mailto:", "tel:", "about:", "#")
+
+INLINE_SVG_RE = re.compile(r"<svg\b[\s\S]*?</svg\s*>", re.IGNORECASE)
+CSS_COMMENT_RE = re.compile(r"/\*[\s\S]*?\*/")
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]*)\1\s*\)""", re.IGNORECASE)
+CSS_IMPORT_RE = re.compile(r"""@import\s+(?:url\(\s*)?['"]?([^'");\s]+)""", re.IGNORECASE)
+CSS_FONT_FAMILY_RE = re.compile(r"""@font-face\s*{[^}]*?font-family\s*:\s*['"]?([^;'"}]+)""", re.IGNORECASE)
+CSS_BRACE_RE = re.compile(r"[{}]")
+
+# At-rules whose blocks hold style rules
+CSS_GROUPING_RULES = ("@media", "@supports", "@layer", "@container", "@document")
+
+# Parts of a selector that say nothing about which names must exist
+SELECTOR_NOISE_RE = re.compile(r"\[[^\]]*\]|::?[\w-]+(?:\([^)]*\))?")
+SELECTOR_NAME_RE = re.compile(r"([.#]?)(-?[_a-zA-Z][\w-]*)")
+
+# Names a script may add to the page, e.g. classList.add('visible')
+JS_STRING_RE = re.compile(r"""(['"`])((?:\\.|(?!\1)[^\\\n])*)\1""")
+WORD_RE = re.compile(r"-?[_a-zA-Z][\w-]*")
+
+class PageWeightReport:
+    """
+    Metrics of one page, the budgets they were checked against and what is over.
+    """
+
+    __slots__ = ("metrics", "budgets", "render_blocking_resources", "ms")
+
+    def __init__(self, metrics, budgets, render_blocking_resources, ms=0.0):
+        self.metrics = metrics
+        self.budgets = budgets
+        self.render_blocking_resources = render_blocking_resources
+        self.ms = ms
+
+    @property
+    def over_budget(self):
+        """Names of the metrics over their budget."""
+        return [name for name, budget in self.budgets.items() if self.metrics.get(name, 0) > budget]
+
+    def to_dict(self):
+        return {
+            "metrics": dict(self.metrics),
+            "budgets": dict(self.budgets),
+            "over_budget": self.over_budget,
+            "render_blocking_resources": list(self.render_blocking_resources),
+            "ms": self.ms
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["metrics"], data["budgets"], data.get("render_blocking_resources", []), data.get("ms", 0.0))
+
+    def corrective_instructions(self):
+        """
+        Instructions for generating the page again within budget.
+
+        Returns:
+            Prompt text with one instruction per metric over budget, or "" if
+            the page is within budget.
+        """
+        lines = []
+        for name in self.over_budget:
+            value, budget = self.metrics[name], self.budgets[name]
+            if name == "total_bytes":
+                lines.append(f"Keep the whole page, CSS and JS included, under {_kilobytes(budget)} (this version was {_kilobytes(value)}): write compact CSS and no repeated markup.")
+            elif name == "dom_nodes":
+                lines.append(f"Use at most {budget} HTML elements (this version had {value}): no wrapper or purely decorative elements.")
+            elif name == "external_requests":
+                lines.append(f"Load at most {budget} external files (this version loaded {value}): no icon sets, CSS frameworks or JS libraries from CDNs.")
+            elif name == "render_blocking":
+                resources = ", ".join(self.render_blocking_resources)
+                lines.append(f"Have at most {budget} render-blocking resources (this version had {value}: {resources}): load scripts with defer and use at most one font stylesheet.")
+            elif name == "web_fonts":
+                lines.append(f"Use at most {budget} web font families (this version used {value}), falling back to system font stacks.")
+            elif name == "unused_css_bytes":
+                lines.append(f"Only write CSS for elements the page uses (about {_kilobytes(value)} of this version's CSS matched nothing).")
+            elif name == "inline_image_bytes":
+                lines.append(f"Keep inline SVGs and images under {_kilobytes(budget)} in total (this version had {_kilobytes(value)}): simple icons or CSS shapes, no base64 images.")
+        if not lines:
+            return ""
+        return (
+            "A previous version of this page was over its performance budget. Keep the same "
+            "content and design, and:\n" + "\n".join(f"- {line}" for line in lines)
+        )
+
+def _kilobytes(size):
+    return f"{size / 1000:.1f} KB"
+
+def _is_request(url):
+    url = url.strip().lower()
+    return bool(url) and not url.startswith(NON_REQUEST_SCHEMES)
+
+def _font_families(url):
+    """Number of font families a font stylesheet URL asks for, or 0 if it isn't one."""
+    parts = urlsplit(url)
+    if parts.hostname not in FONT_STYLESHEET_HOSTS:
+        return 0
+    families = parse_qs(parts.query).get("family", [])
+    if parts.path.endswith("/css2"):
+        return len(families)
+    # The older API lists families in one parameter, separated by "|"
+    return sum(len(family.split("|")) for family in families) or 1
+
+class _PageScanner(HTMLParser):
+    """Collects elements, names, resources and inline CSS and JS of a page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.dom_nodes = 0
+        self.tags = set()
+        self.names = set()
+        self.requests = set()
+        self.blocking = []
+        self.font_families = 0
+        self.inline_image_bytes = 0
+        self.css = []
+        self.js = []
+        self._raw = None
+
+    def _url(self, url):
+        if url.lower().startswith("data:image/"):
+            self.inline_image_bytes += len(url.encode("utf-8"))
+        elif _is_request(url):
+            self.requests.add(url.strip())
+
+    def handle_starttag(self, tag, attrs):
+        self.dom_nodes += 1
+        self.tags.add(tag)
+        attributes = {name: value or "" for name, value in attrs}
+        self.names.update(attributes.get("class", "").split())
+        if attributes.get("id"):
+            self.names.add(attributes["id"])
+        if attributes.get("style"):
+            self.css.append(attributes["style"])
+
+        if tag == "link":
+            rels = set(attributes.get("rel", "").lower().split())
+            href = attributes.get("href", "")
+            if rels & FETCHED_LINK_RELS and href:
+                self._url(href)
+            if "stylesheet" in rels and href:
+                if attributes.get("media", "all").lower() not in ("print", "not all"):
+                    self.blocking.append(href)
+                self.font_families += _font_families(href)
+        elif tag == "script":
+            src = attributes.get("src")
+            if src:
+                self._url(src)
+                classic = attributes.get("type", "text/javascript").lower() in ("text/javascript", "application/javascript", "")
+                if classic and "async" not in attributes and "defer" not in attributes:
+                    self.blocking.append(src)
+            self._raw = tag
+        elif tag == "style":
+            self._raw = tag
+        for name in URL_ATTRIBUTES.get(tag, ()):
+            if attributes.get(name):
+                self._url(attributes[name])
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in ("script", "style"):
+            self._raw = None
+
+    def handle_endtag(self, tag):
+        if tag == self._raw:
+            self._raw = None
+
+    def handle_data(self, data):
+        if self._raw == "style":
+            self.css.append(data)
+        elif self._raw == "script":
+            self.js.append(data)
+
+def _style_rules(css):
+    """Selector and size in bytes of each style rule, including those in @media and similar blocks."""
+    rules = []
+    depth = 0
+    start = 0
+    block_start = 0
+    prelude = ""
+    for match in CSS_BRACE_RE.finditer(css):
+        if match.group() == "{":
+            if depth == 0:
+                # Statements such as @charset end in ";" before the prelude
+                prelude = css[start:match.start()].rsplit(";", 1)[-1].strip()
+                block_start = match.end()
+                rule_start = match.start() - len(prelude)
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                if prelude.lower().startswith(CSS_GROUPING_RULES):
+                    rules.extend(_style_rules(css[block_start:match.start()]))
+                elif not prelude.startswith("@"):
+                    rules.append((prelude, len(css[rule_start:match.end()].encode("utf-8"))))
+                start = match.end()
+            depth = max(depth, 0)
+    return rules
+
+def _selector_used(selector, tags, names):
+    """Whether every class, ID and tag name in the selector occurs in the page."""
+    for prefix, name in SELECTOR_NAME_RE.findall(SELECTOR_NOISE_RE.sub(" ", selector)):
+        if prefix and name not in names:
+            return False
+        if not prefix and name.lower() not in tags:
+            return False
+    return True
+
+def unused_css_bytes(css, tags, names):
+    """
+    Estimate how much CSS is in rules that match nothing.
+
+    Args:
+        css: Stylesheet text.
+        tags: Tag names in the page, lowercase.
+        names: Classes and IDs in the page or its scripts.
+
+    Returns:
+        Bytes of style rules none of whose selectors can match.
+    """
+    unused = 0
+    for selectors, size in _style_rules(CSS_COMMENT_RE.sub("", css)):
+        if not any(_selector_used(selector, tags, names) for selector in selectors.split(",")):
+            unused += size
+    return unused
+
+def analyze_page(html_content, budgets=None):
+    """
+    Measure a page and check it against budgets.
+
+    Args:
+        html_content: HTML string of the page.
+        budgets: Dictionary of metric name to budget; missing metrics use
+            DEFAULT_BUDGETS.
+
+    Returns:
+        A PageWeightReport.
+    """
+    budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+    started = time.perf_counter()
+    with span("page.analyze", kind="html", bytes=len(html_content)):
+        scanner = _PageScanner()
+        scanner.feed(html_content)
+        scanner.close()
+
+        css = "\n".join(scanner.css)
+        css_without_comments = CSS_COMMENT_RE.sub("", css)
+        for _, url in CSS_URL_RE.findall(css_without_comments):
+            scanner._url(url)
+        for url in CSS_IMPORT_RE.findall(css_without_comments):
+            scanner._url(url)
+            scanner.blocking.append(url)
+            scanner.font_families += _font_families(url)
+        font_faces = {family.strip().lower() for family in CSS_FONT_FAMILY_RE.findall(css_without_comments)}
+
+        names = set(scanner.names)
+        for script in scanner.js:
+            for _, literal in JS_STRING_RE.findall(script):
+                names.update(WORD_RE.findall(literal))
+
+        metrics = {
+            "total_bytes": len(html_content.encode("utf-8")),
+            "dom_nodes": scanner.dom_nodes,
+            # Each family from a font stylesheet is at least one more file
+            "external_requests": len(scanner.requests) + scanner.font_families,
+            "render_blocking": len(scanner.blocking),
+            "web_fonts": scanner.font_families + len(font_faces),
+            "unused_css_bytes": unused_css_bytes(css, scanner.tags, names),
+            "inline_image_bytes": scanner.inline_image_bytes + sum(
+                len(svg.encode("utf-8")) for svg in INLINE_SVG_RE.findall(html_content)
+            )
+        }
+    ms = round((time.perf_counter() - started) * 1000, 2)
+    return PageWeightReport(metrics, budgets, scanner.blocking, ms)
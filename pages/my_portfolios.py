@@ -1,10 +1,11 @@
 import streamlit as st
-import httpx
 import json
 import base64
-import asyncio
 import os
 
+from backend import get_backend
+from session_cache import session_cache, clear_session_cache
+
 # Configure page
 st.set_page_config(
     page_title="My Portfolios",
@@ -12,70 +13,96 @@ st.set_page_config(
     layout="wide"
 )
 
-# API URL
-API_URL = "http://0.0.0.0:8000"
+# API URL, used when BACKEND_MODE is "http" (see backend.py)
+API_URL = os.environ.get("API_URL", "http://0.0.0.0:8000")
 
-# Function to make API calls
-async def call_api(endpoint, method="GET", data=None, files=None):
-    url = f"{API_URL}{endpoint}"
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            if method == "GET":
-                response = await client.get(url)
-            elif method == "POST":
-                response = await client.post(url, data=data, files=files)
-            elif method == "DELETE":
-                response = await client.delete(url)
-            
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        error_message = f"HTTP error: {e.response.status_code}"
-        try:
-            error_data = e.response.json()
-            if "message" in error_data:
-                error_message = error_data["message"]
-        except:
-            pass
-        raise Exception(error_message)
-    except httpx.RequestError as e:
-        raise Exception(f"Request error: {str(e)}")
-    except Exception as e:
-        raise Exception(f"Error: {str(e)}")
+# Portfolio cards per gallery page
+GALLERY_PAGE_SIZE = 12
+
+# Gallery pages and fetched portfolios kept per session
+GALLERY_PAGE_CACHE_SIZE = 8
+PORTFOLIO_CACHE_SIZE = 3 * GALLERY_PAGE_SIZE
+
+# The configured backend: the remote API, or the backend embedded in this process
+def get_portfolio_backend():
+    return get_backend(API_URL, timeout=60.0)
 
 # Function to get user portfolios
-async def get_user_portfolios(email):
+def get_user_portfolios(email):
     try:
-        result = await call_api(f"/user-portfolios/{email}")
-        if result["status"] == "success":
-            return result["portfolios"]
-        else:
-            raise Exception(result.get("message", "Unknown error"))
+        return get_portfolio_backend().get_user_portfolios(email)
     except Exception as e:
         raise Exception(f"Failed to get portfolios: {str(e)}")
 
 # Function to get portfolio details
-async def get_portfolio(portfolio_id):
+def get_portfolio(portfolio_id):
     try:
-        result = await call_api(f"/portfolio/{portfolio_id}")
-        if result["status"] == "success":
-            return result["portfolio"]
-        else:
-            raise Exception(result.get("message", "Unknown error"))
+        return get_portfolio_backend().get_portfolio(portfolio_id)
     except Exception as e:
         raise Exception(f"Failed to get portfolio: {str(e)}")
 
 # Function to delete portfolio
-async def delete_portfolio(portfolio_id):
+def delete_portfolio(portfolio_id):
     try:
-        result = await call_api(f"/portfolio/{portfolio_id}", method="DELETE")
-        if result["status"] == "success":
-            return True
-        else:
-            raise Exception(result.get("message", "Unknown error"))
+        return get_portfolio_backend().delete_portfolio(portfolio_id)
     except Exception as e:
         raise Exception(f"Failed to delete portfolio: {str(e)}")
 
+# Function to get one page of portfolio summaries, reusing pages this session already loaded
+def get_gallery_page(email, page):
+    cache = session_cache("gallery_page_cache", GALLERY_PAGE_CACHE_SIZE)
+    cache_key = (email, page)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        total, portfolios = get_portfolio_backend().get_user_portfolios_page(email, page, GALLERY_PAGE_SIZE)
+    except Exception as e:
+        raise Exception(f"Failed to get portfolios: {str(e)}")
+    cache.set(cache_key, (total, portfolios))
+    return total, portfolios
+
+# Start fetching the visible portfolios in the background so "View" is instant
+def prefetch_portfolios(portfolios):
+    cache = session_cache("portfolio_cache", PORTFOLIO_CACHE_SIZE)
+    visible_ids = {portfolio["id"] for portfolio in portfolios}
+    
+    # Keep finished prefetches and drop those for portfolios no longer on screen
+    prefetches = {}
+    for portfolio_id, future in st.session_state.get("portfolio_prefetches", {}).items():
+        if future.done() and future.exception() is None:
+            cache.set(portfolio_id, future.result())
+        elif portfolio_id in visible_ids:
+            prefetches[portfolio_id] = future
+    
+    missing = [portfolio_id for portfolio_id in visible_ids if portfolio_id not in cache and portfolio_id not in prefetches]
+    prefetches.update(get_portfolio_backend().prefetch_portfolios(missing))
+    st.session_state.portfolio_prefetches = prefetches
+
+# Function to load a portfolio from the session cache, its prefetch, or the backend
+def load_portfolio(portfolio_id):
+    cache = session_cache("portfolio_cache", PORTFOLIO_CACHE_SIZE)
+    portfolio = cache.get(portfolio_id)
+    if portfolio is not None:
+        return portfolio
+    
+    future = st.session_state.get("portfolio_prefetches", {}).pop(portfolio_id, None)
+    try:
+        portfolio = future.result() if future is not None else None
+    except Exception:
+        # A failed prefetch is retried in the foreground, which reports the error
+        portfolio = None
+    if portfolio is None:
+        portfolio = get_portfolio(portfolio_id)
+    cache.set(portfolio_id, portfolio)
+    return portfolio
+
+# Function to forget cached pages and portfolios after a change
+def clear_gallery_cache():
+    clear_session_cache("gallery_page_cache")
+    clear_session_cache("portfolio_cache")
+    st.session_state.portfolio_prefetches = {}
+
 # Main function
 def main():
     st.title("📁 My Saved Portfolios")
@@ -86,34 +113,50 @@ def main():
     
     if email:
         try:
-            # Get user portfolios
+            # Initialize session state for the gallery and selected portfolio
+            if st.session_state.get("gallery_email") != email:
+                st.session_state.gallery_email = email
+                st.session_state.gallery_page = 1
+                st.session_state.selected_portfolio_id = None
+                st.session_state.selected_portfolio_data = None
+            
+            # Get one page of portfolio summaries
             with st.spinner("Loading portfolios..."):
-                # Use nest_asyncio to allow running asyncio in Streamlit
-                import nest_asyncio
-                nest_asyncio.apply()
-                
-                # Create a new event loop
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                portfolios = loop.run_until_complete(get_user_portfolios(email))
-                
-                # Cleanup
-                loop.close()
+                total, portfolios = get_gallery_page(email, st.session_state.gallery_page)
             
-            if not portfolios:
+            if total == 0:
                 st.info("You don't have any saved portfolios yet.")
                 st.write("Go to the home page to create a new portfolio.")
                 return
             
+            page_count = (total + GALLERY_PAGE_SIZE - 1) // GALLERY_PAGE_SIZE
+            if st.session_state.gallery_page > page_count:
+                # The last page emptied, e.g. after a delete
+                st.session_state.gallery_page = page_count
+                st.rerun()
+            
+            # Fetch the details of the visible portfolios while the user looks at the cards
+            prefetch_portfolios(portfolios)
+            
             # Display portfolios
-            st.subheader(f"Your Portfolios ({len(portfolios)})")
+            st.subheader(f"Your Portfolios ({total})")
             
-            # Initialize session state for selected portfolio
-            if "selected_portfolio_id" not in st.session_state:
-                st.session_state.selected_portfolio_id = None
-            if "selected_portfolio_data" not in st.session_state:
-                st.session_state.selected_portfolio_data = None
+            # Page navigation
+            col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
+            with col1:
+                if st.button("← Previous", disabled=st.session_state.gallery_page <= 1):
+                    st.session_state.gallery_page -= 1
+                    st.rerun()
+            with col2:
+                st.write(f"Page {st.session_state.gallery_page} of {page_count}")
+            with col3:
+                if st.button("Next →", disabled=st.session_state.gallery_page >= page_count):
+                    st.session_state.gallery_page += 1
+                    st.rerun()
+            with col4:
+                if st.button("Refresh"):
+                    clear_gallery_cache()
+                    st.rerun()
             
             # Create portfolio cards
             cols = st.columns(3)
@@ -126,20 +169,11 @@ def main():
                         
                         if st.button("View", key=f"view_{portfolio['id']}"):
                             st.session_state.selected_portfolio_id = portfolio["id"]
-                            # Get portfolio details
-                            with st.spinner("Loading portfolio..."):
-                                # Use nest_asyncio to allow running asyncio in Streamlit
-                                import nest_asyncio
-                                nest_asyncio.apply()
-                                
-                                # Create a new event loop
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                
-                                st.session_state.selected_portfolio_data = loop.run_until_complete(get_portfolio(portfolio["id"]))
-                                
-                                # Cleanup
-                                loop.close()
+            
+            # Get the selected portfolio's details, usually already prefetched
+            if st.session_state.selected_portfolio_id:
+                with st.spinner("Loading portfolio..."):
+                    st.session_state.selected_portfolio_data = load_portfolio(st.session_state.selected_portfolio_id)
             
             # Display selected portfolio
             if st.session_state.selected_portfolio_id and st.session_state.selected_portfolio_data:
@@ -152,8 +186,13 @@ def main():
                 tab1, tab2, tab3 = st.tabs(["Preview", "Download", "Details"])
                 
                 # Preview tab
+                # Served by URL when possible, so reruns don't resend the whole document
+                html_url = get_portfolio_backend().portfolio_html_url(portfolio_data["id"])
                 with tab1:
-                    st.components.v1.html(portfolio_data["html_content"], height=600, scrolling=True)
+                    if html_url:
+                        st.components.v1.iframe(html_url, height=600, scrolling=True)
+                    else:
+                        st.components.v1.html(portfolio_data["html_content"], height=600, scrolling=True)
                 
                 # Download tab
                 with tab2:
@@ -161,12 +200,15 @@ def main():
                     
                     with col1:
                         # Download HTML file
-                        st.download_button(
-                            label="Download HTML",
-                            data=portfolio_data["html_content"],
-                            file_name=f"{portfolio_data['name'].replace(' ', '_')}.html",
-                            mime="text/html"
-                        )
+                        if html_url:
+                            st.link_button("Download HTML", f"{html_url}?download=true")
+                        else:
+                            st.download_button(
+                                label="Download HTML",
+                                data=portfolio_data["html_content"],
+                                file_name=f"{portfolio_data['name'].replace(' ', '_')}.html",
+                                mime="text/html"
+                            )
                     
                 # Details tab
                 with tab3:
@@ -192,18 +234,9 @@ def main():
                     if st.session_state.selected_portfolio_id:
                         with st.spinner("Deleting portfolio..."):
                             try:
-                                # Use nest_asyncio to allow running asyncio in Streamlit
-                                import nest_asyncio
-                                nest_asyncio.apply()
-                                
-                                # Create a new event loop
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                
-                                deleted = loop.run_until_complete(delete_portfolio(st.session_state.selected_portfolio_id))
-                                
-                                # Cleanup
-                                loop.close()
+                                deleted = delete_portfolio(st.session_state.selected_portfolio_id)
+                                # Even a delete that found nothing means the cached pages are out of date
+                                clear_gallery_cache()
                                 
                                 if deleted:
                                     st.success("Portfolio deleted successfully!")
@@ -0,0 +1,163 @@
+"""
+Pre-flight triage of uploaded resume PDFs.
+
+A full pdfplumber parse lays out every character of every page. For a
+scanned (image-only) resume that work yields no text, and an enormous file
+ties up a worker for seconds, so uploads are classified first by reading
+only what is cheap to reach:
+
+    the header and byte size    before any parsing
+    trailer and xref table      to open the document
+    the page tree's /Count      for the page count, without walking the pages
+    the first page's content    its streams and resources, checked for text
+                                operators and images without laying them out
+
+Verdicts:
+    fast_path   A short PDF with a text layer. Parsed right away.
+    normal      Anything else that may hold text. Parsed, but only a few at a
+                time (see NORMAL_PARSE_CONCURRENCY in api.py), so long
+                documents can't hold up short ones.
+    image_only  The first page has images and no text: a scan. Rejected (422).
+    too_large   Over MAX_PDF_BYTES or MAX_PDF_PAGES. Rejected (413).
+    invalid     Not a PDF that can be opened. Rejected (422).
+
+Environment variables:
+    MAX_PDF_BYTES: Largest accepted upload (default 10 MiB).
+    MAX_PDF_PAGES: Most pages accepted (default 20).
+    FAST_PATH_PAGES: Most pages of a fast-path PDF (default 3).
+    FAST_PATH_BYTES: Largest fast-path PDF (default 1 MiB).
+"""
+import io
+import os
+import re
+
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import PDFStream, resolve1
+
+from tracing import span
+
+MAX_PDF_BYTES = int(os.environ.get("MAX_PDF_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.environ.get("MAX_PDF_PAGES", "20"))
+FAST_PATH_PAGES = int(os.environ.get("FAST_PATH_PAGES", "3"))
+FAST_PATH_BYTES = int(os.environ.get("FAST_PATH_BYTES", str(1024 * 1024)))
+
+FAST_PATH = "fast_path"
+NORMAL = "normal"
+IMAGE_ONLY = "image_only"
+TOO_LARGE = "too_large"
+INVALID = "invalid"
+
+# HTTP status of each verdict that rejects the upload
+REJECT_STATUS = {TOO_LARGE: 413, IMAGE_ONLY: 422, INVALID: 422}
+
+# Text-showing operators (Tj, TJ, ' and ") after the string they show
+TEXT_OPERATOR_RE = re.compile(rb"[)\]>]\s*(?:Tj|TJ|'|\")")
+
+# An inline image in a content stream
+INLINE_IMAGE_RE = re.compile(rb"(?<![A-Za-z])BI\s")
+
+class PdfTriage:
+    """
+    The triage verdict for one upload and what it was based on.
+    """
+
+    __slots__ = ("verdict", "size", "pages", "has_text", "has_images", "message")
+
+    def __init__(self, verdict, size, pages=None, has_text=False, has_images=False, message=""):
+        self.verdict = verdict
+        self.size = size
+        self.pages = pages
+        self.has_text = has_text
+        self.has_images = has_images
+        self.message = message
+
+    @property
+    def status_code(self):
+        """HTTP status to reject the upload with, or None if it should be parsed."""
+        return REJECT_STATUS.get(self.verdict)
+
+    def __repr__(self):
+        return f"PdfTriage({self.verdict!r}, size={self.size}, pages={self.pages}, has_text={self.has_text})"
+
+def _stream_data(obj):
+    """Decoded data of a stream object, or b"" if it isn't one or can't be decoded."""
+    obj = resolve1(obj)
+    if not isinstance(obj, PDFStream):
+        return b""
+    try:
+        return obj.get_data()
+    except Exception:
+        return b""
+
+def _inspect_page(page):
+    """
+    Whether a page shows text and whether it draws images.
+
+    Form XObjects are looked into one level deep, as some generators put
+    the whole page in one.
+    """
+    data = b"".join(_stream_data(stream) for stream in page.contents)
+    has_text = TEXT_OPERATOR_RE.search(data) is not None
+    has_images = INLINE_IMAGE_RE.search(data) is not None
+
+    xobjects = resolve1((page.resources or {}).get("XObject")) or {}
+    for xobject in xobjects.values():
+        xobject = resolve1(xobject)
+        if not isinstance(xobject, PDFStream):
+            continue
+        subtype = getattr(xobject.get("Subtype"), "name", None)
+        if subtype == "Image":
+            has_images = True
+        elif subtype == "Form" and not has_text:
+            has_text = TEXT_OPERATOR_RE.search(_stream_data(xobject)) is not None
+    return has_text, has_images
+
+def _megabytes(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+def triage_pdf(file_bytes):
+    """
+    Classify an uploaded PDF before it is parsed.
+
+    Args:
+        file_bytes: Contents of the upload.
+
+    Returns:
+        A PdfTriage; its status_code is set if the upload should be rejected.
+    """
+    size = len(file_bytes)
+    with span("pdf.triage", kind="pdf", size=size):
+        if size > MAX_PDF_BYTES:
+            return PdfTriage(TOO_LARGE, size, message=(
+                f"The PDF is {_megabytes(size)}; resumes can be at most {_megabytes(MAX_PDF_BYTES)}."
+            ))
+        if not file_bytes[:1024].lstrip().startswith(b"%PDF-"):
+            return PdfTriage(INVALID, size, message="The file is not a PDF.")
+
+        try:
+            document = PDFDocument(PDFParser(io.BytesIO(file_bytes)))
+            page_tree = resolve1(document.catalog.get("Pages")) or {}
+            pages = resolve1(page_tree.get("Count"))
+            first_page = next(PDFPage.create_pages(document), None)
+        except Exception as e:
+            return PdfTriage(INVALID, size, message=f"The PDF could not be read: {str(e)}")
+        if first_page is None:
+            return PdfTriage(INVALID, size, pages=0, message="The PDF has no pages.")
+        pages = pages if isinstance(pages, int) else None
+
+        if pages is not None and pages > MAX_PDF_PAGES:
+            return PdfTriage(TOO_LARGE, size, pages=pages, message=(
+                f"The PDF has {pages} pages; resumes can have at most {MAX_PDF_PAGES}."
+            ))
+
+        has_text, has_images = _inspect_page(first_page)
+        if not has_text and has_images:
+            return PdfTriage(IMAGE_ONLY, size, pages, has_text, has_images, message=(
+                "The PDF has no text layer; it looks like a scanned image. "
+                "Please upload a resume exported as a text PDF, or run OCR on it first."
+            ))
+
+        fast = has_text and size <= FAST_PATH_BYTES and pages is not None and pages <= FAST_PATH_PAGES
+        return PdfTriage(FAST_PATH if fast else NORMAL, size, pages, has_text, has_images)
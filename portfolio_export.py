@@ -0,0 +1,255 @@
+"""
+Streaming ZIP export of a user's saved portfolios.
+
+The archive is written straight to the HTTP response as it is built: the
+portfolios are read with a server-side cursor in batches, each batch is
+decompressed and deflated into the archive, and the bytes produced so far
+are sent before the next batch is read. Only one batch of HTML is held in
+memory at a time, however many portfolios the user has.
+
+The ZIP central directory and the manifest both come at the end of the
+archive, so each portfolio's ZipInfo and manifest line are needed until the
+archive is finished. Both are spooled to temporary files rather than kept
+in memory, so memory use stays flat as the portfolio count grows.
+
+Archive layout:
+    portfolios/<id>-<name>.html  One file per portfolio.
+    manifest.json                Export details and, for every portfolio,
+                                 its file, theme, dates, size and SHA-256.
+"""
+import asyncio
+import json
+import pickle
+import re
+import tempfile
+import zipfile
+from datetime import datetime
+
+from sqlalchemy import select
+
+import database
+from database import Portfolio, HtmlBlob
+from artifact_store import get_artifact_store
+from html_blobs import html_hash, decompress_html
+
+# Portfolios read and compressed per round trip
+EXPORT_BATCH_SIZE = 50
+
+# Bytes of the spooled manifest copied into the archive, and of the archive
+# sent, at a time
+DRAIN_BLOCK_SIZE = 64 * 1024
+
+# Archive bytes held in memory between drains before they spill to disk
+SINK_MEMORY_LIMIT = 1024 * 1024
+
+class _ChunkSink:
+    """
+    Write-only file object that collects what zipfile writes until it is drained.
+
+    It has no tell() or seek(), so zipfile writes sizes in data descriptors
+    after each file instead of seeking back to patch the headers. Writes go
+    to a spooled temporary file, which moves to disk past SINK_MEMORY_LIMIT:
+    closing the archive writes the whole central directory at once.
+    """
+
+    def __init__(self):
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SINK_MEMORY_LIMIT)
+
+    def write(self, data):
+        return self._spool.write(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Yield, in blocks, and then forget everything written since the last drain."""
+        self._spool.seek(0)
+        while True:
+            block = self._spool.read(DRAIN_BLOCK_SIZE)
+            if not block:
+                break
+            yield block
+        self._spool.seek(0)
+        self._spool.truncate()
+
+    def close(self):
+        self._spool.close()
+
+class _SpooledEntries:
+    """
+    Stand-in for ZipFile.filelist that keeps finished entries in a temporary file.
+
+    zipfile only appends to the list, counts it and iterates over it once to
+    write the central directory at close, so a file of pickled ZipInfos serves.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._count = 0
+
+    def append(self, zinfo):
+        pickle.dump(zinfo, self._file, pickle.HIGHEST_PROTOCOL)
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        self._file.seek(0)
+        for _ in range(self._count):
+            yield pickle.load(self._file)
+        self._file.seek(0, 2)
+
+    def close(self):
+        self._file.close()
+
+class _UnindexedNames:
+    """
+    Stand-in for ZipFile.NameToInfo that remembers nothing.
+
+    zipfile only uses it to look entries up and to warn about duplicate
+    names; entry names are unique by portfolio ID, and the archive is never read.
+    """
+
+    def __contains__(self, name):
+        return False
+
+    def __setitem__(self, name, zinfo):
+        pass
+
+    def get(self, name, default=None):
+        return default
+
+def _spooling_archive(sink):
+    """A ZipFile writing to sink that keeps its entry bookkeeping on disk."""
+    archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED)
+    archive.filelist = _SpooledEntries()
+    archive.NameToInfo = _UnindexedNames()
+    return archive
+
+def export_filename(email):
+    """Download name of a user's export archive."""
+    local_part = re.sub(r"[^A-Za-z0-9._-]+", "-", email.split("@")[0]).strip("-.") or "user"
+    return f"portfolios-{local_part}.zip"
+
+def _entry_name(portfolio_id, name):
+    """Path of a portfolio's HTML inside the archive; the ID keeps it unique."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name or "").strip("-").lower()[:60]
+    return f"portfolios/{portfolio_id}-{slug or 'portfolio'}.html"
+
+def _write_batch(archive, rows, store):
+    """
+    Load, decompress and add one batch of portfolios to the archive.
+
+    Runs in a worker thread: artifact reads block and deflate is CPU-bound.
+
+    Returns:
+        List of manifest lines, one JSON string per portfolio.
+    """
+    manifest_lines = []
+    for row in rows:
+        if row.html_blob_hash is None:
+            html_content = row.html_content or ""
+            content_hash = html_hash(html_content)
+        else:
+            data = row.data if row.storage_key is None else store.get(row.storage_key)
+            html_content = decompress_html(row.codec, data)
+            content_hash = row.html_blob_hash
+        raw = html_content.encode("utf-8")
+        entry_name = _entry_name(row.id, row.name)
+
+        info = zipfile.ZipInfo(entry_name, date_time=(row.created_at or datetime.utcnow()).timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(info, raw)
+
+        manifest_lines.append(json.dumps({
+            "id": row.id,
+            "name": row.name,
+            "theme": row.theme,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "is_favorite": bool(row.is_favorite),
+            "file": entry_name,
+            "size": len(raw),
+            "sha256": content_hash
+        }))
+    return manifest_lines
+
+async def stream_user_export(user_id, email, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Build a ZIP archive of a user's portfolios, yielding it in chunks.
+
+    Uses its own database session, because the request's session is closed
+    before a streaming response body is sent.
+
+    Args:
+        user_id: ID of the user whose portfolios are exported.
+        email: The user's email, recorded in the manifest.
+        batch_size: Portfolios fetched per server-side cursor batch.
+
+    Yields:
+        Consecutive chunks of the ZIP archive.
+    """
+    sink = _ChunkSink()
+    archive = _spooling_archive(sink)
+    store = get_artifact_store()
+    # One JSON line per portfolio, copied into manifest.json at the end
+    manifest_spool = tempfile.TemporaryFile()
+    portfolio_count = 0
+
+    stmt = (
+        select(
+            Portfolio.id,
+            Portfolio.name,
+            Portfolio.theme,
+            Portfolio.created_at,
+            Portfolio.is_favorite,
+            Portfolio.html_content,
+            Portfolio.html_blob_hash,
+            HtmlBlob.codec,
+            HtmlBlob.data,
+            HtmlBlob.storage_key
+        )
+        .outerjoin(HtmlBlob, HtmlBlob.hash == Portfolio.html_blob_hash)
+        .filter(Portfolio.user_id == user_id)
+        .order_by(Portfolio.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    try:
+        async with database.AsyncSessionLocal() as db:
+            result = await db.stream(stmt)
+            async for rows in result.partitions():
+                for line in await asyncio.to_thread(_write_batch, archive, rows, store):
+                    manifest_spool.write(((",\n" if portfolio_count else "\n") + line).encode("utf-8"))
+                    portfolio_count += 1
+                for chunk in sink.drain():
+                    yield chunk
+
+        # Copied from the spool in blocks so the manifest is never held as one string
+        with archive.open("manifest.json", "w") as manifest:
+            manifest.write((
+                '{"email": ' + json.dumps(email)
+                + ', "exported_at": ' + json.dumps(datetime.utcnow().isoformat())
+                + ', "portfolio_count": ' + str(portfolio_count)
+                + ', "portfolios": ['
+            ).encode("utf-8"))
+            manifest_spool.seek(0)
+            while True:
+                block = manifest_spool.read(DRAIN_BLOCK_SIZE)
+                if not block:
+                    break
+                manifest.write(block)
+                for chunk in sink.drain():
+                    yield chunk
+            manifest.write(b"\n]}\n")
+        archive.close()
+        for chunk in sink.drain():
+            yield chunk
+    except Exception as e:
+        # Headers are already sent, so the client can only see a truncated archive
+        print(f"Export for user {user_id} failed: {str(e)}")
+        raise
+    finally:
+        manifest_spool.close()
+        archive.filelist.close()
+        sink.close()
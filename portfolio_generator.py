@@ -5,6 +5,18 @@ import io
 import base64
 import httpx
 import json
+import re
+
+from tracing import span
+from experience_parser import parse_experiences
+from html_postprocess import process_html
+from page_weight import analyze_page
+
+# Extra generations for a page over its page-weight budgets (0 keeps the first page)
+PAGE_WEIGHT_REGENERATIONS = int(os.environ.get("PAGE_WEIGHT_REGENERATIONS", "0"))
+
+# The HTML code block in Claude's response
+HTML_BLOCK_RE = re.compile(r"```html\s*([\s\S]*?)\s*```")
 
 class PortfolioGenerator:
     """
@@ -21,6 +33,10 @@ class PortfolioGenerator:
         self.client = anthropic.Anthropic(api_key=claude_api_key)
         # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
         self.model = "claude-3-5-sonnet-20241022"
+        # What post-processing did to the last generated portfolio, see html_postprocess
+        self.postprocess_stats = None
+        # Page-weight report of the last generated portfolio, see page_weight
+        self.page_weight = None
     
     def create_prompt(self, resume_data, theme_preferences):
         """
@@ -45,7 +61,7 @@ class PortfolioGenerator:
                 # Process the experience section to clearly separate multiple experiences
                 experiences = self._parse_experiences(section_content)
                 for i, exp in enumerate(experiences):
-                    sections_text += f"### Experience {i+1}\n{exp}\n\n"
+                    sections_text += f"### Experience {i+1}\n{exp.to_text()}\n\n"
             else:
                 sections_text += f"## {section_name}\n{section_content}\n\n"
         
@@ -71,107 +87,63 @@ class PortfolioGenerator:
         
     def _parse_experiences(self, experience_text):
         """
-        Parse the experience section to identify individual experiences.
+        Parse the experience section into individual experiences.
         
         Args:
             experience_text: Text content of the experience section.
             
         Returns:
-            List of separate experience entries.
+            Tuple of Experience records (title, company, start, end, bullets),
+            parsed once per distinct section content.
         """
-        import re
-        
-        # First, try to split by company or job titles
-        # Common patterns like "Software Developer, Company" or "Company - Position"
-        experiences = []
-        
-        # Try to split by date ranges as they typically separate different jobs
-        date_pattern = r'(?:January|February|March|April|May|June|July|August|September|October|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[\s,]+\d{4}\s*[-–—]\s*(?:Present|Current|January|February|March|April|May|June|July|August|September|October|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)(?:[\s,]+\d{4})?'
-        
-        # Split the experience text by date pattern
-        date_matches = list(re.finditer(date_pattern, experience_text, re.IGNORECASE))
-        
-        if date_matches:
-            # If we found date patterns, use them to split the text
-            last_end = 0
-            for i, match in enumerate(date_matches):
-                start = match.start()
-                
-                # Skip if this is part of a previous experience
-                if start < last_end:
-                    continue
-                
-                # Find the beginning of this experience (typically a job title or company name)
-                # Look for the previous line break before the date
-                prev_break = experience_text.rfind('\n', 0, start)
-                if prev_break == -1:
-                    prev_break = 0
-                
-                # Extract the experience, going back to include the job title
-                if i < len(date_matches) - 1:
-                    # For all but the last experience, go to the next date match
-                    next_match = date_matches[i + 1]
-                    end = next_match.start()
-                    
-                    # But find the line break before to get a clean break
-                    prev_break_next = experience_text.rfind('\n', 0, end)
-                    if prev_break_next > start:  # Make sure we're not going backwards
-                        end = prev_break_next
-                    
-                    experiences.append(experience_text[prev_break:end].strip())
-                    last_end = end
-                else:
-                    # For the last experience, go to the end
-                    experiences.append(experience_text[prev_break:].strip())
-                    
-            # If we didn't parse any experiences, fall back to the full text
-            if not experiences:
-                experiences = [experience_text]
-        else:
-            # If we can't find date patterns, try splitting by job titles
-            job_pattern = r'\n[A-Z][a-zA-Z\s,]+(Developer|Engineer|Designer|Manager|Director|Analyst|Consultant|Specialist|Coordinator|Assistant|Lead|Head|Chief|Officer|Administrator|Supervisor)'
-            job_matches = list(re.finditer(job_pattern, '\n' + experience_text, re.IGNORECASE))
-            
-            if job_matches:
-                # If we found job title patterns, use them to split the text
-                for i, match in enumerate(job_matches):
-                    start = match.start()
-                    
-                    # Skip the leading newline
-                    if start == 0:
-                        start = 1
-                    
-                    if i < len(job_matches) - 1:
-                        end = job_matches[i + 1].start()
-                        experiences.append(experience_text[start:end].strip())
-                    else:
-                        experiences.append(experience_text[start:].strip())
-                        
-                # If we didn't parse any experiences, fall back to the full text
-                if not experiences:
-                    experiences = [experience_text]
-            else:
-                # If we can't find any patterns, just use the whole text as one experience
-                experiences = [experience_text]
-        
-        return experiences
+        return parse_experiences(experience_text)
     
-    def generate_portfolio(self, resume_data, theme):
+    def generate_portfolio(self, resume_data, theme, max_regenerations=PAGE_WEIGHT_REGENERATIONS):
         """
         Generate a portfolio website using Claude API.
         
+        Each page is checked against the page-weight budgets (see page_weight).
+        A page over budget is generated again, up to max_regenerations times,
+        with instructions to fix what was over; the page with the fewest
+        metrics over budget is kept, the later one on a tie.
+        
         Args:
             resume_data: Dictionary containing extracted resume information.
             theme: Selected theme for the portfolio.
+            max_regenerations: Most extra generations for a page over budget.
             
         Returns:
-            Generated HTML code for the portfolio website.
+            Generated HTML code for the portfolio website, repaired and minified.
         """
         try:
             from theme_templates import ThemeTemplates
             system_prompt = ThemeTemplates.get_system_prompt(theme)
             user_prompt = self.create_prompt(resume_data, theme)
             
+            html_content, self.postprocess_stats = self._generate_html(system_prompt, user_prompt, theme)
+            self.page_weight = analyze_page(html_content)
+            
+            for _ in range(max_regenerations):
+                if not self.page_weight.over_budget:
+                    break
+                corrective_prompt = f"{user_prompt}\n\n{self.page_weight.corrective_instructions()}"
+                candidate, stats = self._generate_html(system_prompt, corrective_prompt, theme)
+                report = analyze_page(candidate)
+                if len(report.over_budget) <= len(self.page_weight.over_budget):
+                    html_content, self.postprocess_stats, self.page_weight = candidate, stats, report
+            return html_content
+        
+        except Exception as e:
+            raise Exception(f"Error generating portfolio: {str(e)}")
+    
+    def _generate_html(self, system_prompt, user_prompt, theme):
+        """
+        Ask Claude for a page and post-process it.
+        
+        Returns:
+            Tuple of (HTML, post-processing stats).
+        """
+        with span("llm.messages.create", kind="llm", model=self.model, theme=theme):
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=4000,
@@ -179,23 +151,21 @@ class PortfolioGenerator:
                 system=system_prompt,
                 messages=[{"role": "user", "content": user_prompt}]
             )
-            
-            html_content = response.content[0].text
-            
-            # Extract HTML code between ```html and ```
-            html_pattern = r"```html\s*([\s\S]*?)\s*```"
-            import re
-            html_match = re.search(html_pattern, html_content)
-            
-            if html_match:
-                return html_match.group(1)
-            else:
-                return html_content  # Return full response if no HTML code block found
         
-        except Exception as e:
-            raise Exception(f"Error generating portfolio: {str(e)}")
+        html_content = response.content[0].text
+        
+        # Extract HTML code between ```html and ```
+        html_match = HTML_BLOCK_RE.search(html_content)
+        
+        if html_match:
+            html_content = html_match.group(1)
+        
+        # Repair, minify and dedupe once, before the HTML is stored or served
+        with span("html.postprocess", kind="html", bytes_before=len(html_content)):
+            return process_html(html_content)
     
-    def create_zip_file(self, html_content, filename="portfolio"):
+    @staticmethod
+    def create_zip_file(html_content, filename="portfolio"):
         """
         Create a ZIP file containing the portfolio website.
         
@@ -0,0 +1,519 @@
+import json
+import time
+import asyncio
+from collections import Counter
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload, joinedload
+
+from database import User, Portfolio, Resume, ResumeSection, HtmlBlob
+from html_blobs import html_hash, compress_html
+from artifact_store import get_artifact_store, QUARANTINE_PREFIX
+from search_index import SearchIndex, search_document
+from page_weight import analyze_page
+
+class PortfolioStore:
+    """
+    Writes portfolios, their resumes and their owners in single transactions.
+    """
+
+    # Rows per INSERT statement when saving in bulk
+    BATCH_SIZE = 500
+
+    # Artifact keys checked per query by the orphaned-artifact sweep
+    SWEEP_BATCH_SIZE = 500
+
+    @staticmethod
+    def _dialect_insert(db, model):
+        """
+        Return an INSERT construct that supports ON CONFLICT for the session's database.
+
+        Args:
+            db: Async database session.
+            model: Mapped class to insert into.
+
+        Returns:
+            Dialect-specific insert statement, or None if the dialect has no upsert.
+        """
+        dialect_name = db.bind.dialect.name
+        if dialect_name == "postgresql":
+            return postgresql.insert(model)
+        if dialect_name == "sqlite":
+            return sqlite.insert(model)
+        return None
+
+    @staticmethod
+    async def upsert_users(db, emails):
+        """
+        Insert any missing users and return the IDs of all of them in one statement.
+
+        Args:
+            db: Async database session.
+            emails: Iterable of user emails.
+
+        Returns:
+            Dictionary mapping each email to its user ID.
+        """
+        emails = list(dict.fromkeys(emails))
+        if not emails:
+            return {}
+
+        stmt = PortfolioStore._dialect_insert(db, User)
+        if stmt is None:
+            # No upsert available, fall back to a lookup followed by an insert
+            existing = dict((await db.execute(
+                select(User.email, User.id).filter(User.email.in_(emails))
+            )).all())
+            missing = [email for email in emails if email not in existing]
+            for email in missing:
+                user = User(email=email)
+                db.add(user)
+                await db.flush()
+                existing[email] = user.id
+            return existing
+
+        # A no-op update on conflict makes RETURNING yield existing rows too
+        stmt = stmt.values([{"email": email} for email in emails])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.email],
+            set_={"email": stmt.excluded.email}
+        ).returning(User.email, User.id)
+        return dict((await db.execute(stmt)).all())
+
+    @staticmethod
+    async def acquire_blobs(db, html_contents):
+        """
+        Store HTML as compressed blobs and take one reference per item.
+
+        Identical HTML shares a single blob; its reference count goes up by
+        the number of times it appears.
+
+        Args:
+            db: Async database session.
+            html_contents: List of HTML strings.
+
+        Returns:
+            List of blob hashes in the same order as html_contents.
+        """
+        hashes = [html_hash(html_content) for html_content in html_contents]
+        references = Counter(hashes)
+        if not references:
+            return hashes
+
+        # Compress each distinct HTML once
+        first_html = dict(zip(hashes, html_contents))
+        store = get_artifact_store()
+        rows = []
+        for blob_hash, count in references.items():
+            if store is None:
+                codec, data, size = compress_html(first_html[blob_hash])
+                rows.append({
+                    "hash": blob_hash,
+                    "codec": codec,
+                    "data": data,
+                    "storage_key": None,
+                    "size": size,
+                    "stored_size": len(data),
+                    "ref_count": count
+                })
+            else:
+                # Externally stored blobs stay uncompressed so they can be
+                # served directly from the file with byte ranges
+                codec, data, size = compress_html(first_html[blob_hash], codec="identity")
+                storage_key = store.key_for(blob_hash)
+                await asyncio.to_thread(store.put, storage_key, data)
+                rows.append({
+                    "hash": blob_hash,
+                    "codec": codec,
+                    "data": None,
+                    "storage_key": storage_key,
+                    "size": size,
+                    "stored_size": len(data),
+                    "ref_count": count
+                })
+
+        stmt = PortfolioStore._dialect_insert(db, HtmlBlob)
+        if stmt is None:
+            existing = set((await db.execute(
+                select(HtmlBlob.hash).filter(HtmlBlob.hash.in_(references))
+            )).scalars().all())
+            for row in rows:
+                if row["hash"] in existing:
+                    await db.execute(
+                        update(HtmlBlob)
+                        .filter(HtmlBlob.hash == row["hash"])
+                        .values(ref_count=HtmlBlob.ref_count + row["ref_count"])
+                    )
+                else:
+                    db.add(HtmlBlob(**row))
+            return hashes
+
+        # Existing blobs only gain references; their data is already stored
+        stmt = stmt.values(rows)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[HtmlBlob.hash],
+            set_={"ref_count": HtmlBlob.ref_count + stmt.excluded.ref_count}
+        ))
+        return hashes
+
+    @staticmethod
+    async def release_blob(db, blob_hash):
+        """
+        Drop one reference to a blob and delete it once nothing uses it.
+
+        An externally stored blob's artifact is left for
+        sweep_orphaned_artifacts: deleting it here would race a concurrent
+        save that is about to reference the same content.
+
+        Args:
+            db: Async database session.
+            blob_hash: Hash of the blob, or None for legacy inline HTML.
+        """
+        if blob_hash is None:
+            return
+        await db.execute(
+            update(HtmlBlob)
+            .filter(HtmlBlob.hash == blob_hash)
+            .values(ref_count=HtmlBlob.ref_count - 1)
+        )
+        # The condition keeps a blob that another save re-referenced meanwhile
+        await db.execute(
+            delete(HtmlBlob)
+            .filter(HtmlBlob.hash == blob_hash, HtmlBlob.ref_count <= 0)
+        )
+
+    @staticmethod
+    async def _referenced_keys(db, keys):
+        """The artifact keys among keys that a blob references, in a transaction of its own."""
+        try:
+            return set((await db.execute(
+                select(HtmlBlob.storage_key).filter(HtmlBlob.storage_key.in_(keys))
+            )).scalars().all())
+        finally:
+            # Hold no lock or connection while the sweep works on files
+            await db.rollback()
+
+    @staticmethod
+    async def sweep_orphaned_artifacts(db, grace_period):
+        """
+        Delete stored artifacts that no blob references.
+
+        acquire_blobs writes artifacts before its transaction commits, so a
+        save that rolls back leaves its artifacts behind, and release_blob
+        leaves the artifact of a blob it deletes. Artifacts modified
+        in the last grace_period seconds are kept: a save in progress may be
+        about to reference them.
+
+        Each artifact is quarantined before it is deleted, then its time and
+        references are checked again. A save that reused it before the move
+        refreshed its time, and one after the move writes it anew, so an
+        artifact a save commits to is never lost.
+
+        Args:
+            db: Async database session, preferably on the read engine; each
+                lookup ends its own transaction.
+            grace_period: Minimum age in seconds of an artifact to delete.
+
+        Returns:
+            Number of artifacts deleted.
+        """
+        store = get_artifact_store()
+        if store is None:
+            return 0
+        cutoff = time.time() - grace_period
+
+        # Artifacts a sweep stopped halfway through are restored or finished off
+        leftovers = await asyncio.to_thread(
+            lambda: [(key, modified) for key, modified in store.list_keys(QUARANTINE_PREFIX)]
+        )
+        removed = 0
+        for start in range(0, len(leftovers), PortfolioStore.SWEEP_BATCH_SIZE):
+            batch = leftovers[start:start + PortfolioStore.SWEEP_BATCH_SIZE]
+            originals = [key[len(QUARANTINE_PREFIX):] for key, _ in batch]
+            referenced = await PortfolioStore._referenced_keys(db, originals)
+            for (quarantine_key, modified), key in zip(batch, originals):
+                if key in referenced or modified >= cutoff:
+                    await asyncio.to_thread(store.restore, quarantine_key, key)
+                else:
+                    await asyncio.to_thread(store.delete, quarantine_key)
+                    removed += 1
+
+        candidates = await asyncio.to_thread(
+            lambda: [key for key, modified in store.list_keys("html/") if modified < cutoff]
+        )
+        for start in range(0, len(candidates), PortfolioStore.SWEEP_BATCH_SIZE):
+            batch = candidates[start:start + PortfolioStore.SWEEP_BATCH_SIZE]
+            referenced = await PortfolioStore._referenced_keys(db, batch)
+            for key in batch:
+                if key in referenced:
+                    continue
+                moved = await asyncio.to_thread(store.quarantine, key)
+                if moved is None:
+                    continue
+                quarantine_key, modified = moved
+                if modified < cutoff and not await PortfolioStore._referenced_keys(db, [key]):
+                    await asyncio.to_thread(store.delete, quarantine_key)
+                    removed += 1
+                else:
+                    await asyncio.to_thread(store.restore, quarantine_key, key)
+        return removed
+
+    @staticmethod
+    def _resume_row(resume_info):
+        """
+        Build the column values for a resume record from extracted resume data.
+
+        Args:
+            resume_info: Dictionary containing resume information.
+
+        Returns:
+            Dictionary of Resume column values.
+        """
+        return {
+            "filename": resume_info.get("filename", "uploaded_resume.pdf"),
+            "content_text": resume_info.get("full_text", ""),
+            "extracted_name": resume_info.get("name", ""),
+            "extracted_email": resume_info.get("email", ""),
+            "extracted_phone": resume_info.get("phone", "")
+        }
+
+    @staticmethod
+    def _section_rows(resume_info):
+        """
+        Build the column values for a resume's section records, in resume order.
+
+        Args:
+            resume_info: Dictionary containing resume information.
+
+        Returns:
+            List of ResumeSection column value dictionaries without resume_id.
+        """
+        sections = resume_info.get("sections") or {}
+        return [
+            {"section": section, "position": position, "content": content or ""}
+            for position, (section, content) in enumerate(sections.items())
+        ]
+
+    @staticmethod
+    def _page_weight_json(html_content):
+        """The page-weight report stored with a portfolio, as JSON."""
+        return json.dumps(analyze_page(html_content).to_dict())
+
+    @staticmethod
+    async def _page_weights(html_contents):
+        """
+        Analyze each distinct HTML in a worker thread, off the event loop.
+
+        Args:
+            html_contents: Iterable of HTML strings.
+
+        Returns:
+            Dictionary mapping each HTML string to its page-weight report JSON.
+        """
+        distinct = list(dict.fromkeys(html_contents))
+        reports = await asyncio.to_thread(lambda: [PortfolioStore._page_weight_json(html) for html in distinct])
+        return dict(zip(distinct, reports))
+
+    @staticmethod
+    async def _insert_returning_ids(db, model, rows):
+        """
+        Insert rows in one batched statement and return their IDs in row order.
+
+        Args:
+            db: Async database session.
+            model: Mapped class with an integer id primary key.
+            rows: List of column value dictionaries.
+
+        Returns:
+            List of new IDs, one per row.
+        """
+        if db.bind.dialect.name == "sqlite":
+            # Asking SQLite for ordered RETURNING makes SQLAlchemy insert
+            # row by row. Rowids from one multi-row INSERT are assigned
+            # in VALUES order, so sorting them restores the batch order.
+            return sorted((await db.execute(
+                insert(model).returning(model.id), rows
+            )).scalars().all())
+        return (await db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        )).scalars().all()
+
+    @staticmethod
+    async def save_portfolio(db, email, resume_info, theme, html_content, portfolio_name):
+        """
+        Save a portfolio, its resume and its owner atomically.
+
+        Args:
+            db: Async database session.
+            email: User's email.
+            resume_info: Dictionary containing resume information.
+            theme: Selected theme for the portfolio.
+            html_content: HTML content of the portfolio.
+            portfolio_name: Name for the portfolio.
+
+        Returns:
+            ID of the saved portfolio.
+        """
+        # Parsing the page takes a while, so it happens before the transaction starts
+        page_weights = await PortfolioStore._page_weights([html_content])
+        try:
+            user_ids = await PortfolioStore.upsert_users(db, [email])
+            blob_hashes = await PortfolioStore.acquire_blobs(db, [html_content])
+
+            portfolio = Portfolio(
+                user_id=user_ids[email],
+                name=portfolio_name,
+                theme=theme,
+                html_blob_hash=blob_hashes[0],
+                page_weight_json=page_weights[html_content]
+            )
+            portfolio.resume = Resume(**PortfolioStore._resume_row(resume_info))
+            db.add(portfolio)
+
+            # Flush to obtain the portfolio ID before the single commit
+            await db.flush()
+            portfolio_id = portfolio.id
+
+            # One executemany; the ORM would insert sections row by row to get their IDs
+            section_rows = [
+                dict(row, resume_id=portfolio.resume.id) for row in PortfolioStore._section_rows(resume_info)
+            ]
+            if section_rows:
+                await db.execute(insert(ResumeSection), section_rows)
+            await SearchIndex.index_portfolios(
+                db, [(portfolio_id, *search_document(portfolio_name, resume_info))]
+            )
+            await db.commit()
+            return portfolio_id
+        except Exception:
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def save_portfolios_bulk(db, items):
+        """
+        Save many portfolios in one transaction using batched inserts.
+
+        Args:
+            db: Async database session.
+            items: List of dictionaries with email, resume_info, theme,
+                html_content and portfolio_name keys.
+
+        Returns:
+            List of saved portfolio IDs in the same order as items.
+        """
+        # Identical HTML is analyzed once, before the transaction starts
+        page_weights = await PortfolioStore._page_weights(item["html_content"] for item in items)
+        try:
+            user_ids = await PortfolioStore.upsert_users(db, [item["email"] for item in items])
+            blob_hashes = await PortfolioStore.acquire_blobs(db, [item["html_content"] for item in items])
+
+            portfolio_ids = []
+            for start in range(0, len(items), PortfolioStore.BATCH_SIZE):
+                batch = items[start:start + PortfolioStore.BATCH_SIZE]
+
+                rows = [
+                    {
+                        "user_id": user_ids[item["email"]],
+                        "name": item["portfolio_name"],
+                        "theme": item["theme"],
+                        "html_blob_hash": blob_hash,
+                        "page_weight_json": page_weights[item["html_content"]]
+                    } for item, blob_hash in zip(batch, blob_hashes[start:start + PortfolioStore.BATCH_SIZE])
+                ]
+                batch_ids = await PortfolioStore._insert_returning_ids(db, Portfolio, rows)
+                resume_ids = await PortfolioStore._insert_returning_ids(db, Resume, [
+                    dict(PortfolioStore._resume_row(item["resume_info"]), portfolio_id=portfolio_id)
+                    for item, portfolio_id in zip(batch, batch_ids)
+                ])
+                section_rows = [
+                    dict(row, resume_id=resume_id)
+                    for item, resume_id in zip(batch, resume_ids)
+                    for row in PortfolioStore._section_rows(item["resume_info"])
+                ]
+                if section_rows:
+                    await db.execute(insert(ResumeSection), section_rows)
+                await SearchIndex.index_portfolios(db, [
+                    (portfolio_id, *search_document(item["portfolio_name"], item["resume_info"]))
+                    for item, portfolio_id in zip(batch, batch_ids)
+                ])
+                portfolio_ids.extend(batch_ids)
+
+            await db.commit()
+            return portfolio_ids
+        except Exception:
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def update_section(db, portfolio_id, section, content):
+        """
+        Replace or add one section of a portfolio's resume without touching the others.
+
+        Args:
+            db: Async database session.
+            portfolio_id: Portfolio ID.
+            section: Section name, e.g. "SKILLS".
+            content: New section content.
+
+        Returns:
+            True if the section was saved, False if the portfolio has no resume.
+        """
+        try:
+            resume = (await db.execute(
+                select(Resume)
+                .options(selectinload(Resume.sections), joinedload(Resume.portfolio))
+                .filter(Resume.portfolio_id == portfolio_id)
+            )).scalars().first()
+            if resume is None:
+                return False
+
+            if not resume.sections and resume.sections_json:
+                # Move a resume that predates resume_sections over on first write
+                resume.sections = [
+                    ResumeSection(**row)
+                    for row in PortfolioStore._section_rows({"sections": json.loads(resume.sections_json)})
+                ]
+                resume.sections_json = None
+
+            existing = next((row for row in resume.sections if row.section == section), None)
+            if existing is not None:
+                existing.content = content
+            else:
+                position = max((row.position for row in resume.sections), default=-1) + 1
+                resume.sections.append(ResumeSection(section=section, position=position, content=content))
+            await db.flush()
+
+            # The original resume text is stale after an edit, so index the sections
+            await SearchIndex.index_portfolios(db, [(portfolio_id, *search_document(
+                resume.portfolio.name,
+                {"name": resume.extracted_name, "sections": resume.section_map()}
+            ))])
+            await db.commit()
+            return True
+        except Exception:
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def delete_portfolio(db, portfolio):
+        """
+        Delete a portfolio with its resume, sections and search entry and release its HTML blob, atomically.
+
+        Args:
+            db: Async database session.
+            portfolio: Portfolio to delete.
+        """
+        try:
+            blob_hash = portfolio.html_blob_hash
+            await SearchIndex.remove_portfolio(db, portfolio.id)
+            resume_ids = select(Resume.id).filter(Resume.portfolio_id == portfolio.id).scalar_subquery()
+            await db.execute(delete(ResumeSection).filter(ResumeSection.resume_id.in_(resume_ids)))
+            await db.execute(delete(Resume).filter(Resume.portfolio_id == portfolio.id))
+            await db.delete(portfolio)
+            await db.flush()
+            await PortfolioStore.release_blob(db, blob_hash)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
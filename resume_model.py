@@ -0,0 +1,240 @@
+"""
+Compact representation of an extracted resume.
+
+The extracted resume used to travel as a dictionary in which "full_text"
+and every "sections" value were separate copies of the same text, so each
+resume was held, serialized and sent about twice over. ParsedResume keeps
+the text once and each section as a (name, start, end) span into it;
+section strings are only built when they are read.
+
+Wire format (a JSON object, detected by its "spans" key):
+
+    {
+        "text": "...",                       Extracted text, then any edited
+                                             section text that is not in it
+        "text_length": 1234,                 Length of the extracted text
+        "spans": [["EDUCATION", 0, 120]],    Sections in order
+        "name": "...", "email": "...", "phone": "...",
+        "extra": {...}                       Any other keys, e.g. theme_preferences
+    }
+
+A name may appear in several spans; its content is the spans joined by a
+blank line, as extract_sections merges repeated headers.
+"""
+
+# Keys held as fields; anything else in a resume dictionary goes to extra
+_FIELDS = ("full_text", "sections", "name", "email", "phone")
+
+# Separator between the parts of a section whose header appears more than once
+_PART_SEPARATOR = "\n\n"
+
+def _locate(text, content):
+    """
+    Spans of text that join into content, or None if it is not all in text.
+
+    Content merged from repeated headers is found part by part.
+    """
+    start = text.find(content)
+    if start >= 0:
+        return [(start, start + len(content))]
+    spans = []
+    for part in content.split(_PART_SEPARATOR):
+        start = text.find(part)
+        if start < 0:
+            return None
+        spans.append((start, start + len(part)))
+    return spans
+
+class ParsedResume:
+    """
+    An extracted resume holding its text once, with sections as spans into it.
+    """
+
+    __slots__ = ("text", "text_length", "spans", "name", "email", "phone", "extra")
+
+    def __init__(self, text, spans, name="", email="", phone="", text_length=None, extra=None):
+        self.text = text
+        self.text_length = len(text) if text_length is None else text_length
+        self.spans = tuple(tuple(span) for span in spans)
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.extra = extra or {}
+
+    @property
+    def full_text(self):
+        """The extracted resume text."""
+        return self.text[:self.text_length]
+
+    @property
+    def sections(self):
+        """Sections as an ordered {name: content} dictionary."""
+        sections = {}
+        for name, start, end in self.spans:
+            content = self.text[start:end]
+            sections[name] = sections[name] + _PART_SEPARATOR + content if name in sections else content
+        return sections
+
+    def to_dict(self):
+        """The resume as the dictionary process_resume has always returned, plus any extra keys."""
+        return {
+            "full_text": self.full_text,
+            "sections": self.sections,
+            "email": self.email,
+            "phone": self.phone,
+            "name": self.name,
+            **self.extra
+        }
+
+    @classmethod
+    def from_dict(cls, resume_info):
+        """
+        Build a compact resume from a resume dictionary, e.g. one edited in the frontend.
+
+        Sections still found in the full text become spans into it; edited or
+        added sections are appended after it once.
+
+        Args:
+            resume_info: Dictionary containing resume information.
+
+        Returns:
+            A ParsedResume.
+        """
+        full_text = resume_info.get("full_text") or ""
+        parts = [full_text]
+        length = len(full_text)
+        spans = []
+        for name, content in (resume_info.get("sections") or {}).items():
+            content = content or ""
+            located = _locate(full_text, content)
+            if located is None:
+                parts.append(content)
+                located = [(length, length + len(content))]
+                length += len(content)
+            spans.extend((name, start, end) for start, end in located)
+        return cls(
+            "".join(parts),
+            spans,
+            name=resume_info.get("name", ""),
+            email=resume_info.get("email", ""),
+            phone=resume_info.get("phone", ""),
+            text_length=len(full_text),
+            extra={key: value for key, value in resume_info.items() if key not in _FIELDS}
+        )
+
+    def to_wire(self):
+        """The compact wire format as a JSON-serializable dictionary."""
+        wire = {
+            "text": self.text,
+            "text_length": self.text_length,
+            "spans": [list(span) for span in self.spans],
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone
+        }
+        if self.extra:
+            wire["extra"] = self.extra
+        return wire
+
+    @classmethod
+    def from_wire(cls, wire):
+        """Rebuild a resume from its wire format, checking the spans fit the text."""
+        text = wire["text"]
+        spans = wire["spans"]
+        text_length = wire.get("text_length", len(text))
+        if not 0 <= text_length <= len(text):
+            raise ValueError(f"Invalid text length: {text_length}")
+        for span in spans:
+            name, start, end = span
+            if not isinstance(name, str) or not 0 <= start <= end <= len(text):
+                raise ValueError(f"Invalid section span: {span}")
+        return cls(
+            text,
+            spans,
+            name=wire.get("name", ""),
+            email=wire.get("email", ""),
+            phone=wire.get("phone", ""),
+            text_length=text_length,
+            extra=wire.get("extra")
+        )
+
+    @staticmethod
+    def is_wire(data):
+        """Whether decoded JSON is in the compact wire format rather than a resume dictionary."""
+        return isinstance(data, dict) and "spans" in data and "text" in data
+
+def resume_info_from_json(data):
+    """
+    A resume dictionary from decoded request JSON in either format.
+
+    Args:
+        data: Decoded JSON, a resume dictionary or the compact wire format.
+
+    Returns:
+        Dictionary containing resume information.
+    """
+    if ParsedResume.is_wire(data):
+        return ParsedResume.from_wire(data).to_dict()
+    return data
+
+def resume_patch(base, edited):
+    """
+    The edits that turn one resume dictionary into another.
+
+    Args:
+        base: Resume dictionary as extracted.
+        edited: The same resume after the user's edits.
+
+    Returns:
+        Patch dictionary for apply_resume_patch: changed top-level keys, and
+        under "sections" the changed or added sections, with None for
+        removed ones. Empty if nothing changed.
+    """
+    patch = {
+        key: value for key, value in edited.items()
+        if key not in ("full_text", "sections") and base.get(key) != value
+    }
+    base_sections = base.get("sections") or {}
+    edited_sections = edited.get("sections") or {}
+    sections = {name: None for name in base_sections if name not in edited_sections}
+    sections.update(
+        (name, content) for name, content in edited_sections.items()
+        if base_sections.get(name) != content
+    )
+    if sections:
+        patch["sections"] = sections
+    return patch
+
+def apply_resume_patch(resume_info, patch):
+    """
+    Apply user edits from resume_patch() to a resume dictionary.
+
+    Args:
+        resume_info: Resume dictionary; it is changed in place.
+        patch: Decoded patch JSON.
+
+    Returns:
+        The patched resume dictionary.
+
+    Raises:
+        ValueError: If the patch is malformed.
+    """
+    if not isinstance(patch, dict):
+        raise ValueError("Resume patch must be an object")
+    sections = patch.get("sections") or {}
+    if not isinstance(sections, dict) or not all(
+        isinstance(content, str) or content is None for content in sections.values()
+    ):
+        raise ValueError("Resume patch sections must map names to text or null")
+    if "full_text" in patch:
+        raise ValueError("Resume patch can't replace the extracted text")
+
+    resume_info.update((key, value) for key, value in patch.items() if key != "sections")
+    merged = dict(resume_info.get("sections") or {})
+    for name, content in sections.items():
+        if content is None:
+            merged.pop(name, None)
+        else:
+            merged[name] = content
+    resume_info["sections"] = merged
+    return resume_info
@@ -2,6 +2,41 @@ import pdfplumber
 import io
 import re
 
+from tracing import span
+from resume_model import ParsedResume
+from entity_scanner import EMAIL, PHONE, first_of_kind
+
+# Common section headers in resumes (expanded patterns with more variations)
+SECTION_PATTERNS = [
+    r'(EDUCATION|ACADEMIC|QUALIFICATION|DEGREE|UNIVERSITY|SCHOOL)',
+    r'(EXPERIENCE|EMPLOYMENT|PROFESSIONAL|WORK HISTORY|CAREER|JOB)',
+    r'(SKILLS|TECHNICAL|TECHNOLOGIES|TOOLS|COMPETENCIES|PROFICIENCIES)',
+    r'(PROJECTS|PORTFOLIO|WORKS|ASSIGNMENTS|IMPLEMENTATIONS)',
+    r'(CERTIFICATIONS|CERTIFICATES|LICENSES|ACCREDITATIONS)',
+    r'(PUBLICATIONS|RESEARCH|PAPERS|JOURNALS|ARTICLES)',
+    r'(AWARDS|HONORS|ACHIEVEMENTS|RECOGNITIONS|ACCOMPLISHMENTS)',
+    r'(VOLUNTEER|COMMUNITY|SERVICE|SOCIAL WORK)',
+    r'(LANGUAGES|LANGUAGE PROFICIENCY|FLUENCY)',
+    r'(INTERESTS|HOBBIES|ACTIVITIES|PASSIONS)'
+]
+
+# Patterns are compiled once at import, which the API does during warmup
+SECTION_HEADER_RE = re.compile('|'.join(SECTION_PATTERNS), re.IGNORECASE)
+
+# Standardize section names for consistency, first match wins
+CANONICAL_SECTIONS = [
+    (re.compile(r'education|academic|qualification|degree|university|school', re.IGNORECASE), "EDUCATION"),
+    (re.compile(r'experience|employment|professional|work history|career|job', re.IGNORECASE), "EXPERIENCE"),
+    (re.compile(r'skills|technical|technologies|tools|competencies|proficiencies', re.IGNORECASE), "SKILLS"),
+    (re.compile(r'projects|portfolio|works|assignments|implementations', re.IGNORECASE), "PROJECTS"),
+    (re.compile(r'certifications|certificates|licenses|accreditations', re.IGNORECASE), "CERTIFICATIONS"),
+    (re.compile(r'publications|research|papers|journals|articles', re.IGNORECASE), "PUBLICATIONS"),
+    (re.compile(r'awards|honors|achievements|recognitions|accomplishments', re.IGNORECASE), "AWARDS"),
+    (re.compile(r'volunteer|community|service|social work', re.IGNORECASE), "VOLUNTEER"),
+    (re.compile(r'languages|language proficiency|fluency', re.IGNORECASE), "LANGUAGES"),
+    (re.compile(r'interests|hobbies|activities|passions', re.IGNORECASE), "INTERESTS")
+]
+
 class ResumeProcessor:
     """
     Processes and extracts structured information from resumes.
@@ -20,7 +55,7 @@ class ResumeProcessor:
         """
         extracted_text = ""
         try:
-            with pdfplumber.open(file) as pdf:
+            with span("pdf.extract_text", kind="pdf"), pdfplumber.open(file) as pdf:
                 for page in pdf.pages:
                     text = page.extract_text()
                     if text:
@@ -30,72 +65,44 @@ class ResumeProcessor:
             raise Exception(f"Error extracting text from PDF: {str(e)}")
 
     @staticmethod
-    def extract_sections(text):
+    def _strip_span(text, start, end):
+        """Narrow text[start:end] to exclude surrounding whitespace, like str.strip()."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    @staticmethod
+    def extract_section_spans(text):
         """
-        Extract sections from resume text.
+        Find the sections of resume text without copying them.
         
         Args:
             text: String containing the resume text.
             
         Returns:
-            Dictionary with section names as keys and content as values.
+            List of (section name, start, end) tuples in order. A name repeats
+            when its header appears more than once.
         """
-        # Common section headers in resumes (expanded patterns with more variations)
-        section_patterns = [
-            r'(EDUCATION|ACADEMIC|QUALIFICATION|DEGREE|UNIVERSITY|SCHOOL)',
-            r'(EXPERIENCE|EMPLOYMENT|PROFESSIONAL|WORK HISTORY|CAREER|JOB)',
-            r'(SKILLS|TECHNICAL|TECHNOLOGIES|TOOLS|COMPETENCIES|PROFICIENCIES)',
-            r'(PROJECTS|PORTFOLIO|WORKS|ASSIGNMENTS|IMPLEMENTATIONS)',
-            r'(CERTIFICATIONS|CERTIFICATES|LICENSES|ACCREDITATIONS)',
-            r'(PUBLICATIONS|RESEARCH|PAPERS|JOURNALS|ARTICLES)',
-            r'(AWARDS|HONORS|ACHIEVEMENTS|RECOGNITIONS|ACCOMPLISHMENTS)',
-            r'(VOLUNTEER|COMMUNITY|SERVICE|SOCIAL WORK)',
-            r'(LANGUAGES|LANGUAGE PROFICIENCY|FLUENCY)',
-            r'(INTERESTS|HOBBIES|ACTIVITIES|PASSIONS)'
-        ]
-        
-        # Combine patterns into a single regex
-        combined_pattern = '|'.join(section_patterns)
-        
         # Find all section headers (case insensitive)
-        matches = list(re.finditer(combined_pattern, text, re.IGNORECASE))
+        matches = list(SECTION_HEADER_RE.finditer(text))
         
-        sections = {}
         if not matches:
             # If no sections found, treat the entire text as one section
-            sections["General Information"] = text
-            return sections
+            return [("General Information", 0, len(text))]
         
         # Extract each section
+        spans = []
         for i, match in enumerate(matches):
             # Get the matched section name and standardize it
             matched_text = match.group(0).strip()
             
             # Standardize section names for consistency
-            if re.search(r'education|academic|qualification|degree|university|school', matched_text, re.IGNORECASE):
-                section_name = "EDUCATION"
-            elif re.search(r'experience|employment|professional|work history|career|job', matched_text, re.IGNORECASE):
-                section_name = "EXPERIENCE" 
-            elif re.search(r'skills|technical|technologies|tools|competencies|proficiencies', matched_text, re.IGNORECASE):
-                section_name = "SKILLS"
-            elif re.search(r'projects|portfolio|works|assignments|implementations', matched_text, re.IGNORECASE):
-                section_name = "PROJECTS"
-            elif re.search(r'certifications|certificates|licenses|accreditations', matched_text, re.IGNORECASE):
-                section_name = "CERTIFICATIONS"
-            elif re.search(r'publications|research|papers|journals|articles', matched_text, re.IGNORECASE):
-                section_name = "PUBLICATIONS"
-            elif re.search(r'awards|honors|achievements|recognitions|accomplishments', matched_text, re.IGNORECASE):
-                section_name = "AWARDS"
-            elif re.search(r'volunteer|community|service|social work', matched_text, re.IGNORECASE):
-                section_name = "VOLUNTEER"
-            elif re.search(r'languages|language proficiency|fluency', matched_text, re.IGNORECASE):
-                section_name = "LANGUAGES"
-            elif re.search(r'interests|hobbies|activities|passions', matched_text, re.IGNORECASE):
-                section_name = "INTERESTS"
-            else:
-                section_name = matched_text.upper()
-                
-            start_index = match.start()
+            section_name = next(
+                (name for pattern, name in CANONICAL_SECTIONS if pattern.search(matched_text)),
+                matched_text.upper()
+            )
             
             # Determine the end of the current section
             if i < len(matches) - 1:
@@ -103,35 +110,50 @@ class ResumeProcessor:
             else:
                 end_index = len(text)
             
-            # Extract section content
-            section_content = text[start_index:end_index].strip()
-            
-            # If we already have this section, append new content
-            if section_name in sections:
-                sections[section_name] += "\n\n" + section_content
-            else:
-                sections[section_name] = section_content
+            spans.append((section_name, *ResumeProcessor._strip_span(text, match.start(), end_index)))
         
         # Extract header information (assume it's before the first section)
-        if matches and matches[0].start() > 0:
-            header_text = text[:matches[0].start()].strip()
-            sections["Personal Information"] = header_text
+        if matches[0].start() > 0:
+            spans.append(("Personal Information", *ResumeProcessor._strip_span(text, 0, matches[0].start())))
+        
+        return spans
+
+    @staticmethod
+    def extract_sections(text):
+        """
+        Extract sections from resume text.
         
-        return sections
+        Args:
+            text: String containing the resume text.
+            
+        Returns:
+            Dictionary with section names as keys and content as values.
+        """
+        return ParsedResume(text, ResumeProcessor.extract_section_spans(text)).sections
 
     @staticmethod
     def extract_email(text):
         """Extract email address from text."""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        matches = re.findall(email_pattern, text)
-        return matches[0] if matches else ""
+        return first_of_kind(text, EMAIL)[EMAIL]
 
     @staticmethod
     def extract_phone(text):
-        """Extract phone number from text."""
-        phone_pattern = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        matches = re.findall(phone_pattern, text)
-        return matches[0] if matches else ""
+        """Extract phone number from text, including international formats."""
+        return first_of_kind(text, PHONE)[PHONE]
+
+    @staticmethod
+    def extract_contact(text):
+        """
+        Extract the email address and phone number in one pass over the text.
+        
+        Args:
+            text: String containing the resume text.
+            
+        Returns:
+            Tuple of (email, phone), each "" if not found.
+        """
+        contact = first_of_kind(text, EMAIL, PHONE)
+        return contact[EMAIL], contact[PHONE]
 
     @staticmethod
     def extract_name(text, sections):
@@ -140,28 +162,22 @@ class ResumeProcessor:
         Often the name is the first line of the resume or in the Personal Information section.
         """
         if "Personal Information" in sections:
-            lines = sections["Personal Information"].split('\n')
-            if lines:
-                # Typically, the name is the first line in the personal information section
-                return lines[0].strip()
+            # Typically, the name is the first line in the personal information section
+            return sections["Personal Information"].partition('\n')[0].strip()
         
         # If not found in Personal Information, try the first line of the resume
-        lines = text.split('\n')
-        if lines:
-            return lines[0].strip()
-        
-        return ""
+        return text.partition('\n')[0].strip()
 
     @staticmethod
-    def process_resume(file):
+    def parse_resume(file):
         """
-        Process resume file and extract structured information.
+        Process resume file and extract structured information, holding the text once.
         
         Args:
             file: Uploaded resume file (PDF).
             
         Returns:
-            Dictionary containing structured resume information.
+            A ParsedResume.
         """
         if file is None:
             raise ValueError("No file provided")
@@ -174,20 +190,26 @@ class ResumeProcessor:
             full_text = ResumeProcessor.extract_text_from_pdf(io.BytesIO(file_content))
             
             # Extract sections
-            sections = ResumeProcessor.extract_sections(full_text)
+            resume = ParsedResume(full_text, ResumeProcessor.extract_section_spans(full_text))
             
             # Extract key information
-            email = ResumeProcessor.extract_email(full_text)
-            phone = ResumeProcessor.extract_phone(full_text)
-            name = ResumeProcessor.extract_name(full_text, sections)
+            resume.email, resume.phone = ResumeProcessor.extract_contact(full_text)
+            resume.name = ResumeProcessor.extract_name(full_text, resume.sections)
             
-            return {
-                "full_text": full_text,
-                "sections": sections,
-                "email": email,
-                "phone": phone,
-                "name": name
-            }
+            return resume
             
         except Exception as e:
             raise Exception(f"Error processing resume: {str(e)}")
+
+    @staticmethod
+    def process_resume(file):
+        """
+        Process resume file and extract structured information.
+        
+        Args:
+            file: Uploaded resume file (PDF).
+            
+        Returns:
+            Dictionary containing structured resume information.
+        """
+        return ResumeProcessor.parse_resume(file).to_dict()
@@ -0,0 +1,255 @@
+"""
+Full-text search over saved portfolios and their resumes.
+
+SQLite uses an FTS5 table whose rowid is the portfolio ID, ranked with bm25.
+PostgreSQL uses a table with a weighted tsvector column and a GIN index,
+ranked with ts_rank_cd. In both cases the index holds one row per portfolio:
+a title (portfolio and candidate name) and a body (the resume text), and is
+updated in the same transaction that saves or deletes the portfolio.
+
+Result snippets are safe HTML: the resume text is escaped and only the
+<mark> tags around matched terms are markup.
+"""
+import html
+import json
+
+from sqlalchemy import text
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+
+# Private-use characters that bracket matches in the raw snippet; they are
+# swapped for the <mark> tags once the text has been escaped
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS portfolio_search "
+    "USING fts5(title, body, tokenize='porter unicode61')",
+    # Weight title matches above body matches in the default rank
+    "INSERT INTO portfolio_search(portfolio_search, rank) VALUES ('rank', 'bm25(5.0, 1.0)')",
+]
+
+POSTGRES_DDL = [
+    "CREATE TABLE IF NOT EXISTS portfolio_search ("
+    " portfolio_id INTEGER PRIMARY KEY REFERENCES portfolios(id) ON DELETE CASCADE,"
+    " title TEXT NOT NULL,"
+    " body TEXT NOT NULL,"
+    " document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_portfolio_search_document ON portfolio_search USING GIN (document)",
+]
+
+def create_search_index(connection):
+    """
+    Create the search index if it does not exist.
+
+    Args:
+        connection: Synchronous SQLAlchemy connection.
+    """
+    dialect_name = connection.dialect.name
+    if dialect_name == "sqlite":
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'portfolio_search'"
+        )).first()
+        if not exists:
+            for statement in SQLITE_DDL:
+                connection.execute(text(statement))
+    elif dialect_name == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+
+def search_document(portfolio_name, resume_info):
+    """
+    Build the indexed title and body for a portfolio.
+
+    Args:
+        portfolio_name: Name of the portfolio.
+        resume_info: Dictionary containing resume information.
+
+    Returns:
+        Tuple of (title, body).
+    """
+    title = " ".join(part for part in (portfolio_name, resume_info.get("name", "")) if part)
+    body = resume_info.get("full_text", "")
+    if not body:
+        sections = resume_info.get("sections", {})
+        if isinstance(sections, str):
+            sections = json.loads(sections or "{}")
+        body = "\n".join(sections.values())
+    return title, body
+
+def _fts5_query(query):
+    """
+    Turn free text into a safe FTS5 query that matches all terms.
+
+    Each term is quoted so user input can't inject FTS5 syntax; a trailing
+    "*" on a term is kept as a prefix search.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', "")
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+def _highlight(snippet):
+    """
+    Turn a raw snippet into safe HTML.
+
+    Args:
+        snippet: Snippet text with matches between MATCH_START and MATCH_END.
+
+    Returns:
+        The escaped text with matches wrapped in <mark> tags.
+    """
+    if not snippet:
+        return ""
+    return html.escape(snippet).replace(MATCH_START, SNIPPET_START).replace(MATCH_END, SNIPPET_END)
+
+class SearchIndex:
+    """
+    Keeps the portfolio search index in sync and queries it.
+    """
+
+    @staticmethod
+    def _dialect(db):
+        return db.bind.dialect.name
+
+    @staticmethod
+    async def index_portfolios(db, documents):
+        """
+        Add or replace index entries.
+
+        Args:
+            db: Async database session.
+            documents: List of (portfolio_id, title, body) tuples.
+        """
+        if not documents:
+            return
+        rows = [
+            {"portfolio_id": portfolio_id, "title": title, "body": body}
+            for portfolio_id, title, body in documents
+        ]
+        dialect_name = SearchIndex._dialect(db)
+        if dialect_name == "sqlite":
+            await db.execute(
+                text("INSERT OR REPLACE INTO portfolio_search (rowid, title, body) VALUES (:portfolio_id, :title, :body)"),
+                rows
+            )
+        elif dialect_name == "postgresql":
+            await db.execute(
+                text(
+                    "INSERT INTO portfolio_search (portfolio_id, title, body, document) "
+                    "VALUES (:portfolio_id, :title, :body, "
+                    "setweight(to_tsvector('english', :title), 'A') || setweight(to_tsvector('english', :body), 'B')) "
+                    "ON CONFLICT (portfolio_id) DO UPDATE SET "
+                    "title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document"
+                ),
+                rows
+            )
+
+    @staticmethod
+    async def remove_portfolio(db, portfolio_id):
+        """
+        Remove a portfolio's index entry.
+
+        Args:
+            db: Async database session.
+            portfolio_id: Portfolio ID.
+        """
+        dialect_name = SearchIndex._dialect(db)
+        if dialect_name == "sqlite":
+            await db.execute(text("DELETE FROM portfolio_search WHERE rowid = :portfolio_id"), {"portfolio_id": portfolio_id})
+        elif dialect_name == "postgresql":
+            await db.execute(text("DELETE FROM portfolio_search WHERE portfolio_id = :portfolio_id"), {"portfolio_id": portfolio_id})
+
+    @staticmethod
+    async def search(db, query, theme=None, email=None, page=1, page_size=20):
+        """
+        Ranked, paginated full-text search.
+
+        Args:
+            db: Async database session.
+            query: Free-text search query.
+            theme: Only return portfolios with this theme.
+            email: Only return portfolios owned by this user.
+            page: 1-based page number.
+            page_size: Results per page.
+
+        Returns:
+            Tuple of (total matches, list of result dictionaries). Each
+            result's snippet is escaped HTML with matches in <mark> tags.
+        """
+        params = {
+            "theme": theme,
+            "email": email,
+            "limit": page_size,
+            "offset": (page - 1) * page_size,
+            "match_start": MATCH_START,
+            "match_end": MATCH_END
+        }
+        filters = ""
+        if theme:
+            filters += " AND p.theme = :theme"
+        if email:
+            filters += " AND p.user_id = (SELECT id FROM users WHERE email = :email)"
+
+        dialect_name = SearchIndex._dialect(db)
+        if dialect_name == "sqlite":
+            params["query"] = _fts5_query(query)
+            if not params["query"]:
+                return 0, []
+            if email:
+                # A user has few portfolios: look each one up in the index by
+                # rowid instead of joining every match to portfolios
+                match = (
+                    "FROM portfolios p CROSS JOIN portfolio_search ON portfolio_search.rowid = p.id "
+                    "WHERE portfolio_search MATCH :query"
+                )
+            else:
+                match = (
+                    "FROM portfolio_search JOIN portfolios p ON p.id = portfolio_search.rowid "
+                    "WHERE portfolio_search MATCH :query"
+                )
+            if filters:
+                count_sql = f"SELECT count(*) {match}{filters}"
+            else:
+                # Every indexed row has a portfolio, so the join can be skipped
+                count_sql = "SELECT count(*) FROM portfolio_search WHERE portfolio_search MATCH :query"
+            results_sql = (
+                "SELECT p.id, p.name, p.theme, p.created_at, -portfolio_search.rank AS score, "
+                "snippet(portfolio_search, 1, :match_start, :match_end, '…', 16) AS snippet "
+                f"{match}{filters} ORDER BY portfolio_search.rank LIMIT :limit OFFSET :offset"
+            )
+        elif dialect_name == "postgresql":
+            params["query"] = query
+            params["headline_options"] = f"StartSel={MATCH_START}, StopSel={MATCH_END}, MaxFragments=2"
+            match = (
+                "FROM portfolio_search s JOIN portfolios p ON p.id = s.portfolio_id, "
+                "websearch_to_tsquery('english', :query) q WHERE s.document @@ q"
+            )
+            count_sql = f"SELECT count(*) {match}{filters}"
+            # Rank and order first, then build headlines only for the page
+            results_sql = (
+                "SELECT id, name, theme, created_at, score, "
+                "ts_headline('english', body, q, :headline_options) AS snippet "
+                "FROM (SELECT p.id, p.name, p.theme, p.created_at, s.body, q, ts_rank_cd(s.document, q) AS score "
+                f"{match}{filters} ORDER BY score DESC LIMIT :limit OFFSET :offset) ranked ORDER BY score DESC"
+            )
+        else:
+            raise ValueError(f"Full-text search is not supported on {dialect_name}")
+
+        total = (await db.execute(text(count_sql), params)).scalar()
+        rows = (await db.execute(text(results_sql), params)).all()
+        results = [
+            {
+                "portfolio_id": row.id,
+                "name": row.name,
+                "theme": row.theme,
+                "created_at": row.created_at.isoformat() if hasattr(row.created_at, "isoformat") else row.created_at,
+                "score": round(float(row.score), 4),
+                "snippet": _highlight(row.snippet)
+            } for row in rows
+        ]
+        return total, results
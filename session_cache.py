@@ -0,0 +1,84 @@
+"""
+Per-session result caches for the Streamlit frontend.
+
+Values live in st.session_state, so each browser session has its own cache
+and one user's resume data is never served to another. Each cache holds a
+bounded number of entries and evicts the least recently used one.
+"""
+import copy
+import hashlib
+from collections import OrderedDict
+
+import streamlit as st
+
+class SessionCache:
+    """
+    LRU cache of JSON-like values, bounded by entry count.
+
+    Values are deep-copied on the way in and out, so editing a returned
+    value never changes the cached one.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return a copy of the value for key, or None if it is not cached."""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(self._entries[key])
+
+    def set(self, key, value):
+        """Store a copy of value under key, evicting the least recently used entry if full."""
+        self._entries[key] = copy.deepcopy(value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Remove key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+def session_cache(name, max_entries):
+    """
+    The current session's cache with this name, created on first use.
+
+    Args:
+        name: Session state key of the cache.
+        max_entries: Entry limit for a newly created cache.
+
+    Returns:
+        A SessionCache.
+    """
+    if name not in st.session_state:
+        st.session_state[name] = SessionCache(max_entries)
+    return st.session_state[name]
+
+def clear_session_cache(name):
+    """
+    Empty the current session's cache with this name, if it exists.
+
+    Lets one page drop another page's cached results after a change, without
+    knowing the other cache's size.
+
+    Args:
+        name: Session state key of the cache.
+    """
+    if name in st.session_state:
+        st.session_state[name].clear()
+
+def content_hash(data):
+    """Hex SHA-256 of uploaded file bytes, used as a cache key."""
+    return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,191 @@
+"""
+Static bundle export of portfolio HTML for CDN hosting.
+
+The plain ZIP package holds one self-contained HTML file, so every page view
+downloads the styles and scripts again. A bundle splits them out:
+
+    index.html                  the page, linking to the assets below
+    assets/style.<hash>.css     each inline stylesheet
+    assets/script.<hash>.js     each inline script
+    _headers                    Netlify cache headers
+    vercel.json                 Vercel cache headers
+    README.txt
+
+Asset names carry a hash of their content, so a changed asset gets a new
+URL and the assets can be cached for good. index.html is revalidated on each
+view. With precompression, .gz and (when the optional ``brotli`` package is
+installed) .br copies of each text file are added for servers that serve
+them as-is, e.g. nginx with gzip_static.
+
+Only elements that can move without changing the page are split out: style
+blocks and classic scripts with no other attributes, and stylesheets with
+no relative url() references, which would resolve against assets/ instead.
+"""
+import gzip
+import hashlib
+import io
+import json
+import re
+import zipfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from tracing import span
+
+ASSET_DIR = "assets"
+
+# Hex digits of the content hash in asset file names
+HASH_LENGTH = 10
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Files that are worth precompressing
+COMPRESSIBLE_SUFFIXES = (".html", ".css", ".js")
+
+# An inline style or script element; group 2 is its attributes
+INLINE_ASSET_RE = re.compile(r"<(style|script)(\s[^>]*)?>([\s\S]*?)</\1\s*>", re.IGNORECASE)
+
+# Attributes that still allow a style or script to be moved to a file
+MOVABLE_ATTRIBUTES_RE = re.compile(r'^\s*(?:type\s*=\s*["\']?text/(?:css|javascript)["\']?\s*)?$', re.IGNORECASE)
+
+# A url() in CSS that isn't absolute, root-relative, a fragment or a data URI
+RELATIVE_CSS_URL_RE = re.compile(r"url\(\s*['\"]?(?![a-z][a-z0-9+.-]*:|/|#)", re.IGNORECASE)
+
+def _asset_name(prefix, data, suffix):
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return f"{ASSET_DIR}/{prefix}.{digest}{suffix}"
+
+def split_assets(html_content):
+    """
+    Move inline styles and scripts into content-hashed files.
+
+    Args:
+        html_content: HTML string of the portfolio.
+
+    Returns:
+        Tuple of (index HTML, dictionary of asset path to bytes). Identical
+        blocks share one file.
+    """
+    assets = {}
+
+    def replace(match):
+        tag, attributes, body = match.group(1).lower(), match.group(2) or "", match.group(3)
+        if not body.strip() or not MOVABLE_ATTRIBUTES_RE.match(attributes):
+            return match.group(0)
+        data = body.strip().encode("utf-8")
+        if tag == "style":
+            if RELATIVE_CSS_URL_RE.search(body):
+                return match.group(0)
+            path = _asset_name("style", data, ".css")
+            element = f'<link rel="stylesheet" href="{path}">'
+        else:
+            path = _asset_name("script", data, ".js")
+            # Without async or defer the script still runs where it was
+            element = f'<script src="{path}"></script>'
+        assets[path] = data
+        return element
+
+    return INLINE_ASSET_RE.sub(replace, html_content), assets
+
+def netlify_headers():
+    """Contents of a Netlify _headers file for the bundle."""
+    return (
+        f"/{ASSET_DIR}/*\n"
+        f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}\n"
+        "\n"
+        "/\n"
+        f"  Cache-Control: {REVALIDATE_CACHE_CONTROL}\n"
+        "\n"
+        "/index.html\n"
+        f"  Cache-Control: {REVALIDATE_CACHE_CONTROL}\n"
+    )
+
+def vercel_config():
+    """Contents of a vercel.json file for the bundle."""
+    def rule(source, value):
+        return {"source": source, "headers": [{"key": "Cache-Control", "value": value}]}
+
+    return json.dumps({"headers": [
+        rule(f"/{ASSET_DIR}/(.*)", IMMUTABLE_CACHE_CONTROL),
+        rule("/", REVALIDATE_CACHE_CONTROL),
+        rule("/index.html", REVALIDATE_CACHE_CONTROL)
+    ]}, indent=2) + "\n"
+
+def _precompressed(files):
+    """The .gz and .br copies of the compressible files, where they are smaller."""
+    copies = {}
+    for path, data in files.items():
+        if not path.endswith(COMPRESSIBLE_SUFFIXES):
+            continue
+        # mtime=0 so the same input always gives the same bytes
+        compressed = gzip.compress(data, GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(data):
+            copies[path + ".gz"] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+            if len(compressed) < len(data):
+                copies[path + ".br"] = compressed
+    return copies
+
+README = (
+    "Portfolio Website\n"
+    "=================\n\n"
+    "This portfolio website was generated by AI Portfolio Generator.\n\n"
+    "index.html is the page. Its styles and scripts are in the assets folder,\n"
+    "named after a hash of their content, so browsers and CDNs can cache them\n"
+    "for good: a changed file gets a new name.\n\n"
+    "For deployment to services like Netlify or Vercel, upload the whole folder.\n"
+    "_headers (Netlify) and vercel.json (Vercel) set the caching headers.\n\n"
+    "Any .gz and .br files are precompressed copies for servers that can send\n"
+    "them directly (e.g. nginx with gzip_static and brotli_static). Netlify and\n"
+    "Vercel compress on their own and ignore them.\n\n"
+    "Enjoy your new portfolio website!"
+)
+
+def build_bundle(html_content, precompress=False):
+    """
+    The files of a static bundle.
+
+    Args:
+        html_content: HTML string of the portfolio.
+        precompress: Add .gz and .br copies of the text files.
+
+    Returns:
+        Dictionary of path to bytes, index.html first.
+    """
+    with span("bundle.build", kind="html", bytes=len(html_content), precompress=precompress):
+        index_html, assets = split_assets(html_content)
+        files = {"index.html": index_html.encode("utf-8")}
+        files.update(assets)
+        if precompress:
+            files.update(_precompressed(files))
+        files["_headers"] = netlify_headers().encode("utf-8")
+        files["vercel.json"] = vercel_config().encode("utf-8")
+        files["README.txt"] = README.encode("utf-8")
+        return files
+
+def create_bundle_zip(html_content, precompress=False):
+    """
+    Create a ZIP file of the portfolio as a static bundle.
+
+    Args:
+        html_content: HTML string of the portfolio.
+        precompress: Add .gz and .br copies of the text files.
+
+    Returns:
+        ZIP file as bytes.
+    """
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for path, data in build_bundle(html_content, precompress).items():
+            # Already compressed copies would only grow when deflated again
+            compress_type = zipfile.ZIP_STORED if path.endswith((".gz", ".br")) else zipfile.ZIP_DEFLATED
+            zip_file.writestr(path, data, compress_type=compress_type)
+    return zip_buffer.getvalue()
@@ -0,0 +1,16 @@
+"""
+Test setup: the app's modules on the path and a fresh database per test run.
+
+database.py reads DATABASE_URL when it is imported, so it is set here, before
+any test imports the app.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_database_dir = tempfile.mkdtemp(prefix="portfolio-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+os.environ.setdefault("TRACE_LOG", "0")
@@ -0,0 +1,167 @@
+"""Tests that the sweep removes artifacts left by rolled-back saves and keeps the rest."""
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+
+import database
+import portfolio_store
+from artifact_store import LocalArtifactStore, QUARANTINE_PREFIX, set_artifact_store
+from portfolio_store import PortfolioStore
+
+RESUME = {"name": "Sweep Test", "email": "", "phone": "", "sections": {}}
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalArtifactStore(str(tmp_path))
+    set_artifact_store(store)
+    yield store
+    set_artifact_store(None)
+
+def _age(store, key):
+    """Make an artifact look older than any grace period used here."""
+    past = time.time() - 7200
+    os.utime(store.local_path(key), (past, past))
+
+async def _save(html_content):
+    async with database.AsyncWriteSessionLocal() as db:
+        return await PortfolioStore.save_portfolio(
+            db, "sweep@example.com", RESUME, "Professional Classic", html_content, "Sweep Test"
+        )
+
+async def _sweep(grace_period):
+    async with database.AsyncSessionLocal() as db:
+        return await PortfolioStore.sweep_orphaned_artifacts(db, grace_period)
+
+async def _failing_index(db, documents):
+    raise RuntimeError("index unavailable")
+
+def test_sweep_removes_artifacts_of_rolled_back_saves(store, monkeypatch):
+    database.create_schema()
+    saved_html = "<html><body>saved</body></html>"
+    failed_html = "<html><body>rolled back</body></html>"
+
+    async def run():
+        try:
+            await _save(saved_html)
+            with monkeypatch.context() as patch:
+                patch.setattr(portfolio_store.SearchIndex, "index_portfolios", _failing_index)
+                with pytest.raises(RuntimeError):
+                    await _save(failed_html)
+
+            saved_key, failed_key = (store.key_for(portfolio_store.html_hash(html)) for html in (saved_html, failed_html))
+            assert store.exists(failed_key)
+
+            # Too recent to delete: a save may still be about to reference it
+            assert await _sweep(3600) == 0
+            _age(store, saved_key)
+            _age(store, failed_key)
+            assert await _sweep(3600) == 1
+            return saved_key, failed_key
+        finally:
+            await database.async_engine.dispose()
+            await database.async_write_engine.dispose()
+
+    saved_key, failed_key = asyncio.run(run())
+    assert store.exists(saved_key)
+    assert not store.exists(failed_key)
+
+def test_rewriting_an_artifact_restarts_its_grace_period(store):
+    key = store.key_for("ab" * 32)
+    store.put(key, b"<html></html>")
+    _age(store, key)
+    store.put(key, b"<html></html>")
+    assert store.modified_time(key) > time.time() - 60
+
+def test_deleted_portfolio_artifact_is_left_for_the_sweep(store):
+    database.create_schema()
+    html_content = "<html><body>deleted, then saved again</body></html>"
+    key = store.key_for(portfolio_store.html_hash(html_content))
+
+    async def run():
+        try:
+            portfolio_id = await _save(html_content)
+            async with database.AsyncWriteSessionLocal() as db:
+                portfolio = await db.get(database.Portfolio, portfolio_id)
+                await PortfolioStore.delete_portfolio(db, portfolio)
+            # A save of the same HTML racing the delete still finds its file
+            assert store.exists(key)
+            await _save(html_content)
+            _age(store, key)
+            return await _sweep(3600)
+        finally:
+            await database.async_engine.dispose()
+            await database.async_write_engine.dispose()
+
+    assert asyncio.run(run()) == 0
+    assert store.exists(key)
+
+def _orphan(store, name):
+    """An old artifact that no blob references. Returns its key."""
+    key = store.key_for(portfolio_store.html_hash(name))
+    store.put(key, name.encode("utf-8"))
+    _age(store, key)
+    return key
+
+def _run(coroutine):
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            await database.async_engine.dispose()
+            await database.async_write_engine.dispose()
+    return asyncio.run(run())
+
+def test_sweep_holds_no_write_lock_while_it_works_on_files(store, monkeypatch):
+    database.create_schema()
+    keys = [_orphan(store, f"<html>orphan {index}</html>") for index in range(3)]
+    quarantine = store.quarantine
+    writes = []
+
+    def quarantine_while_writing(key):
+        # A save on another connection must get the write lock meanwhile
+        connection = sqlite3.connect(database.engine.url.database, timeout=1, isolation_level=None)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("ROLLBACK")
+            writes.append(key)
+        finally:
+            connection.close()
+        return quarantine(key)
+
+    monkeypatch.setattr(store, "quarantine", quarantine_while_writing)
+    assert _run(_sweep(3600)) == 3
+    assert sorted(writes) == sorted(keys)
+
+def test_artifact_reused_just_before_its_quarantine_is_restored(store, monkeypatch):
+    database.create_schema()
+    key = _orphan(store, "<html>reused</html>")
+    quarantine = store.quarantine
+
+    def quarantine_after_reuse(key):
+        # A save of the same HTML reuses the file between the listing and the move
+        store.put(key, b"<html>reused</html>")
+        return quarantine(key)
+
+    monkeypatch.setattr(store, "quarantine", quarantine_after_reuse)
+    assert _run(_sweep(3600)) == 0
+    assert store.exists(key)
+    assert list(store.list_keys(QUARANTINE_PREFIX)) == []
+
+def test_artifacts_left_in_quarantine_are_restored_or_deleted(store):
+    database.create_schema()
+    html_content = "<html><body>left in quarantine</body></html>"
+    _run(_save(html_content))
+    referenced = store.key_for(portfolio_store.html_hash(html_content))
+    _age(store, referenced)
+    orphan = _orphan(store, "<html>orphan in quarantine</html>")
+    # As if a sweep stopped between moving these and deciding what to do
+    store.quarantine(referenced)
+    store.quarantine(orphan)
+
+    assert _run(_sweep(3600)) == 1
+    assert store.exists(referenced)
+    assert not store.exists(orphan)
+    assert list(store.list_keys(QUARANTINE_PREFIX)) == []
@@ -0,0 +1,41 @@
+"""Tests that the read cache's bookkeeping and the memory backend stay bounded."""
+import asyncio
+
+from cache import ReadCache, InMemorySharedBackend
+
+def test_invalidation_records_are_bounded_by_the_entry_limit():
+    cache = ReadCache(max_entries=10)
+
+    async def run():
+        for index in range(1000):
+            await cache.invalidate(f"portfolio:{index}")
+
+    asyncio.run(run())
+    assert len(cache._invalidated) == 10
+
+def test_read_started_before_a_forgotten_invalidation_is_not_cached():
+    cache = ReadCache(max_entries=2)
+
+    async def run():
+        generation = cache.generation("portfolio:1")
+        await cache.invalidate("portfolio:1")
+        # Push portfolio:1's invalidation out of the records
+        await cache.invalidate("portfolio:2", "portfolio:3")
+        await cache.set("portfolio:1", b"stale", generation)
+        stale = await cache.get("portfolio:1")
+
+        generation = cache.generation("portfolio:1")
+        await cache.set("portfolio:1", b"fresh", generation)
+        return stale, await cache.get("portfolio:1")
+
+    assert asyncio.run(run()) == (None, b"fresh")
+
+def test_memory_backend_evicts_least_recently_used_entries():
+    backend = InMemorySharedBackend(max_entries=3, max_bytes=1024)
+
+    async def run():
+        for index in range(5):
+            await backend.set(f"preview:{index}", b"x" * 10, 60)
+        return [await backend.get(f"preview:{index}") for index in range(5)]
+
+    assert asyncio.run(run()) == [None, None, b"x" * 10, b"x" * 10, b"x" * 10]
@@ -0,0 +1,23 @@
+"""Tests for the embedded backend against an empty database."""
+
+import pytest
+
+from backend import EmbeddedBackend
+
+RESUME = {"name": "Jordan Example", "email": "jordan@example.com", "phone": "", "sections": {"SKILLS": "Python"}}
+
+@pytest.fixture(scope="module")
+def embedded_backend():
+    backend = EmbeddedBackend(workers=1)
+    yield backend
+    backend.close()
+
+def test_saves_and_lists_on_an_empty_database(embedded_backend):
+    portfolio_id = embedded_backend.save_portfolio(
+        "jordan@example.com", "Test Portfolio", RESUME, "Professional Classic", "<!DOCTYPE html><html></html>"
+    )
+
+    portfolios = embedded_backend.get_user_portfolios("jordan@example.com")
+
+    assert [portfolio["id"] for portfolio in portfolios] == [portfolio_id]
+    assert portfolios[0]["name"] == "Test Portfolio"
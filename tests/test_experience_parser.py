@@ -0,0 +1,128 @@
+"""Tests for parsing experience sections into roles."""
+import pytest
+
+import experience_parser
+from experience_parser import Experience, parse_experiences
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    experience_parser.clear_cache()
+    yield
+    experience_parser.clear_cache()
+
+def test_heading_above_a_bare_date_range():
+    text = (
+        "EXPERIENCE\n"
+        "Software Developer, Tech Company\n"
+        "June 2022 - Present\n"
+        "- Developed web applications\n"
+        "- Implemented RESTful APIs\n"
+    )
+
+    assert parse_experiences(text) == (
+        Experience("Software Developer", "Tech Company", "June 2022", "Present",
+                   ["Developed web applications", "Implemented RESTful APIs"]),
+    )
+
+def test_dated_line_with_title_and_company_takes_no_lines_from_above():
+    text = (
+        "Senior Engineer\n"
+        "Acme Corp, NYC\n"
+        "2019 - 2021\n"
+        "Built things\n"
+        "that scale\n"
+        "Google | Staff Engineer | Jan 2021 - Present\n"
+        "- Led team"
+    )
+
+    first, second = parse_experiences(text)
+
+    assert (first.title, first.company, first.dates) == ("Senior Engineer", "Acme Corp, NYC", "2019 - 2021")
+    assert first.notes == ("Built things that scale",)
+    assert (second.title, second.company, second.dates) == ("Staff Engineer", "Google", "Jan 2021 - Present")
+    assert second.bullets == ("Led team",)
+
+def test_heading_stops_at_blank_lines_and_bullets():
+    text = (
+        "Data Analyst, Globex\n"
+        "March 2018 - May 2020\n"
+        "- Built dashboards\n"
+        "\n"
+        "Initech\n"
+        "June 2020 - Present\n"
+    )
+
+    first, second = parse_experiences(text)
+
+    assert first.bullets == ("Built dashboards",)
+    assert (second.title, second.dates) == ("Initech", "June 2020 - Present")
+
+def test_wrapped_bullet_lines_are_joined():
+    text = "Engineer, Acme\nJan 2020 - Present\n- Migrated the billing platform to\nthe cloud\n- Led a team of five"
+
+    (role,) = parse_experiences(text)
+
+    assert role.bullets == ("Migrated the billing platform to the cloud", "Led a team of five")
+
+def test_trailing_plain_lines_are_kept_as_notes_not_bullets():
+    text = (
+        "Junior Developer, Startup Inc.\n"
+        "January 2020 - May 2022\n"
+        "- Participated in code reviews and testing\n"
+        "\n"
+        "Professional Cloud Developer"
+    )
+
+    (role,) = parse_experiences(text)
+
+    assert role.bullets == ("Participated in code reviews and testing",)
+    assert role.notes == ("Professional Cloud Developer",)
+    assert role.to_text().endswith("- Participated in code reviews and testing\nProfessional Cloud Developer")
+
+def test_notes_keep_their_place_among_the_bullets():
+    text = (
+        "Engineer, Acme\n"
+        "Jan 2020 - Present\n"
+        "Platform team\n"
+        "- Built the billing service\n"
+        "\n"
+        "Promoted to lead in 2021\n"
+        "- Led a team of five"
+    )
+
+    (role,) = parse_experiences(text)
+
+    assert role.notes == ("Platform team", "Promoted to lead in 2021")
+    assert role.to_text().splitlines()[-4:] == [
+        "Platform team",
+        "- Built the billing service",
+        "Promoted to lead in 2021",
+        "- Led a team of five"
+    ]
+
+def test_no_text_is_dropped_from_the_prompt_text():
+    text = (
+        "Senior Engineer\n"
+        "Acme Corp, NYC\n"
+        "2019 - 2021\n"
+        "Built things\n"
+        "that scale\n"
+        "Google | Staff Engineer | Jan 2021 - Present\n"
+        "- Led team\n"
+        "Mentored interns"
+    )
+
+    prompt_text = "\n".join(role.to_text() for role in parse_experiences(text))
+
+    for word in ("Senior", "Acme", "Built", "scale", "Google", "Staff", "Led", "Mentored"):
+        assert word in prompt_text
+
+def test_roles_split_on_job_titles_without_dates():
+    text = "Software Engineer at Acme\n- Built APIs\nProduct Manager at Globex\n- Ran launches"
+
+    roles = parse_experiences(text)
+
+    assert [(role.title, role.company, role.bullets) for role in roles] == [
+        ("Software Engineer", "Acme", ("Built APIs",)),
+        ("Product Manager", "Globex", ("Ran launches",))
+    ]
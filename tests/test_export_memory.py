@@ -0,0 +1,66 @@
+"""Tests that the streaming export's memory use does not grow with the portfolio count."""
+import asyncio
+import json
+import tempfile
+import tracemalloc
+import zipfile
+
+import pytest
+from sqlalchemy import select
+
+import database
+from database import User
+from portfolio_export import stream_user_export
+from portfolio_store import PortfolioStore
+
+# Peak Python memory allowed for one export, whatever the portfolio count
+EXPORT_PEAK_LIMIT = 1.5 * 1024 * 1024
+
+RESUME = {"name": "Export Test", "email": "", "phone": "", "sections": {}}
+
+async def _seed(email, count):
+    """Save count distinct portfolios for one user. Returns the user's ID."""
+    for start in range(0, count, 500):
+        items = [
+            {
+                "email": email,
+                "resume_info": RESUME,
+                "theme": "Professional Classic",
+                "html_content": f"<html><body><h1>Portfolio {index}</h1>{'<p>experience</p>' * 40}</body></html>",
+                "portfolio_name": f"Portfolio {index}"
+            } for index in range(start, min(start + 500, count))
+        ]
+        async with database.AsyncWriteSessionLocal() as db:
+            await PortfolioStore.save_portfolios_bulk(db, items)
+    async with database.AsyncSessionLocal() as db:
+        return (await db.execute(select(User.id).filter(User.email == email))).scalar()
+
+async def _export_peak(email, count, archive_file):
+    """Export a user's portfolios into archive_file. Returns the peak memory allocated meanwhile."""
+    user_id = await _seed(email, count)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        async for chunk in stream_user_export(user_id, email):
+            archive_file.write(chunk)
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+        await database.async_engine.dispose()
+        await database.async_write_engine.dispose()
+
+@pytest.mark.parametrize("count", [200, 3000])
+def test_export_peak_memory_stays_under_a_fixed_limit(count):
+    database.create_schema()
+    with tempfile.TemporaryFile() as archive_file:
+        peak = asyncio.run(_export_peak(f"export{count}@example.com", count, archive_file))
+
+        archive_file.seek(0)
+        with zipfile.ZipFile(archive_file) as archive:
+            assert archive.testzip() is None
+            manifest = json.loads(archive.read("manifest.json"))
+            files = [name for name in archive.namelist() if name.startswith("portfolios/")]
+
+    assert manifest["portfolio_count"] == count
+    assert sorted(entry["file"] for entry in manifest["portfolios"]) == sorted(files)
+    assert peak < EXPORT_PEAK_LIMIT, f"Export of {count} portfolios peaked at {peak / 1024 / 1024:.2f} MiB"
@@ -0,0 +1,89 @@
+"""Tests for the post-processing applied to every generated portfolio."""
+import pytest
+
+from html_postprocess import process_html
+
+DOCUMENT = (
+    "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+    "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+    "<title>Portfolio</title>\n{head}\n</head>\n<body>\n{body}\n</body>\n</html>"
+)
+
+def _process(body="", head=""):
+    html, stats = process_html(DOCUMENT.format(head=head, body=body))
+    return html, stats
+
+@pytest.mark.parametrize("body, kept", [
+    ("<ul class=\"nav\"><li>One</li>\n  <li>Two</li></ul>", "<li>One</li> <li>Two</li>"),
+    ("<div class=\"chip\">Python</div>   <div class=\"chip\">SQL</div>", "<div class=\"chip\">Python</div> <div class=\"chip\">SQL</div>"),
+    ("<p>First</p>\n<p>Second</p>", "<p>First</p> <p>Second</p>"),
+    ("<td>a</td> <td>b</td>", "<td>a</td> <td>b</td>"),
+    ("<span>before</span> <script>run()</script> <span>after</span>", "<span>before</span> <script>run()</script> <span>after</span>"),
+])
+def test_whitespace_between_elements_collapses_to_one_space(body, kept):
+    html, _ = _process(body)
+    assert kept in html
+
+def test_whitespace_between_structure_and_head_tags_is_dropped():
+    html, _ = _process("<p>Hello   world</p>", head="<style>p { color: red; }</style>\n<script>x()</script>")
+    assert html == (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">"
+        "<title>Portfolio</title><style>p{color:red}</style><script>x()</script></head>"
+        "<body><p>Hello world</p></body></html>"
+    )
+
+def test_pre_and_textarea_keep_their_whitespace():
+    html, _ = _process("<pre>  a\n    b</pre><textarea>  x  </textarea>")
+    assert "<pre>  a\n    b</pre><textarea>  x  </textarea>" in html
+
+def test_repairs_truncated_output():
+    html, stats = process_html("```html\n<html><head><title>t</title></head><body><section><p>Cut <a hre")
+    assert html.startswith("<!DOCTYPE html><html><head><meta charset=\"utf-8\"><meta name=\"viewport\"")
+    assert html.endswith("<p>Cut </section></body></html>")
+    assert stats["repairs"] == [
+        "truncated tag", "unclosed <html>, <body>, <section>",
+        "missing doctype", "missing charset", "missing viewport"
+    ]
+
+def test_repairs_stray_closing_tags_and_unclosed_script():
+    html, stats = process_html("<!DOCTYPE html><html><body><div>a</span></div><script>let x = 1;")
+    assert html == "<!DOCTYPE html><html><body><div>a</div><script>let x = 1;</script></body></html>"
+    assert stats["repairs"] == ["stray </span>", "unclosed <script>", "unclosed <html>, <body>"]
+
+def test_css_dedupe_keeps_the_last_copy_of_each_rule():
+    head = (
+        "<link rel=\"stylesheet\" href=\"a.css\"><link rel=\"stylesheet\" href=\"a.css\">"
+        "<style>.card { color: red; } .tag { margin: 0 }</style>"
+        "<style>.card{color:red}</style>"
+        "<style media=\"print\">.card{color:red}</style>"
+    )
+    html, stats = _process(head=head)
+    assert html.count("<link rel=\"stylesheet\" href=\"a.css\">") == 1
+    assert "<style>.tag{margin:0}</style><style>.card{color:red}</style>" in html
+    assert "<style media=\"print\">.card{color:red}</style>" in html
+    assert (stats["rules_removed"], stats["styles_removed"], stats["links_removed"]) == (1, 0, 1)
+
+def test_css_dedupe_drops_style_blocks_left_empty():
+    html, stats = _process(head="<style>.a{top:0}</style><style>.a{top:0}</style>")
+    assert html.count("<style>") == 1
+    assert stats["styles_removed"] == 1
+
+def test_js_comments_go_but_strings_and_line_breaks_stay():
+    script = (
+        "<script>\n"
+        "  // set up the menu\n"
+        "  const url = \"https://example.com/a\"; /* block */\n"
+        "  const note = '// not a comment'\n"
+        "  let total = 1 // trailing\n"
+        "\n"
+        "  total++\n"
+        "</script>"
+    )
+    html, _ = _process(script)
+    assert (
+        "<script>const url = \"https://example.com/a\";  \n"
+        "const note = '// not a comment'\n"
+        "let total = 1\n"
+        "total++</script>"
+    ) in html
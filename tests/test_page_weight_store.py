@@ -0,0 +1,55 @@
+"""Tests that saving analyzes page weight off the event loop."""
+import asyncio
+import json
+import threading
+
+from sqlalchemy import select
+
+import database
+import portfolio_store
+from portfolio_store import PortfolioStore
+
+RESUME = {"name": "Weight Test", "email": "", "phone": "", "sections": {}}
+
+def test_saves_analyze_page_weight_in_a_worker_thread(monkeypatch):
+    database.create_schema()
+    analyze_page = portfolio_store.analyze_page
+    threads = []
+
+    def recording_analyze_page(html_content):
+        threads.append(threading.get_ident())
+        return analyze_page(html_content)
+
+    monkeypatch.setattr(portfolio_store, "analyze_page", recording_analyze_page)
+    item = {
+        "email": "weight@example.com",
+        "resume_info": RESUME,
+        "theme": "Professional Classic",
+        "html_content": "<html><body><h1>Weight</h1></body></html>",
+        "portfolio_name": "Weight Test"
+    }
+
+    async def run():
+        try:
+            loop_thread = threading.get_ident()
+            async with database.AsyncWriteSessionLocal() as db:
+                portfolio_id = await PortfolioStore.save_portfolio(
+                    db, item["email"], item["resume_info"], item["theme"], item["html_content"], item["portfolio_name"]
+                )
+            async with database.AsyncWriteSessionLocal() as db:
+                bulk_ids = await PortfolioStore.save_portfolios_bulk(db, [item, item])
+            async with database.AsyncSessionLocal() as db:
+                stored = (await db.execute(
+                    select(database.Portfolio.page_weight_json)
+                    .filter(database.Portfolio.id.in_([portfolio_id, *bulk_ids]))
+                )).scalars().all()
+            return loop_thread, stored
+        finally:
+            await database.async_engine.dispose()
+            await database.async_write_engine.dispose()
+
+    loop_thread, stored = asyncio.run(run())
+    # Once for the single save and once for the two identical bulk items
+    assert len(threads) == 2
+    assert loop_thread not in threads
+    assert len(stored) == 3 and all(json.loads(report)["metrics"] for report in stored)
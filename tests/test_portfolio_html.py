@@ -0,0 +1,73 @@
+"""Tests that /portfolio/{id}/html reports unreadable artifacts as standard JSON errors."""
+import asyncio
+import os
+
+import httpx
+import pytest
+
+import database
+from api import app
+from artifact_store import LocalArtifactStore, set_artifact_store
+from html_blobs import html_hash
+from portfolio_store import PortfolioStore
+
+RESUME = {"name": "Html Test", "email": "", "phone": "", "sections": {}}
+
+async def _save_and_get(store, html_content, break_store):
+    try:
+        set_artifact_store(store)
+        async with database.AsyncWriteSessionLocal() as db:
+            portfolio_id = await PortfolioStore.save_portfolio(
+                db, "html@example.com", RESUME, "Professional Classic", html_content, "Html Test"
+            )
+        break_store(store, html_content)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(f"/portfolio/{portfolio_id}/html")
+    finally:
+        set_artifact_store(None)
+        await database.async_engine.dispose()
+        await database.async_write_engine.dispose()
+
+def _unconfigure(store, html_content):
+    set_artifact_store(None)
+
+def _remove_file(store, html_content):
+    os.remove(store.local_path(store.key_for(html_hash(html_content))))
+
+@pytest.mark.parametrize("break_store, message", [
+    (_unconfigure, "ARTIFACT_STORE is not configured"),
+    (_remove_file, "missing from the artifact store")
+])
+def test_unreadable_artifact_returns_json_error(tmp_path, break_store, message):
+    database.create_schema()
+    html_content = f"<html><body>{break_store.__name__}</body></html>"
+    response = asyncio.run(_save_and_get(LocalArtifactStore(str(tmp_path)), html_content, break_store))
+
+    assert response.status_code == 500
+    assert response.json()["status"] == "error"
+    assert message in response.json()["message"]
+
+async def _get_details(html_content):
+    try:
+        async with database.AsyncWriteSessionLocal() as db:
+            portfolio_id = await PortfolioStore.save_portfolio(
+                db, "html@example.com", RESUME, "Professional Classic", html_content, "Html Test"
+            )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            summary = (await client.get(f"/portfolio/{portfolio_id}", params={"include_html": "false"})).json()
+            full = (await client.get(f"/portfolio/{portfolio_id}")).json()
+        return summary["portfolio"], full["portfolio"]
+    finally:
+        await database.async_engine.dispose()
+        await database.async_write_engine.dispose()
+
+def test_portfolio_details_can_leave_out_the_html():
+    database.create_schema()
+    html_content = "<html><body>details</body></html>"
+    summary, full = asyncio.run(_get_details(html_content))
+
+    assert "html_content" not in summary
+    assert full["html_content"] == html_content
+    assert summary == {key: value for key, value in full.items() if key != "html_content"}
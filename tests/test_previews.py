@@ -0,0 +1,24 @@
+"""Tests that a lost preview is detected and restored by registering it again."""
+import httpx
+
+from api import app
+from api_client import ApiClient
+from backend import HttpBackend
+from cache import preview_store
+
+def test_lost_preview_is_restored_by_registering_again():
+    backend = HttpBackend(ApiClient("http://test", transport=httpx.ASGITransport(app=app)))
+    html_content = "<html><body>preview</body></html>"
+    try:
+        preview_url = backend.register_preview(html_content)
+        assert backend.preview_available(preview_url)
+
+        # As after an API restart or an eviction
+        preview_store.local.clear()
+        assert not backend.preview_available(preview_url)
+
+        assert backend.register_preview(html_content) == preview_url
+        assert backend.preview_available(preview_url)
+        assert backend.api.status("GET", preview_url[len(backend.public_url):]) == 200
+    finally:
+        backend.api.close()
@@ -0,0 +1,71 @@
+"""Tests for the portfolio listing and detail queries."""
+import asyncio
+
+import httpx
+from sqlalchemy import insert
+
+import database
+from api import app
+from database import User
+from portfolio_store import PortfolioStore
+
+RESUME = {
+    "name": "Read Test",
+    "email": "read@example.com",
+    "phone": "555-0100",
+    "sections": {"SUMMARY": "Engineer", "SKILLS": "Python", "EXPERIENCE": "Example Corp"}
+}
+
+async def _requests(email, paths, portfolios=0):
+    """Save portfolios for email, then GET each path; "{id}" is the first portfolio's ID."""
+    try:
+        portfolio_ids = []
+        async with database.AsyncWriteSessionLocal() as db:
+            if portfolios:
+                for index in range(portfolios):
+                    portfolio_ids.append(await PortfolioStore.save_portfolio(
+                        db, email, RESUME, "Professional Classic", f"<html><body>{index}</body></html>", f"Portfolio {index}"
+                    ))
+            else:
+                await db.execute(insert(User), [{"email": email}])
+                await db.commit()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path.format(id=portfolio_ids[0] if portfolio_ids else None)) for path in paths]
+    finally:
+        await database.async_engine.dispose()
+        await database.async_write_engine.dispose()
+
+def test_user_portfolios_lists_all_pages_and_unknown_users():
+    database.create_schema()
+    email = "list@example.com"
+    full, page, missing = asyncio.run(_requests(
+        email,
+        [f"/user-portfolios/{email}", f"/user-portfolios/{email}?page=1&page_size=2", "/user-portfolios/nobody@example.com"],
+        portfolios=3
+    ))
+
+    names = [portfolio["name"] for portfolio in full.json()["portfolios"]]
+    assert names == ["Portfolio 0", "Portfolio 1", "Portfolio 2"]
+    assert [portfolio["name"] for portfolio in page.json()["portfolios"]] == ["Portfolio 2", "Portfolio 1"]
+    assert page.json()["total"] == 3
+    assert missing.status_code == 404
+
+def test_user_without_portfolios_gets_an_empty_list():
+    database.create_schema()
+    email = "empty@example.com"
+    response, = asyncio.run(_requests(email, [f"/user-portfolios/{email}"]))
+
+    assert response.status_code == 200
+    assert response.json()["portfolios"] == []
+
+def test_portfolio_details_include_resume_sections_in_order():
+    database.create_schema()
+    email = "detail@example.com"
+    response, missing = asyncio.run(_requests(email, ["/portfolio/{id}", "/portfolio/999999"], portfolios=1))
+
+    portfolio = response.json()["portfolio"]
+    assert portfolio["html_content"] == "<html><body>0</body></html>"
+    assert portfolio["resume"]["name"] == "Read Test"
+    assert list(portfolio["resume"]["sections"]) == ["SUMMARY", "SKILLS", "EXPERIENCE"]
+    assert missing.status_code == 404
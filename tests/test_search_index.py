@@ -0,0 +1,40 @@
+"""Tests that search snippets are safe to render as HTML."""
+import asyncio
+
+import database
+from portfolio_store import PortfolioStore
+from search_index import SearchIndex
+
+RESUME = {
+    "name": "Search Test",
+    "email": "",
+    "phone": "",
+    "sections": {"experience": "Built <script>alert('x')</script> dashboards in Kubernetes & Go"}
+}
+
+async def _search(query):
+    try:
+        async with database.AsyncWriteSessionLocal() as db:
+            await PortfolioStore.save_portfolios_bulk(db, [{
+                "email": "search@example.com",
+                "resume_info": RESUME,
+                "theme": "Professional Classic",
+                "html_content": "<html><body></body></html>",
+                "portfolio_name": "Search Test"
+            }])
+        async with database.AsyncSessionLocal() as db:
+            return await SearchIndex.search(db, query, email="search@example.com")
+    finally:
+        await database.async_engine.dispose()
+        await database.async_write_engine.dispose()
+
+def test_snippet_escapes_resume_text_and_marks_matches():
+    database.create_schema()
+    total, results = asyncio.run(_search("kubernetes"))
+
+    assert total == 1
+    snippet = results[0]["snippet"]
+    assert "<mark>Kubernetes</mark>" in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "&amp;" in snippet
+    assert "<script>" not in snippet
@@ -0,0 +1,320 @@
+"""
+Request tracing for the API.
+
+Each request gets an ID and a trace that collects spans for SQL queries
+(through SQLAlchemy engine events), LLM calls and PDF parsing. Finished
+requests are written as one structured JSON timing line, slow ones are kept
+for the debug endpoint, and spans can be exported as OTLP/JSON to a file
+that OpenTelemetry tooling can read.
+
+Environment variables:
+    TRACE_LOG: Set to "0" to stop printing timing lines.
+    TRACE_SLOW_MS: Requests at or above this duration are sampled (default 500).
+    TRACE_SAMPLE_SIZE: Number of slow requests kept in memory (default 50).
+    TRACE_EXPORT_FILE: Path of an OTLP/JSON file to append spans to.
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque, Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+TRACE_LOG = os.environ.get("TRACE_LOG", "1") != "0"
+SLOW_REQUEST_MS = float(os.environ.get("TRACE_SLOW_MS", "500"))
+SAMPLE_SIZE = int(os.environ.get("TRACE_SAMPLE_SIZE", "50"))
+EXPORT_FILE = os.environ.get("TRACE_EXPORT_FILE")
+
+# A statement repeated this many times in one request is flagged as a likely N+1
+REPEATED_QUERY_THRESHOLD = 5
+
+_current_trace = ContextVar("current_trace", default=None)
+
+def _new_id(bits):
+    """
+    Random hex ID with the given number of bits.
+
+    IDs only need to be unique, not unpredictable, and uuid4 reads
+    os.urandom, which is a system call per ID. Like the OpenTelemetry SDK,
+    this uses the random module instead.
+    """
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+class RequestTrace:
+    """
+    Timing data collected for a single request.
+    """
+
+    def __init__(self, request_id, method, path):
+        self.request_id = request_id
+        self.trace_id = _new_id(128)
+        self.span_id = _new_id(64)
+        self.method = method
+        self.path = path
+        self.status_code = None
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+        self.duration_ms = 0.0
+        self.spans = []
+        self.totals_ms = Counter()
+        self.counts = Counter()
+        self.statements = Counter()
+        self._lock = threading.Lock()
+
+    def add_span(self, name, kind, start_ns, duration_ms, attributes=None):
+        """
+        Record a finished span on this trace.
+
+        Args:
+            name: Span name.
+            kind: Span category ("db", "llm", "pdf", ...), used for totals.
+            start_ns: Wall-clock start time in nanoseconds.
+            duration_ms: Span duration in milliseconds.
+            attributes: Optional dictionary of extra span attributes.
+        """
+        # Spans can finish on threadpool workers as well as the event loop
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "kind": kind,
+                "span_id": _new_id(64),
+                "start_ns": start_ns,
+                "duration_ms": round(duration_ms, 3),
+                "attributes": attributes or {}
+            })
+            self.totals_ms[kind] += duration_ms
+            self.counts[kind] += 1
+
+    def repeated_statements(self):
+        """Statements executed often enough in this request to suggest an N+1 pattern."""
+        return [
+            {"statement": statement, "count": count}
+            for statement, count in self.statements.most_common()
+            if count >= REPEATED_QUERY_THRESHOLD
+        ]
+
+    def summary(self):
+        """
+        Summarize the trace for timing lines and the debug endpoint.
+
+        Returns:
+            Dictionary of request timings and counts.
+        """
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status_code,
+            "duration_ms": round(self.duration_ms, 3),
+            "db_queries": self.counts["db"],
+            "db_ms": round(self.totals_ms["db"], 3),
+            "llm_calls": self.counts["llm"],
+            "llm_ms": round(self.totals_ms["llm"], 3),
+            "pdf_parses": self.counts["pdf"],
+            "pdf_ms": round(self.totals_ms["pdf"], 3),
+            "repeated_queries": self.repeated_statements()
+        }
+
+class SlowRequestSampler:
+    """
+    Keeps the most recent slow requests, including their spans.
+    """
+
+    def __init__(self, threshold_ms, size):
+        self.threshold_ms = threshold_ms
+        self.samples = deque(maxlen=size)
+
+    def offer(self, trace):
+        """Keep the trace if it was slow."""
+        if trace.duration_ms >= self.threshold_ms:
+            sample = trace.summary()
+            sample["spans"] = list(trace.spans)
+            self.samples.append(sample)
+
+    def snapshot(self):
+        """Slow requests, slowest first."""
+        return sorted(self.samples, key=lambda sample: sample["duration_ms"], reverse=True)
+
+class FileSpanExporter:
+    """
+    Appends finished traces to a file as OTLP/JSON, one export request per line.
+
+    The format matches the OpenTelemetry collector's file exporter, so the
+    output can be replayed into a collector or inspected with any OTLP tool.
+    """
+
+    def __init__(self, path, service_name="portfolio-generator-api"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _attributes(values):
+        attributes = []
+        for key, value in values.items():
+            if isinstance(value, bool):
+                attributes.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                attributes.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                attributes.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                attributes.append({"key": key, "value": {"stringValue": str(value)}})
+        return attributes
+
+    def export(self, trace):
+        """Write a finished trace and its child spans."""
+        end_ns = trace.start_ns + int(trace.duration_ms * 1_000_000)
+        spans = [{
+            "traceId": trace.trace_id,
+            "spanId": trace.span_id,
+            "name": f"{trace.method} {trace.path}",
+            "kind": 2,  # SERVER
+            "startTimeUnixNano": str(trace.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": self._attributes({
+                "http.request.method": trace.method,
+                "url.path": trace.path,
+                "http.response.status_code": trace.status_code or 0,
+                "request.id": trace.request_id
+            })
+        }]
+        for span in trace.spans:
+            span_end_ns = span["start_ns"] + int(span["duration_ms"] * 1_000_000)
+            spans.append({
+                "traceId": trace.trace_id,
+                "spanId": span["span_id"],
+                "parentSpanId": trace.span_id,
+                "name": span["name"],
+                "kind": 3 if span["kind"] in ("db", "llm") else 1,  # CLIENT or INTERNAL
+                "startTimeUnixNano": str(span["start_ns"]),
+                "endTimeUnixNano": str(span_end_ns),
+                "attributes": self._attributes(dict(span["attributes"], **{"span.kind": span["kind"]}))
+            })
+
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": self._attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}]
+            }]
+        })
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as export_file:
+                export_file.write(line + "\n")
+
+slow_requests = SlowRequestSampler(SLOW_REQUEST_MS, SAMPLE_SIZE)
+exporter = FileSpanExporter(EXPORT_FILE) if EXPORT_FILE else None
+
+def current_trace():
+    """The trace of the request being handled, or None outside a request."""
+    return _current_trace.get()
+
+@contextmanager
+def span(name, kind="internal", **attributes):
+    """
+    Time a block of work and record it on the current request's trace.
+
+    Outside a traced request this only runs the block.
+
+    Args:
+        name: Span name.
+        kind: Span category used for per-request totals ("llm", "pdf", ...).
+        **attributes: Extra attributes stored with the span.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    start_ns = time.time_ns()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        attributes["error"] = str(e)
+        raise
+    finally:
+        trace.add_span(name, kind, start_ns, (time.perf_counter() - start) * 1000, attributes)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_trace.get() is not None:
+        conn.info.setdefault("trace_query_start", []).append((time.time_ns(), time.perf_counter()))
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace.get()
+    starts = conn.info.get("trace_query_start")
+    if trace is None or not starts:
+        return
+
+    start_ns, start = starts.pop()
+    # Collapse whitespace so repeated statements group together
+    normalized = " ".join(statement.split())
+    trace.statements[normalized] += 1
+    trace.add_span(
+        "db.query",
+        "db",
+        start_ns,
+        (time.perf_counter() - start) * 1000,
+        {"db.statement": normalized[:500], "db.executemany": executemany}
+    )
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Drop the pending start time so a failed query doesn't skew the next one
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("trace_query_start"):
+        connection.info["trace_query_start"].pop()
+
+class TracingMiddleware:
+    """
+    ASGI middleware that assigns a request ID and traces each HTTP request.
+
+    The request ID is taken from an incoming X-Request-ID header when present
+    and is echoed back on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or _new_id(128)
+        trace = RequestTrace(request_id, scope["method"], scope["path"])
+        token = _current_trace.set(trace)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                trace.status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _current_trace.reset(token)
+            trace.duration_ms = (time.perf_counter() - trace.start) * 1000
+            _finish(trace)
+
+def _finish(trace):
+    """Write the timing line, sample and export a finished request."""
+    if TRACE_LOG:
+        print(json.dumps(dict(trace.summary(), event="request_timing")))
+    slow_requests.offer(trace)
+    if exporter is not None:
+        try:
+            exporter.export(trace)
+        except OSError as e:
+            print(f"Failed to export trace {trace.request_id}: {str(e)}")